@@ -1,19 +1,21 @@
 #!/usr/bin/env python3
 # coding=utf-8
 import time
+import json
 import sys
 import os
 from dora import Node
 import numpy as np
 
-# 添加 SDK 路径
-sys.path.append(os.path.join(os.path.dirname(__file__), "../..", "loong_sim_sdk_release"))
+# 添加 SDK 路径（使用仓库内 openloong-dora-udp/sdk，含同版本 c++ 封装库，并提供周期调度与时序统计）
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../..", "openloong-dora-udp"))
 from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkSensDataClass, jntSdkCtrlDataClass
 from sdk.loong_jnt_sdk.loong_jnt_sdk_udp import jntSdkClass
+from loong_sdk_loop import loopFromEnv
+from loong_sdk_stats import sdkTimingStatsClass
 
-# 配置参数
-dT = 0.02  # 50Hz 控制频率
-MAX_STEPS = 1000  # 10秒 * 50Hz = 1000步
+# 配置参数：控制频率可由环境变量 LOOP_HZ 调整（默认 50Hz），RT_PRIO / CPU_AFFINITY 见 loong_sdk_loop
+RUN_TIME = 20.0  # 运行时长(s)，50Hz 下即 1000 步
 
 def main():
     print("JNT_CTRL 节点启动...")
@@ -41,6 +43,13 @@ def main():
     # 等待传感器数据
     sdk.waitSens()
 
+    # 收发时序统计：每秒在 jnt_timing 输出上发布一次滚动分位数，热循环内不打印
+    def publish_timing(summary):
+        node.send_output("jnt_timing", json.dumps(summary).encode())
+        if "rttUs" in summary:
+            print(f"JNT 时序: 往返 p99 {summary['rttUs']['p99']:.0f}us, "
+                  f"周期 p99 {summary['periodUs']['p99']:.0f}us, 解码 p99 {summary['decodeUs']['p99']:.1f}us")
+
     # 初始化控制参数 - 完全按照 test_jnt.py
     ctrl.reset()
     ctrl.filtRate = 1
@@ -64,34 +73,31 @@ def main():
 
     node.send_output("jnt_ctrl_status", b"ready")
     
-    # 控制循环 - 完全采用 mani_ctrl 和 test_jnt 的成功方式
-    tim = time.time()
-    for i in range(MAX_STEPS):
+    # 控制循环：按绝对截止时刻调度，运动模式按时间而非步数计算，与频率无关
+    loop = loopFromEnv(50, "jnt_ctrl")
+    dT = loop.periodNs * 1e-9
+    max_steps = int(RUN_TIME / dT)
+    sdk.attachStats(sdkTimingStatsClass(1024, publishEvery=max(1, int(1.0 / dT)), callback=publish_timing, name="jnt_ctrl"))
+    for i in loop.range(max_steps):
+        t = i * dT
         # 设置控制状态 - 按照 test_jnt.py
         ctrl.state = 5
         
         # 更新控制指令 - 完全按照 test_jnt.py 的运动模式
-        ctrl.j[0] = stdJnt[0] + 0.5 * np.sin(i / 50)      # 左腿
-        ctrl.j[10] = stdJnt[10] + 0.5 * np.sin(i / 100)   # 右腿
-        ctrl.j[21] = stdJnt[21] + 0.2 * np.sin(i / 20)    # 左手
-        ctrl.j[28] = stdJnt[28] + 0.5 * np.sin(i / 50)    # 右手
+        ctrl.j[0] = stdJnt[0] + 0.5 * np.sin(t)          # 左腿
+        ctrl.j[10] = stdJnt[10] + 0.5 * np.sin(t / 2)    # 右腿
+        ctrl.j[21] = stdJnt[21] + 0.2 * np.sin(t * 2.5)  # 左手
+        ctrl.j[28] = stdJnt[28] + 0.5 * np.sin(t)        # 右手
         
         # 发送控制指令
         sdk.send(ctrl)
         
-        # 接收反馈 - 按照 test_jnt.py 的方式
-        sens = sdk.recv()
-        if sens is not None and i % 10 == 0:
-            delayT = time.time() - sens.timestamp
-            print(f"JNT 步骤 {i}: 延迟 {float(delayT):.3f}s")
-        
-        # 时间控制 - 完全采用 mani_ctrl 和 test_jnt 的精确方式
-        tim += dT
-        dt = tim - time.time()
-        if dt > 0:
-            time.sleep(dt)
+        # 接收反馈（延迟等时序由 sdk.stats 记录）
+        sdk.recv()
 
-    print(f"JNT 控制完成，共执行 {MAX_STEPS} 步")
+    print(f"JNT 控制完成，共执行 {max_steps} 步")
+    print(loop.report())
+    publish_timing(sdk.stats.summary())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
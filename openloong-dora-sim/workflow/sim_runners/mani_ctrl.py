@@ -6,13 +6,13 @@ import os
 from dora import Node
 import numpy as np
 
-# 添加 SDK 路径
-sys.path.append(os.path.join(os.path.dirname(__file__), "../..", "loong_sim_sdk_release"))
+# 添加 SDK 路径（mani SDK 为纯 Python 实现，使用仓库内 openloong-dora-udp/sdk 以获得最新帧接收接口）
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../..", "openloong-dora-udp"))
 from sdk.loong_mani_sdk.loong_mani_sdk_udp import maniSdkCtrlDataClass, maniSdkClass, maniSdkSensDataClass
+from loong_sdk_loop import loopFromEnv
 
-# 配置参数
-dT = 0.02  # 50Hz 控制频率
-MAX_STEPS = 1000
+# 配置参数：控制频率可由环境变量 LOOP_HZ 调整（默认 50Hz），RT_PRIO / CPU_AFFINITY 见 loong_sdk_loop
+RUN_TIME = 20.0  # 运行时长(s)，50Hz 下即 1000 步
 
 def main():
     print("MANI_CTRL 节点启动...")
@@ -58,8 +58,13 @@ def main():
 
     node.send_output("ctrl_status", b"ready")
     
-    tim = time.time()
-    for i in range(MAX_STEPS):
+    loop = loopFromEnv(50, "mani_ctrl")
+    dT = loop.periodNs * 1e-9
+    max_steps = int(RUN_TIME / dT)
+    report_every = max(1, int(0.2 / dT))
+    last_seq = 0
+    stale = 0
+    for i in loop.range(max_steps):
         # 更新控制指令
         ctrl.armCmd[0][0] = 0.4 + 0.1 * np.sin(i * dT * 2)
         ctrl.armCmd[0][2] = 0.1 + 0.1 * np.sin(i * dT * 2)
@@ -70,18 +75,17 @@ def main():
         # 发送控制指令
         sdk.send(ctrl)
         
-        # 接收反馈
-        sens = sdk.recv()
-        if sens is not None and i % 10 == 0:
+        # 接收反馈：在本周期剩余时间内（留出调度器自旋段）等待新帧到达，只解码最新一帧
+        sens, seq, age = sdk.recvTagged(timeout=loop.remaining())
+        if seq == last_seq:
+            stale += 1
+        last_seq = seq
+        if seq and i % report_every == 0:
+            print(f"MANI 步骤 {i}: 帧序号 {seq}, 帧龄 {age * 1000:.1f}ms, 无新帧周期 {stale}, 丢弃旧帧 {sdk.sensDropped}")
             sens.print()
-        
-        # 时间控制
-        tim += dT
-        dt = tim - time.time()
-        if dt > 0:
-            time.sleep(dt)
 
-    print(f"控制完成，共执行 {MAX_STEPS} 步")
+    print(f"控制完成，共执行 {max_steps} 步")
+    print(loop.report())
 
 if __name__ == "__main__":
     main()
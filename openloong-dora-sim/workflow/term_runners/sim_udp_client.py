@@ -1,5 +1,5 @@
-import json
-import socket
+import asyncio
+import queue
 import struct
 import threading
 import time
@@ -8,21 +8,149 @@ import os
 import numpy as np
 from dora import Node
 
-# Add SDK path
-sys.path.append(os.path.join(os.path.dirname(__file__), "..", "loong_sim_sdk_release"))
-from sdk.loong_mani_sdk.loong_mani_sdk_udp import maniSdkCtrlDataClass, maniSdkClass, maniSdkSensDataClass
+# Add SDK path (pure-Python mani SDK with the asyncio transport lives in openloong-dora-udp/sdk)
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "openloong-dora-udp"))
+from sdk.loong_mani_sdk.loong_mani_sdk_udp import maniSdkCtrlDataClass
+from sdk.loong_mani_sdk.loong_mani_sdk_async import maniSdkAsyncClass
+from sdk.loong_sdk_common.loong_sdk_record import recorderFromEnv
+from sdk.loong_sdk_common.loong_sdk_converge import sdkConvergeClass
+# Arrow edge types shared with openloong-dora-udp/workflow
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "openloong-dora-udp", "workflow"))
+from dora_schemas import encode, CHASSIS_STATUS, JOINT_STATUS, MANI_STATUS
+from dora_payload import decode_event
+
+
+# Convergence criteria for mani command completion
+TIP_TOL = [0.02, 0.02, 0.02, 0.1, 0.1, 0.1]  # tip pos (m) and rpy (rad)
+TIP_VEL_TOL = 0.05
+FINGER_TOL = 10.0  # finger units as commanded (GRAB closes to 50)
+JOINT_VEL_TOL = 0.05  # rad/s
+MANI_DWELL_S = float(os.environ.get("SIM_MANI_DWELL_S", "0.2"))
+MANI_TIMEOUT_S = float(os.environ.get("SIM_MANI_TIMEOUT_S", "10"))
+
+
+class ChassisCommandChannel:
+    """Chassis command frame shared between the dora thread (writer) and the I/O loop (sender).
+
+    Updates mutate the frame under a lock and publish an immutable snapshot, so the sender never
+    sees a half-written velocity. The sender transmits a new snapshot immediately, coalesces
+    bursts that arrive within min_interval_s into one datagram, and otherwise repeats the last
+    frame every keepalive_s. In teleop mode the frame is streamed at teleop_hz; if no teleop
+    sample arrives for teleop_timeout_s the velocity is zeroed (dead-man)."""
+
+    def __init__(self, template: bytearray, keepalive_s: float = 0.5, min_interval_s: float = 0.01,
+                 teleop_hz: float = 50.0, teleop_timeout_s: float = 0.5) -> None:
+        self.keepalive_s = keepalive_s
+        self.min_interval_s = min_interval_s
+        self.teleop_hz = teleop_hz
+        self.teleop_timeout_s = teleop_timeout_s
+        self._lock = threading.Lock()
+        self._cmd = bytearray(template)
+        self._frame = bytes(self._cmd)
+        self._version = 0
+        self._teleop_until = 0.0
+        self._loop = None
+        self._wake = None
+        self.updates = 0  # published frames
+        self.sent = 0  # datagrams sent (changes + keepalives)
+
+    def update(self, linear_x: float = None, linear_y: float = None, yaw_rate: float = None,
+               key: int = None, teleop: bool = False) -> None:
+        """Apply the given fields and publish; None leaves a field unchanged"""
+        with self._lock:
+            # Match tools/py_ui.py mapping: vy -> [7:11], -wz -> [11:15], -vx -> [15:19], scaled*100
+            if linear_y is not None:
+                struct.pack_into('<f', self._cmd, 7, linear_y * 100.0)
+            if yaw_rate is not None:
+                struct.pack_into('<f', self._cmd, 11, -yaw_rate * 100.0)
+            if linear_x is not None:
+                struct.pack_into('<f', self._cmd, 15, -linear_x * 100.0)
+            if key is not None:
+                self._cmd[84] = key
+            # A teleop sample re-arms the dead-man; any other update (MOVE, key change) leaves teleop mode
+            self._teleop_until = time.monotonic() + self.teleop_timeout_s if teleop else 0.0
+            self._frame = bytes(self._cmd)
+            self._version += 1
+            self.updates += 1
+        self._notify()
+
+    def velocity(self) -> tuple:
+        """(linear_x, linear_y, yaw_rate) of the published frame"""
+        vy, wz, vx = struct.unpack_from('<3f', self._frame, 7)
+        return -vx / 100.0, vy / 100.0, -wz / 100.0
+
+    def snapshot(self) -> tuple:
+        """(frame bytes, version) of the latest published frame"""
+        with self._lock:
+            return self._frame, self._version
+
+    def _notify(self) -> None:
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                # Loop already closed during shutdown
+                pass
+
+    def close(self) -> None:
+        self._notify()
+
+    async def run(self, transport, stop_event: threading.Event, on_send=None) -> None:
+        """Sender loop; on_send(frame) is called after every datagram"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        last_sent = -float("inf")
+        sent_version = -1
+        while not stop_event.is_set():
+            # Clear before reading the snapshot so an update racing with this pass re-wakes us
+            self._wake.clear()
+            now = time.monotonic()
+            with self._lock:
+                frame, version, teleop_until = self._frame, self._version, self._teleop_until
+                expired = 0.0 < teleop_until <= now
+                if expired:
+                    self._teleop_until = 0.0
+            if expired:
+                # Dead-man: teleop stream stopped, bring the chassis to rest
+                self.update(0.0, 0.0, 0.0)
+                continue
+            teleop = teleop_until > 0.0
+            due = last_sent + (1.0 / self.teleop_hz if teleop else self.keepalive_s)
+            if version != sent_version:
+                due = min(due, last_sent + self.min_interval_s)
+            if now >= due:
+                try:
+                    transport.sendto(frame)
+                    if on_send is not None:
+                        on_send(frame)
+                except Exception:
+                    # Best-effort; do not crash the loop
+                    pass
+                self.sent += 1
+                last_sent = now
+                sent_version = version
+                continue
+            wait = due - now
+            if teleop:
+                wait = min(wait, teleop_until - now)
+            try:
+                await asyncio.wait_for(self._wake.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
 
 
 class SimUdpClient:
     def __init__(self, ip: str = "0.0.0.0", port: int = 8000, send_period_s: float = 0.5, 
-                 mani_ip: str = "0.0.0.0", mani_port: int = 8003) -> None:
+                 mani_ip: str = "0.0.0.0", mani_port: int = 8003, recorder=None,
+                 min_interval_s: float = 0.01, teleop_hz: float = 50.0) -> None:
         self.ip = ip
         self.port = port
+        # Keepalive period; changed commands are sent immediately (coalesced within min_interval_s)
         self.send_period_s = send_period_s
+        # Optional sdkRecorderClass: chassis commands and mani ctrl/sens frames are captured for replay
+        self.recorder = recorder
 
-        # UDP socket for chassis control
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        
         # Initialize mani SDK
         self.jntNum = 19
         self.armDof = 7
@@ -33,20 +161,29 @@ class SimUdpClient:
         
         self.mani_ctrl = maniSdkCtrlDataClass(self.armDof, self.fingerDofLeft, 
                                             self.fingerDofRight, self.neckDof, self.lumbarDof)
-        self.mani_sdk = maniSdkClass(mani_ip, mani_port, self.jntNum, 
-                                   self.fingerDofLeft, self.fingerDofRight)
+        # mani_ctrl is written by the dora thread under mani_lock; the I/O loop copies it into
+        # _mani_tx under the same lock and sends the copy, so a datagram never mixes two commands
+        self.mani_lock = threading.RLock()
+        self._mani_tx = maniSdkCtrlDataClass(self.armDof, self.fingerDofLeft,
+                                             self.fingerDofRight, self.neckDof, self.lumbarDof)
+        self.mani_sdk = maniSdkAsyncClass(mani_ip, mani_port, self.jntNum,
+                                          self.fingerDofLeft, self.fingerDofRight)
+        self._chassis_ch = None
+        if recorder is not None:
+            self._chassis_ch = recorder.channel("chassis.cmd", "tx", peer=(ip, port))
+            self.mani_sdk.attachRecorder(recorder, "mani")
         
         # Initialize mani control parameters
         self._init_mani_control()
         
-        # Mani command state tracking
-        self._pending_mani_command = None
-        self._mani_command_timeout = 0
+        # Mani command state tracking: (action, sdkConvergeClass) swapped in as one tuple by begin_mani_command
+        self._pending_mani = None
         self._mani_feedback_received = False
-        self._pending_status = None
+        # Mani statuses produced on the I/O thread, published by the dora thread on its next event
+        self.status_queue = queue.SimpleQueue()
 
         # Command buffer mirrors tools/py_ui.py layout
-        self.cmd = bytearray([
+        self.chassis = ChassisCommandChannel(bytearray([
             0x81, 0, 0, 0, 0x60, 0,
             0,
             0, 0, 0, 0,
@@ -56,20 +193,12 @@ class SimUdpClient:
             0x29, 0x5C, 0x0F, 0x3F, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0x9A, 0x99, 0x19, 0x3E,
             0, 13, 0,
             0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
-        ])
-
-        # Velocities (interpreted as UI joystick values)
-        self.linear_x = 0.0
-        self.linear_y = 0.0
-        self.yaw_rate = 0.0
+        ]), keepalive_s=send_period_s, min_interval_s=min_interval_s, teleop_hz=teleop_hz)
 
+        # Chassis sender and mani control share one asyncio loop on a single I/O thread
         self._stop_event = threading.Event()
-        self._sender_thread = threading.Thread(target=self._sender_loop, daemon=True)
-        self._sender_thread.start()
-        
-        # Start mani control thread
-        self._mani_thread = threading.Thread(target=self._mani_control_loop, daemon=True)
-        self._mani_thread.start()
+        self._io_thread = threading.Thread(target=lambda: asyncio.run(self._io_main()), daemon=True)
+        self._io_thread.start()
 
     def _init_mani_control(self) -> None:
         """Initialize mani control parameters based on test_.py"""
@@ -93,142 +222,159 @@ class SimUdpClient:
         self.mani_ctrl.neckCmd = np.zeros(self.neckDof, np.float32)
         self.mani_ctrl.lumbarCmd = np.zeros(self.lumbarDof, np.float32)
 
-    def _mani_control_loop(self) -> None:
-        """Mani control loop that sends commands and receives feedback"""
+    async def _io_main(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._chassis_transport, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=(self.ip, self.port))
+        await self.mani_sdk.open()
+        try:
+            await asyncio.gather(self._sender_loop(), self._mani_control_loop())
+        finally:
+            self._chassis_transport.close()
+            self.mani_sdk.close()
+
+    async def _mani_control_loop(self) -> None:
+        """Mani control loop: send at 50Hz, waking as soon as a fresh sensor frame arrives"""
+        period = 0.02  # 50Hz control loop
+        deadline = time.monotonic()
         while not self._stop_event.is_set():
+            deadline += period
             try:
-                # Send control commands
-                self.mani_sdk.send(self.mani_ctrl)
-                # Receive sensor feedback
-                sens = self.mani_sdk.recv()
-                
+                # Send a consistent snapshot of the control frame
+                with self.mani_lock:
+                    self._mani_tx.unpackData(self.mani_ctrl.getBuf())
+                await self.mani_sdk.send(self._mani_tx)
+                # Wait for a fresh sensor frame until the next tick (None if none arrived)
+                sens = await self.mani_sdk.recv(timeout=max(0.0, deadline - time.monotonic()))
                 # Process sensor data and check command completion
                 self._process_mani_feedback(sens)
-                
             except Exception as e:
                 # Best-effort; do not crash the loop
                 print(f"Mani control error: {e}")
-            time.sleep(0.02)  # 50Hz control loop
+            await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+
+    def begin_mani_command(self, action: str) -> None:
+        """Start waiting for the current mani_ctrl targets to be reached.
+
+        Completion fires once every commanded channel is within tolerance and the arms have
+        stopped moving, continuously for MANI_DWELL_S; MANI_TIMEOUT_S without settling reports ERROR."""
+        ctrl = self._mani_snapshot()
+        monitor = sdkConvergeClass(dwell=MANI_DWELL_S, timeout=MANI_TIMEOUT_S)
+        if ctrl.armMode == 4:
+            # Cartesian body frame: tip pose vs xyz+rpy of armCmd, tip twist settled
+            monitor.expect("actTipPRpy2B", ctrl.armCmd[:, :6], tol=TIP_TOL, vel="actTipVW2B", velTol=TIP_VEL_TOL)
+        if ctrl.fingerMode == 3:
+            monitor.expect("actFingerLeft", ctrl.fingerLeft, tol=FINGER_TOL)
+            monitor.expect("actFingerRight", ctrl.fingerRight, tol=FINGER_TOL)
+        # Both arms' joints at rest
+        monitor.expect(None, vel="actW", velTol=JOINT_VEL_TOL, sl=slice(0, 2 * self.armDof))
+        self._pending_mani = (action, monitor)
+
+    def _mani_snapshot(self) -> maniSdkCtrlDataClass:
+        snap = maniSdkCtrlDataClass(self.armDof, self.fingerDofLeft, self.fingerDofRight,
+                                    self.neckDof, self.lumbarDof)
+        with self.mani_lock:
+            snap.unpackData(self.mani_ctrl.getBuf())
+        return snap
 
     def _process_mani_feedback(self, sens) -> None:
-        """Process mani sensor feedback and check command completion"""
-        if self._pending_mani_command is None:
+        """Feed a fresh sensor frame to the pending command's convergence monitor"""
+        pending = self._pending_mani
+        if pending is None:
             return
-            
+        action, monitor = pending
+        if sens is None:
+            # No fresh frame this tick: only the timeout can fire
+            if monitor.poll():
+                self._finish_mani_command(pending, "ERROR", f"未收敛: {monitor.error()}")
+            return
+
         # Check for errors
         if np.any(sens.drvErr != 0):
             print(f"驱动器错误: {sens.drvErr}")
-            self._send_mani_status("ERROR", "驱动器错误")
-            self._pending_mani_command = None
+            self._finish_mani_command(pending, "ERROR", "驱动器错误")
             return
-        
-        # Check command completion based on feedback
-        if self._pending_mani_command == "GRAB":
-            # Check if fingers are closed and arms are in position
-            left_finger_closed = np.all(sens.actFingerLeft > 40)  # Fingers closed
-            right_finger_closed = np.all(sens.actFingerRight > 40)
-            
-            if left_finger_closed and right_finger_closed:
-                self._send_mani_status("GRAB", "SUCCESS")
-                self._pending_mani_command = None
-                
-        elif self._pending_mani_command == "RETURN":
-            # Check if arms are back to home position
-            left_arm_home = np.allclose(sens.actJ[:7], [0.4, 0.4, 0.1, 0, 0, 0, 0.5], atol=0.1)
-            right_arm_home = np.allclose(sens.actJ[7:14], [0.2, -0.4, 0.1, 0, 0, 0, 0.5], atol=0.1)
-            
-            if left_arm_home and right_arm_home:
-                self._send_mani_status("RETURN", "SUCCESS")
-                self._pending_mani_command = None
-                
-        elif self._pending_mani_command == "MANI_CONTROL":
-            # For custom control, assume success after a short delay
-            if self._mani_command_timeout > 0:
-                self._mani_command_timeout -= 1
-                if self._mani_command_timeout == 0:
-                    self._send_mani_status("MANI_CONTROL", "SUCCESS")
-                    self._pending_mani_command = None
-
-    def _send_mani_status(self, action: str, status: str) -> None:
+
+        if monitor.update(sens):
+            print(f"{action} 到位，用时 {monitor.elapsed():.2f}s")
+            self._finish_mani_command(pending, "SUCCESS")
+        elif monitor.expired:
+            self._finish_mani_command(pending, "ERROR", f"未收敛: {monitor.error()}")
+
+    def _finish_mani_command(self, pending, status: str, error: str = None) -> None:
+        # Only clear if no newer command replaced this one meanwhile
+        if self._pending_mani is pending:
+            self._pending_mani = None
+        self._send_mani_status(pending[0], status, error)
+
+    def _send_mani_status(self, action: str, status: str, error: str = None) -> None:
         """Send mani status to dora workflow"""
-        # This will be called from the main event loop
-        self._pending_status = {"action": action, "status": status}
+        # Called from the I/O thread; main() drains the queue on every dora event (incl. tick)
+        self.status_queue.put({"action": action, "status": status, "error": error})
 
-    def _update_velocity_bytes(self) -> None:
-        # Match tools/py_ui.py mapping: vy -> [7:11], -wz -> [11:15], -vx -> [15:19], scaled*100
-        self.cmd[7:11] = struct.pack('<f', self.linear_y * 100.0)
-        self.cmd[11:15] = struct.pack('<f', -self.yaw_rate * 100.0)
-        self.cmd[15:19] = struct.pack('<f', -self.linear_x * 100.0)
+    def set_velocity(self, linear_x: float, linear_y: float, yaw_rate: float,
+                     key: int = None, teleop: bool = False) -> None:
+        """Publish velocities (UI joystick values) in one atomic frame update"""
+        self.chassis.update(linear_x, linear_y, yaw_rate, key=key, teleop=teleop)
 
-    def _set_key(self, key: int, clear_velocity: bool = False) -> None:
+    def set_key(self, key: int, clear_velocity: bool = False) -> None:
         if clear_velocity:
-            self.linear_x = 0.0
-            self.linear_y = 0.0
-            self.yaw_rate = 0.0
-            self._update_velocity_bytes()
-        self.cmd[84] = key
+            self.chassis.update(0.0, 0.0, 0.0, key=key)
+        else:
+            self.chassis.update(key=key)
 
-    def _sender_loop(self) -> None:
-        while not self._stop_event.is_set():
-            try:
-                self.socket.sendto(self.cmd, (self.ip, self.port))
-            except Exception:
-                # Best-effort; do not crash the loop
-                pass
-            time.sleep(self.send_period_s)
+    async def _sender_loop(self) -> None:
+        on_send = None
+        if self._chassis_ch is not None:
+            on_send = lambda frame: self.recorder.write(self._chassis_ch, frame)
+        await self.chassis.run(self._chassis_transport, self._stop_event, on_send)
 
     def shutdown(self) -> None:
         self._stop_event.set()
+        self.chassis.close()
         try:
-            self._sender_thread.join(timeout=1.0)
-            self._mani_thread.join(timeout=1.0)
+            self._io_thread.join(timeout=1.0)
         except Exception:
             pass
+        if self.recorder is not None:
+            self.recorder.close()
 
     def set_arm_position(self, left_arm: list = None, right_arm: list = None) -> None:
         """Set arm positions for both arms"""
-        if left_arm is not None:
-            self.mani_ctrl.armCmd[0] = np.array(left_arm, np.float32)
-        if right_arm is not None:
-            self.mani_ctrl.armCmd[1] = np.array(right_arm, np.float32)
+        with self.mani_lock:
+            if left_arm is not None:
+                self.mani_ctrl.armCmd[0] = np.array(left_arm, np.float32)
+            if right_arm is not None:
+                self.mani_ctrl.armCmd[1] = np.array(right_arm, np.float32)
 
     def set_finger_control(self, left_fingers: list = None, right_fingers: list = None) -> None:
         """Set finger control for both hands"""
-        if left_fingers is not None:
-            self.mani_ctrl.fingerLeft = np.array(left_fingers, np.float32)
-        if right_fingers is not None:
-            self.mani_ctrl.fingerRight = np.array(right_fingers, np.float32)
+        with self.mani_lock:
+            if left_fingers is not None:
+                self.mani_ctrl.fingerLeft = np.array(left_fingers, np.float32)
+            if right_fingers is not None:
+                self.mani_ctrl.fingerRight = np.array(right_fingers, np.float32)
 
     def set_mani_mode(self, arm_mode: int = None, finger_mode: int = None, 
                      neck_mode: int = None, lumbar_mode: int = None) -> None:
         """Set manipulation control modes"""
-        if arm_mode is not None:
-            self.mani_ctrl.armMode = arm_mode
-        if finger_mode is not None:
-            self.mani_ctrl.fingerMode = finger_mode
-        if neck_mode is not None:
-            self.mani_ctrl.neckMode = neck_mode
-        if lumbar_mode is not None:
-            self.mani_ctrl.lumbarMode = lumbar_mode
-
-
-def _decode_event_value(value):
-    # Accept pyarrow UInt8Array, numpy-like, bytes, or str
-    tname = type(value).__name__
-    if tname == "UInt8Array":
-        return value.to_numpy().tobytes().decode("utf-8")
-    if hasattr(value, "tobytes"):
-        return value.tobytes().decode("utf-8")
-    if isinstance(value, bytes):
-        return value.decode("utf-8")
-    if isinstance(value, str):
-        return value
-    raise TypeError(f"Unsupported value type: {type(value)}")
+        with self.mani_lock:
+            if arm_mode is not None:
+                self.mani_ctrl.armMode = arm_mode
+            if finger_mode is not None:
+                self.mani_ctrl.fingerMode = finger_mode
+            if neck_mode is not None:
+                self.mani_ctrl.neckMode = neck_mode
+            if lumbar_mode is not None:
+                self.mani_ctrl.lumbarMode = lumbar_mode
 
 
 def main() -> None:
     node = Node()
-    client = SimUdpClient()
+    # LOONG_SDK_RECORD=/path/run.lrec enables capture of all chassis/mani UDP frames
+    # SIM_CHASSIS_TELEOP_HZ sets the stream rate used while TELEOP samples keep arriving
+    client = SimUdpClient(recorder=recorderFromEnv(),
+                          teleop_hz=float(os.environ.get("SIM_CHASSIS_TELEOP_HZ", "50")))
     try:
         for event in node:
             if event["type"] != "INPUT":
@@ -237,96 +383,100 @@ def main() -> None:
             event_id = event["id"]
             raw_value = event["value"]
             try:
-                value = json.loads(_decode_event_value(raw_value))
+                # tick only flushes queued statuses below; its payload is not needed
+                value = decode_event(raw_value) if event_id != "tick" else {}
             except Exception:
                 value = {}
 
             # Handle chassis MOVE command
             if event_id == "chassis_command":
                 action = value.get("action")
-                if action == "MOVE":
+                if action in ("MOVE", "TELEOP"):
                     target = value.get("target", {})
-                    client.linear_x = float(target.get("x", 0.0))
-                    client.linear_y = float(target.get("y", 0.0))
-                    client.yaw_rate = float(target.get("wz", 0.0))
-                    client._update_velocity_bytes()
-                    # Start key like UI: [6] start
-                    client._set_key(6, clear_velocity=False)
-                    node.send_output("chassis_status", json.dumps({"action": "MOVE_COMPLETE", "status": "SUCCESS"}).encode())
+                    # Start key like UI: [6] start; velocity and key go out in one frame
+                    client.set_velocity(float(target.get("x", 0.0)), float(target.get("y", 0.0)),
+                                        float(target.get("wz", 0.0)), key=6, teleop=action == "TELEOP")
+                    # Joystick-style TELEOP streams are fire-and-forget
+                    if action == "MOVE":
+                        node.send_output("chassis_status", encode(CHASSIS_STATUS, {"action": "MOVE_COMPLETE", "status": "SUCCESS"}))
 
             # Handle joint control (simulate immediate success)
             elif event_id == "joint_command":
                 action = value.get("action")
                 if action == "JOINT_CONTROL":
                     # Mirror UI behavior by switching to jntSdk mode key [23]
-                    client._set_key(23, clear_velocity=True)
-                    node.send_output("joint_status", json.dumps({"action": "JOINT_CONTROL", "status": "SUCCESS"}).encode())
+                    client.set_key(23, clear_velocity=True)
+                    node.send_output("joint_status", encode(JOINT_STATUS, {"action": "JOINT_CONTROL", "status": "SUCCESS"}))
 
             # Handle manipulation commands using real SDK
             elif event_id == "mani_command":
-                action = value.get("action")
-                if action == "GRAB":
-                    # Set grab position for both arms
-                    client.set_arm_position(
-                        left_arm=[0.3, 0.2, 0.0, 0, 0, 0, 0.5],  # Grab position
-                        right_arm=[0.3, -0.2, 0.0, 0, 0, 0, 0.5]
-                    )
-                    # Close fingers
-                    client.set_finger_control(
-                        left_fingers=[50, 50, 50, 50, 50, 50],  # Close all fingers
-                        right_fingers=[50, 50, 50, 50, 50, 50]
-                    )
-                    # Set pending command to wait for real feedback
-                    client._pending_mani_command = "GRAB"
-                    print("GRAB命令已发送，等待真实反馈...")
+                # All fields of one command reach the I/O loop's snapshot together
+                with client.mani_lock:
+                    action = value.get("action")
+                    if action == "GRAB":
+                        # Set grab position for both arms
+                        client.set_arm_position(
+                            left_arm=[0.3, 0.2, 0.0, 0, 0, 0, 0.5],  # Grab position
+                            right_arm=[0.3, -0.2, 0.0, 0, 0, 0, 0.5]
+                        )
+                        # Close fingers
+                        client.set_finger_control(
+                            left_fingers=[50, 50, 50, 50, 50, 50],  # Close all fingers
+                            right_fingers=[50, 50, 50, 50, 50, 50]
+                        )
+                        # Wait for real feedback: fingers closed, tips at the grab pose, arms at rest
+                        client.begin_mani_command("GRAB")
+                        print("GRAB命令已发送，等待真实反馈...")
                     
-                elif action == "RETURN":
-                    # Return to home position
-                    client.set_arm_position(
-                        left_arm=[0.4, 0.4, 0.1, 0, 0, 0, 0.5],  # Home position
-                        right_arm=[0.2, -0.4, 0.1, 0, 0, 0, 0.5]
-                    )
-                    # Open fingers
-                    client.set_finger_control(
-                        left_fingers=[0, 0, 0, 0, 0, 0],  # Open all fingers
-                        right_fingers=[0, 0, 0, 0, 0, 0]
-                    )
-                    # Set pending command to wait for real feedback
-                    client._pending_mani_command = "RETURN"
-                    print("RETURN命令已发送，等待真实反馈...")
+                    elif action == "RETURN":
+                        # Return to home position
+                        client.set_arm_position(
+                            left_arm=[0.4, 0.4, 0.1, 0, 0, 0, 0.5],  # Home position
+                            right_arm=[0.2, -0.4, 0.1, 0, 0, 0, 0.5]
+                        )
+                        # Open fingers
+                        client.set_finger_control(
+                            left_fingers=[0, 0, 0, 0, 0, 0],  # Open all fingers
+                            right_fingers=[0, 0, 0, 0, 0, 0]
+                        )
+                        # Wait for real feedback: tips back home, fingers open, arms at rest
+                        client.begin_mani_command("RETURN")
+                        print("RETURN命令已发送，等待真实反馈...")
                     
-                elif action == "MANI_CONTROL":
-                    # Handle custom manipulation control
-                    target = value.get("target", {})
+                    elif action == "MANI_CONTROL":
+                        # Handle custom manipulation control
+                        target = value.get("target", {})
                     
-                    # Set arm positions if provided
-                    if "left_arm" in target:
-                        client.set_arm_position(left_arm=target["left_arm"])
-                    if "right_arm" in target:
-                        client.set_arm_position(right_arm=target["right_arm"])
+                        # Set arm positions if provided
+                        if "left_arm" in target:
+                            client.set_arm_position(left_arm=target["left_arm"])
+                        if "right_arm" in target:
+                            client.set_arm_position(right_arm=target["right_arm"])
                     
-                    # Set finger control if provided
-                    if "left_fingers" in target:
-                        client.set_finger_control(left_fingers=target["left_fingers"])
-                    if "right_fingers" in target:
-                        client.set_finger_control(right_fingers=target["right_fingers"])
+                        # Set finger control if provided
+                        if "left_fingers" in target:
+                            client.set_finger_control(left_fingers=target["left_fingers"])
+                        if "right_fingers" in target:
+                            client.set_finger_control(right_fingers=target["right_fingers"])
                     
-                    # Set control modes if provided
-                    if "arm_mode" in target:
-                        client.set_mani_mode(arm_mode=target["arm_mode"])
-                    if "finger_mode" in target:
-                        client.set_mani_mode(finger_mode=target["finger_mode"])
+                        # Set control modes if provided
+                        if "arm_mode" in target:
+                            client.set_mani_mode(arm_mode=target["arm_mode"])
+                        if "finger_mode" in target:
+                            client.set_mani_mode(finger_mode=target["finger_mode"])
                     
-                    # Set pending command with timeout
-                    client._pending_mani_command = "MANI_CONTROL"
-                    client._mani_command_timeout = 50  # 1 second timeout (50 * 0.02s)
-                    print("MANI_CONTROL命令已发送，等待真实反馈...")
+                        # Wait until the custom targets are reached
+                        client.begin_mani_command("MANI_CONTROL")
+                        print("MANI_CONTROL命令已发送，等待真实反馈...")
             
-            # Check for pending status updates from mani feedback
-            if client._pending_status is not None:
-                status = client._pending_status
-                client._pending_status = None
-                node.send_output("mani_status", json.dumps(status).encode())
+            # Publish every mani status queued by the I/O thread (tick input keeps this flowing
+            # while no commands arrive)
+            while True:
+                try:
+                    status = client.status_queue.get_nowait()
+                except queue.Empty:
+                    break
+                node.send_output("mani_status", encode(MANI_STATUS, status))
                 print(f"发送真实mani状态: {status}")
     finally:
         client.shutdown()
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import pytest
+
+from sim_udp_client import ChassisCommandChannel
+
+
+class _Transport:
+    def __init__(self):
+        self.frames = []
+
+    def sendto(self, frame):
+        self.frames.append(frame)
+
+
+def _run_channel(script, teleop_timeout_s=0.05):
+    """Run the sender loop while script(channel) drives updates; returns (channel, transport)"""
+    channel = ChassisCommandChannel(bytearray(96), keepalive_s=0.02, min_interval_s=0.0,
+                                    teleop_hz=100.0, teleop_timeout_s=teleop_timeout_s)
+    transport = _Transport()
+    stop = threading.Event()
+
+    async def main():
+        sender = asyncio.create_task(channel.run(transport, stop))
+        await asyncio.sleep(0.01)
+        await script(channel)
+        stop.set()
+        channel.close()
+        await sender
+
+    asyncio.run(main())
+    return channel, transport
+
+
+def _velocity(frame):
+    probe = ChassisCommandChannel(bytearray(frame))
+    return probe.velocity()
+
+
+def test_teleop_dead_man_zeroes_velocity():
+    async def script(channel):
+        channel.update(1.0, 0.0, 0.0, teleop=True)
+        await asyncio.sleep(0.15)
+
+    channel, transport = _run_channel(script)
+    assert channel.velocity() == (0.0, 0.0, 0.0)
+    assert _velocity(transport.frames[-1]) == (0.0, 0.0, 0.0)
+
+
+def test_move_right_after_teleop_is_not_zeroed():
+    async def script(channel):
+        channel.update(1.0, 0.0, 0.0, teleop=True)
+        channel.update(0.5, 0.0, 0.0)
+        # Well past the teleop dead-man timeout
+        await asyncio.sleep(0.15)
+
+    channel, transport = _run_channel(script)
+    assert channel.velocity() == pytest.approx((0.5, 0.0, 0.0))
+    assert _velocity(transport.frames[-1]) == pytest.approx((0.5, 0.0, 0.0))
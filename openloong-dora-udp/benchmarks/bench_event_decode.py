@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+dora 事件负载解码基准
+对比各节点原先内联的 UInt8Array/tobytes/bytes/str 解码阶梯与 workflow/dora_payload.decode_event：
+    next_action   小 JSON 文本（UInt8Array）
+    joint_status  原 JSON 文本（含 31 关节数组） vs Arrow 结构
+    bytes         bytes 负载的 JSON 文本
+
+用法: python benchmarks/bench_event_decode.py [--events 100000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "workflow"))
+from dora_payload import decode_event
+from dora_schemas import encode, JOINT_STATUS
+
+
+def legacy_decode(value):
+    """原各节点内联的解码阶梯"""
+    if type(value).__name__ == "UInt8Array":
+        value = value.to_numpy().tobytes().decode("utf-8")
+    elif hasattr(value, "tobytes"):
+        value = value.tobytes().decode("utf-8")
+    elif isinstance(value, bytes):
+        value = value.decode("utf-8")
+    elif isinstance(value, str):
+        pass
+    else:
+        raise TypeError(f"未知类型: {type(value)}")
+    return json.loads(value)
+
+
+def make_joint_status(jnt_num):
+    rng = np.random.default_rng(0)
+    return {
+        "action": "JOINT_CONTROL",
+        "status": "SUCCESS",
+        "timestamp": time.time(),
+        "joint_angles": rng.standard_normal(jnt_num).astype(np.float32),
+        "target_angles": rng.standard_normal(jnt_num).astype(np.float32),
+        "joint_velocities": rng.standard_normal(jnt_num).astype(np.float32),
+        "joint_torques": rng.standard_normal(jnt_num).astype(np.float32),
+        "finger_left": np.zeros(3, np.float32),
+        "finger_right": np.zeros(3, np.float32),
+        "drv_temp": np.full(jnt_num, 30, np.int16),
+        "drv_state": np.zeros(jnt_num, np.int16),
+        "drv_error": np.zeros(jnt_num, np.int16),
+    }
+
+
+def as_json_array(record):
+    """原 JSON 发送方式，dora 侧收到的是 UInt8Array"""
+    plain = {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in record.items()}
+    return pa.array(np.frombuffer(json.dumps(plain).encode(), np.uint8))
+
+
+def bench(fn, value, events):
+    fn(value)
+    t0 = time.perf_counter()
+    for _ in range(events):
+        fn(value)
+    return (time.perf_counter() - t0) / events * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dora 事件负载解码基准")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--jnt-num", type=int, default=31)
+    args = parser.parse_args()
+
+    next_action = pa.array(np.frombuffer(json.dumps({"action": "MOVE_COMPLETE"}).encode(), np.uint8))
+    next_action_bytes = json.dumps({"action": "MOVE_COMPLETE"}).encode()
+    status = make_joint_status(args.jnt_num)
+    status_json = as_json_array(status)
+    status_arrow = encode(JOINT_STATUS, status)
+
+    assert legacy_decode(next_action) == decode_event(next_action)
+    assert np.allclose(legacy_decode(status_json)["joint_angles"], decode_event(status_arrow)["joint_angles"])
+
+    rows = [
+        ("next_action UInt8Array", bench(legacy_decode, next_action, args.events), bench(decode_event, next_action, args.events)),
+        ("next_action bytes", bench(legacy_decode, next_action_bytes, args.events), bench(decode_event, next_action_bytes, args.events)),
+        ("joint_status JSON", bench(legacy_decode, status_json, args.events), bench(decode_event, status_json, args.events)),
+        ("joint_status JSON -> Arrow", bench(legacy_decode, status_json, args.events), bench(decode_event, status_arrow, args.events)),
+    ]
+    print(f"{args.events} 次/项，单位 us/事件")
+    print(f"{'负载':<28}{'原解码阶梯':>12}{'decode_event':>14}{'加速比':>8}")
+    for name, before, after in rows:
+        print(f"{name:<28}{before:>12.2f}{after:>14.2f}{before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+多客户端替身服务端(servers/fleet_server.py)负载基准
+启动 FleetServer 后，以若干客户端进程模拟控制器集群：每个进程持有若干 UDP 套接字(各为一个控制器)，
+按固定频率(默认 1kHz，sdkLoopClass 调度)每周期每个控制器发一帧控制指令并收回传感帧，
+统计总应答率、往返时延分位与超时数，用于验证单机能否承载数十个 1kHz 控制器。
+
+用法: python benchmarks/bench_fleet_server.py [--controllers 32] [--procs 4] [--hz 1000] [--workers 4]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servers"))
+from fleet_server import FleetServer
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkCtrlDataClass
+from sdk.loong_mani_sdk.loong_mani_sdk_udp import maniSdkCtrlDataClass
+from sdk.loong_sdk_common.loong_sdk_loop import sdkLoopClass
+
+
+def control_frame(protocol):
+    if protocol == "jnt":
+        return bytes(jntSdkCtrlDataClass(31, 3, 3).packData())
+    return bytes(maniSdkCtrlDataClass(7, 3, 3, 2, 1).packData())
+
+
+def client_proc(port, controllers, hz, seconds, ctrl_buf, out):
+    socks = []
+    for _ in range(controllers):
+        sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sk.settimeout(0.05)
+        socks.append(sk)
+    addr = ("127.0.0.1", port)
+    rx = bytearray(4096)
+    rtts = []
+    lost = 0
+    loop = sdkLoopClass(hz, name="client")
+    for _ in loop.range(int(seconds * hz)):
+        t_send = time.perf_counter()
+        for sk in socks:
+            sk.sendto(ctrl_buf, addr)
+        for sk in socks:
+            try:
+                sk.recv_into(rx)
+                rtts.append(time.perf_counter() - t_send)
+            except socket.timeout:
+                lost += 1
+    out.put((rtts, lost, loop.overruns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多客户端替身服务端负载基准")
+    parser.add_argument("--protocol", choices=["jnt", "mani"], default="jnt")
+    parser.add_argument("--controllers", type=int, default=32, help="模拟控制器总数")
+    parser.add_argument("--procs", type=int, default=4, help="客户端进程数")
+    parser.add_argument("--hz", type=float, default=1000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=4, help="服务端工作进程数")
+    parser.add_argument("--port", type=int, default=18200)
+    args = parser.parse_args()
+
+    server = FleetServer(args.protocol, port=args.port, workers=args.workers, log_interval=0)
+    server.start()
+    time.sleep(0.5)
+    ctrl_buf = control_frame(args.protocol)
+    out = mp.Queue()
+    per_proc = [args.controllers // args.procs + (i < args.controllers % args.procs) for i in range(args.procs)]
+    procs = [mp.Process(target=client_proc, args=(args.port, n, args.hz, args.seconds, ctrl_buf, out))
+             for n in per_proc if n]
+    try:
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        server.stop()
+
+    rtts = np.concatenate([np.asarray(r[0]) for r in results]) * 1e6
+    lost = sum(r[1] for r in results)
+    overruns = sum(r[2] for r in results)
+    expected = args.controllers * args.hz * args.seconds
+    p50, p99 = np.percentile(rtts, (50, 99)) if len(rtts) else (0, 0)
+    print(f"{args.protocol} {args.controllers} 控制器 x {args.hz:.0f}Hz，服务端 {args.workers} 进程，客户端 {len(procs)} 进程")
+    print(f"应答 {len(rtts) / args.seconds:.0f}/s（目标 {expected / args.seconds:.0f}/s，完成率 {len(rtts) / expected:.1%}），"
+          f"往返 p50 {p50:.0f}us p99 {p99:.0f}us，超时 {lost}，客户端周期超时 {overruns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+关节 UDP SDK(ctypes 封装 libloong_jnt_sdk_udp)收发开销与首帧等待基准
+    空转  无新数据报时 recv 单次耗时：原 getSens(bytes)+整帧解码 vs 按返回值跳过解码
+    新帧  服务端应答后 recv 单次耗时(含排空与解码)
+    首帧  LoongJntServer 独立进程就绪后，原 0.5s 轮询 waitSens 与指数退避轮询(0.5ms 起，上限 5ms)的首帧耗时
+
+用法: python benchmarks/bench_jnt_sdk_udp.py [--frames 50000]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servers"))
+from loong_jnt_server import LoongJntServer
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkCtrlDataClass
+from sdk.loong_jnt_sdk.loong_jnt_sdk_udp import jntSdkClass
+
+
+def legacy_recv(sdk, buf):
+    """原 recv：传入不可变 bytes，不论有无新包都整帧解码"""
+    sdk.lib.getSens(buf)
+    sdk.sens.unpackData(buf)
+    return sdk.sens
+
+
+def legacy_wait(sdk, ctrl):
+    """原 waitSens：发一帧后每 0.5s 轮询一次"""
+    sdk.send(ctrl)
+    while True:
+        time.sleep(0.5)
+        if legacy_recv(sdk, bytes(2048)).timestamp[0] > 0:
+            return
+
+
+def serve(port):
+    sys.stdout = open(os.devnull, "w")
+    LoongJntServer(port=port, log_interval=-1).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关节 UDP SDK 收发开销与首帧等待基准")
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--port", type=int, default=18460)
+    args = parser.parse_args()
+
+    proc = mp.Process(target=serve, args=(args.port,), daemon=True)
+    proc.start()
+    time.sleep(0.5)
+    try:
+        # lib 内只有一个全局 udp 客户端，全程复用同一 SDK 对象
+        sdk = jntSdkClass("127.0.0.1", args.port, 31, 3, 3)
+        ctrl = jntSdkCtrlDataClass(31, 3, 3)
+
+        t0 = time.perf_counter()
+        legacy_wait(sdk, ctrl)
+        legacy_first = time.perf_counter() - t0
+        sdk.recv()
+        t0 = time.perf_counter()
+        sdk.waitSens(ctrl)
+        first = time.perf_counter() - t0
+
+        old = bytes(2048)
+        t0 = time.perf_counter()
+        for _ in range(args.frames):
+            legacy_recv(sdk, old)
+        legacy_idle = (time.perf_counter() - t0) / args.frames * 1e6
+        t0 = time.perf_counter()
+        for _ in range(args.frames):
+            sdk.recv()
+        idle = (time.perf_counter() - t0) / args.frames * 1e6
+
+        cycles = args.frames // 10
+        cost = 0.0
+        seq = sdk.sensSeq
+        for _ in range(cycles):
+            sdk.send(ctrl)
+            time.sleep(0.001)
+            t0 = time.perf_counter()
+            sdk.recv()
+            cost += time.perf_counter() - t0
+        fresh = (sdk.sensSeq - seq) / cycles
+    finally:
+        proc.terminate()
+
+    print(f"空转 recv: 原整帧解码 {legacy_idle:.2f} us/次，按返回值跳过 {idle:.2f} us/次，加速 {legacy_idle / idle:.1f}x")
+    print(f"新帧 recv: {cost / cycles * 1e6:.2f} us/次（新帧占比 {fresh:.0%}）")
+    print(f"首帧等待: 原 0.5s 轮询 {legacy_first * 1e3:.1f} ms，退避轮询 {first * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
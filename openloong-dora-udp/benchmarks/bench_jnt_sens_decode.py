@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+关节传感数据帧解码基准
+对比原逐段struct.unpack解码路径与结构化dtype单次frombuffer解码路径
+
+用法: python benchmarks/bench_jnt_sens_decode.py [--frames 100000]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkSensDataClass
+
+
+class LegacyJntSensDecoder:
+    """原unpackData实现：22段格式串逐段struct.unpack，每字段新建np.array"""
+
+    def __init__(self, jnt_num, finger_dof_left, finger_dof_right):
+        self.names = ['size', 'timestamp', 'key', 'planName', 'state', 'joy',
+                      'rpy', 'gyr', 'acc', 'actJ', 'actW', 'actT',
+                      'drvTemp', 'drvState', 'drvErr', 'tgtJ', 'tgtW', 'tgtT',
+                      'actFingerLeft', 'actFingerRight', 'tgtFingerLeft', 'tgtFingerRight']
+        self.fmts = ['i', 'd', '2h', '16s', '2h', '4f']
+        self.fmts.extend(['3f'] * 3)
+        self.fmts.extend([f'{jnt_num}f'] * 3)
+        self.fmts.extend([f'{jnt_num}h'] * 3)
+        self.fmts.extend([f'{jnt_num}f'] * 3)
+        self.fmts.extend([f'{finger_dof_left}f', f'{finger_dof_right}f',
+                          f'{finger_dof_left}f', f'{finger_dof_right}f'])
+        self.sizes = [struct.calcsize(it) for it in self.fmts]
+        for name in self.names:
+            setattr(self, name, None)
+
+    def unpackData(self, buf):
+        keys = list(self.__dict__.keys())[3:]
+        idx = 0
+        for i in range(len(self.fmts)):
+            setattr(self, keys[i], np.array(struct.unpack(self.fmts[i], buf[idx:idx + self.sizes[i]])))
+            idx += self.sizes[i]
+        self.planName = self.planName.tobytes().decode('utf-8')
+
+
+def make_frame(jnt_num, finger_dof_left, finger_dof_right):
+    sens = jntSdkSensDataClass(jnt_num, finger_dof_left, finger_dof_right)
+    sens.size = len(sens.getBuf())
+    sens.timestamp = time.time()
+    sens.planName = "bench"
+    sens.actJ = np.arange(jnt_num) * 0.1
+    sens.drvTemp = np.arange(jnt_num) + 30
+    return bytes(sens.getBuf())
+
+
+def bench(decoder, buf, frames):
+    decoder.unpackData(buf)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        decoder.unpackData(buf)
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    for _ in range(1000):
+        decoder.unpackData(buf)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / frames * 1e6, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关节传感数据帧解码基准")
+    parser.add_argument("--frames", type=int, default=100000)
+    parser.add_argument("--jnt-num", type=int, default=31)
+    parser.add_argument("--finger-dof", type=int, default=6)
+    args = parser.parse_args()
+
+    buf = make_frame(args.jnt_num, args.finger_dof, args.finger_dof)
+    legacy = LegacyJntSensDecoder(args.jnt_num, args.finger_dof, args.finger_dof)
+    fast = jntSdkSensDataClass(args.jnt_num, args.finger_dof, args.finger_dof)
+
+    legacy_us, legacy_peak = bench(legacy, buf, args.frames)
+    fast_us, fast_peak = bench(fast, buf, args.frames)
+
+    assert np.allclose(legacy.actJ, fast.actJ) and legacy.timestamp[0] == fast.timestamp[0]
+    print(f"帧长 {len(buf)} 字节，{args.frames} 帧")
+    print(f"struct逐段解码:   {legacy_us:8.2f} us/帧  峰值分配 {legacy_peak} B")
+    print(f"结构化dtype解码:  {fast_us:8.2f} us/帧  峰值分配 {fast_peak} B")
+    print(f"加速比: {legacy_us / fast_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
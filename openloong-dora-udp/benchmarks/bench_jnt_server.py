@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+关节服务端(LoongJntServer)应答吞吐基准
+    生成  原逐字段列表推导重建传感帧 vs 模板原地写入(关节模型推进+时间戳)，单帧耗时
+    解析  原逐包新建控制帧对象、只读头部 vs 复用对象整帧解码并送入关节模型，单帧耗时
+    UDP   服务端独立进程(日志关闭)，N 个客户端套接字各自闭环收发，统计总应答率与往返时延分位
+
+用法: python benchmarks/bench_jnt_server.py [--clients 4] [--seconds 3]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import socket
+import struct
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servers"))
+from loong_jnt_server import LoongJntServer
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkCtrlDataClass
+
+
+def legacy_generate(server):
+    """原 generate_jnt_sens_data：每帧以列表推导重建全部字段"""
+    sens, jnt_num = server.sens, server.jnt_num
+    sens.size = np.int32(1024)
+    sens.timestamp = np.float64(time.time())
+    sens.key = np.array([1, 2], np.int16)
+    sens.planName = "jnt_plan"
+    sens.state = np.array([0, 1], np.int16)
+    sens.joy = np.array([0.1, -0.2, 0.3, -0.4], np.float32)
+    sens.rpy = np.array([0.05, -0.02, 0.01], np.float32)
+    sens.gyr = np.array([0.01, 0.02, -0.01], np.float32)
+    sens.acc = np.array([9.8, 0.1, -0.2], np.float32)
+    sens.actJ = np.array([i * 0.1 + 0.01 for i in range(jnt_num)], np.float32)
+    sens.actW = np.array([0.02 * i for i in range(jnt_num)], np.float32)
+    sens.actT = np.array([0.5 * i for i in range(jnt_num)], np.float32)
+    sens.tgtJ = np.array([i * 0.1 for i in range(jnt_num)], np.float32)
+    sens.tgtW = np.array([0.02 * i for i in range(jnt_num)], np.float32)
+    sens.tgtT = np.array([0.5 * i for i in range(jnt_num)], np.float32)
+    sens.drvTemp = np.array([30 + i for i in range(jnt_num)], np.int16)
+    sens.drvState = np.array([0] * jnt_num, np.int16)
+    sens.drvErr = np.array([0] * jnt_num, np.int16)
+    sens.actFingerLeft = np.array([0.3, 0.3, 0.3], np.float32)
+    sens.actFingerRight = np.array([0.2, 0.2, 0.2], np.float32)
+    sens.tgtFingerLeft = np.array([0.3, 0.3, 0.3], np.float32)
+    sens.tgtFingerRight = np.array([0.2, 0.2, 0.2], np.float32)
+    return bytes(sens.packData())
+
+
+def legacy_parse(server, ctrl_buf):
+    """原 parse_control_command：逐包新建控制帧对象，只解析头部与两个系数"""
+    if len(ctrl_buf) < 12:
+        return None
+    base_ctrl = struct.unpack('2hi', ctrl_buf[:8])
+    ctrl = jntSdkCtrlDataClass(server.jnt_num, server.finger_dof_left, server.finger_dof_right)
+    ctrl.checker = base_ctrl[0]
+    ctrl.size = base_ctrl[1]
+    ctrl.state = base_ctrl[2]
+    tor_filt = struct.unpack('ff', ctrl_buf[8:16])
+    ctrl.torLimitRate = tor_filt[0]
+    ctrl.filtRate = tor_filt[1]
+    return ctrl
+
+
+def bench_parse(server, ctrl_buf, frames):
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        legacy_parse(server, ctrl_buf)
+    legacy = (time.perf_counter() - t0) / frames * 1e6
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        server.parse_control_command(ctrl_buf)
+    current = (time.perf_counter() - t0) / frames * 1e6
+    return legacy, current
+
+
+def bench_generate(server, frames):
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        legacy_generate(server)
+    legacy = (time.perf_counter() - t0) / frames * 1e6
+    server.build_sens_template()
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        server.generate_jnt_sens_data()
+    template = (time.perf_counter() - t0) / frames * 1e6
+    return legacy, template
+
+
+def serve(port):
+    LoongJntServer(port=port, log_interval=-1).run()
+
+
+def bench_udp(port, clients, seconds, ctrl_buf):
+    socks = []
+    for _ in range(clients):
+        sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sk.settimeout(0.5)
+        socks.append(sk)
+    addr = ("127.0.0.1", port)
+    rx = bytearray(2048)
+    rtts = []
+    lost = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        # 各客户端同时有一帧在途，逐个收回
+        t_send = time.perf_counter()
+        for sk in socks:
+            sk.sendto(ctrl_buf, addr)
+        for sk in socks:
+            try:
+                sk.recv_into(rx)
+                rtts.append(time.perf_counter() - t_send)
+            except socket.timeout:
+                lost += 1
+    rtts = np.array(rtts) * 1e6
+    return len(rtts) / seconds, np.percentile(rtts, (50, 99)), lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关节服务端应答吞吐基准")
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=18081)
+    args = parser.parse_args()
+
+    server = LoongJntServer(port=args.port + 1, log_interval=-1)
+    legacy, template = bench_generate(server, args.frames)
+    print(f"传感帧生成: 原逐字段重建 {legacy:.2f} us/帧, 模板原地写入 {template:.2f} us/帧, 加速 {legacy / template:.1f}x")
+
+    ctrl_buf = bytes(jntSdkCtrlDataClass(server.jnt_num, server.finger_dof_left, server.finger_dof_right).packData())
+    legacy, current = bench_parse(server, ctrl_buf, args.frames)
+    print(f"控制帧解析: 原逐包新建对象 {legacy:.2f} us/帧, 复用对象整帧解码 {current:.2f} us/帧, 加速 {legacy / current:.1f}x")
+    server.sk.close()
+
+    proc = mp.Process(target=serve, args=(args.port,), daemon=True)
+    proc.start()
+    time.sleep(0.5)
+    try:
+        rate, (p50, p99), lost = bench_udp(args.port, args.clients, args.seconds, ctrl_buf)
+    finally:
+        proc.terminate()
+    print(f"UDP 闭环 {args.clients} 客户端: {rate:.0f} 应答/s（每客户端 {rate / args.clients:.0f}/s），"
+          f"往返 p50 {p50:.0f}us p99 {p99:.0f}us，超时 {lost}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+关节 SDK 纯Python共享内存传输(loong_sdk_shm，seqlock) vs UDP 单机基准
+    原语  同进程 seqlock 整帧写入/读取与 sendto/recv_into 回环的单帧耗时
+    UDP   LoongJntServer 独立进程，jntSdk 帧逐包请求-应答，往返时延分位
+    SHM   LoongJntServer --shm 独立进程按 --hz 发布，客户端同频 send+recv：单周期耗时、新帧占比、传感帧时龄分位
+
+用法: python benchmarks/bench_jnt_shm.py [--hz 1000] [--seconds 3]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servers"))
+from loong_jnt_server import LoongJntServer
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkCtrlDataClass, jntSdkSensDataClass
+from sdk.loong_jnt_sdk.loong_jnt_sdk_shm import jntSdkClass
+from sdk.loong_sdk_common.loong_sdk_loop import sdkLoopClass
+from sdk.loong_sdk_common.loong_sdk_shm import sdkSeqlockShmClass, shmPath
+
+
+def bench_primitives(name, frames):
+    sens = jntSdkSensDataClass(31, 3, 3)
+    buf = sens.packData()
+    rx = bytearray(len(buf))
+    remove_segment(name)
+    shm = sdkSeqlockShmClass(name, 16, len(buf))
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        shm.sens.write(buf)
+        shm.sens.read(rx)
+    seqlock = (time.perf_counter() - t0) / frames * 1e6
+    shm.close()
+    shm.unlink()
+    rx_sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx_sk.bind(("127.0.0.1", 0))
+    tx_sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    addr = rx_sk.getsockname()
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        tx_sk.sendto(buf, addr)
+        rx_sk.recv_into(rx)
+    udp = (time.perf_counter() - t0) / frames * 1e6
+    return seqlock, udp, len(buf)
+
+
+def remove_segment(name):
+    if os.path.exists(shmPath(name)):
+        os.unlink(shmPath(name))
+
+
+def serve_udp(port):
+    LoongJntServer(port=port, log_interval=-1).run()
+
+
+def serve_shm(port, name, hz):
+    LoongJntServer(port=port, log_interval=-1).run_shm(name, hz)
+
+
+def bench_udp(port, seconds):
+    sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sk.settimeout(0.5)
+    ctrl = jntSdkCtrlDataClass(31, 3, 3).packData()
+    rx = bytearray(2048)
+    rtts = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        sk.sendto(ctrl, ("127.0.0.1", port))
+        try:
+            sk.recv_into(rx)
+        except socket.timeout:
+            continue
+        rtts.append(time.perf_counter() - t0)
+    return np.array(rtts) * 1e6
+
+
+def bench_shm(name, hz, seconds):
+    sdk = jntSdkClass(31, 3, 3, shmName=name)
+    ctrl = jntSdkCtrlDataClass(31, 3, 3)
+    ctrl.state = 1
+    costs, ages = [], []
+    fresh = 0
+    loop = sdkLoopClass(hz, name="shm_client")
+    cycles = int(seconds * hz)
+    for _ in loop.range(cycles):
+        t0 = time.perf_counter()
+        seq = sdk.sensSeq
+        sdk.send(ctrl)
+        sens = sdk.recv()
+        costs.append(time.perf_counter() - t0)
+        if sdk.sensSeq != seq:
+            fresh += 1
+            ages.append(time.time() - sens.timestamp[0])
+    sdk.shm.close()
+    return np.array(costs) * 1e6, np.array(ages) * 1e6, fresh / cycles, loop.overruns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关节 SDK 共享内存 vs UDP 单机基准")
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--hz", type=float, default=1000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=18420)
+    parser.add_argument("--name", default="bench_jnt_shm")
+    args = parser.parse_args()
+
+    seqlock, udp, size = bench_primitives(args.name + "_prim", args.frames)
+    print(f"原语: 传感帧 {size}B，seqlock 写+读 {seqlock:.2f} us/帧，UDP 回环 sendto+recv_into {udp:.2f} us/帧")
+
+    proc = mp.Process(target=serve_udp, args=(args.port,), daemon=True)
+    proc.start()
+    time.sleep(0.5)
+    try:
+        rtts = bench_udp(args.port, args.seconds)
+    finally:
+        proc.terminate()
+    p50, p99 = np.percentile(rtts, (50, 99))
+    print(f"UDP: 请求-应答 {len(rtts) / args.seconds:.0f}/s，往返 p50 {p50:.0f}us p99 {p99:.0f}us")
+
+    remove_segment(args.name)
+    proc = mp.Process(target=serve_shm, args=(args.port + 1, args.name, args.hz), daemon=True)
+    proc.start()
+    time.sleep(0.5)
+    try:
+        costs, ages, fresh, overruns = bench_shm(args.name, args.hz, args.seconds)
+    finally:
+        proc.terminate()
+        remove_segment(args.name)
+    c50, c99 = np.percentile(costs, (50, 99))
+    a50, a99 = np.percentile(ages, (50, 99)) if len(ages) else (0, 0)
+    print(f"SHM: {args.hz:.0f}Hz send+recv p50 {c50:.1f}us p99 {c99:.1f}us，新帧占比 {fresh:.0%}，"
+          f"传感帧时龄 p50 {a50:.0f}us p99 {a99:.0f}us，客户端周期超时 {overruns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+多机批量 SDK 门面(sdk/loong_sdk_common/loong_sdk_fleet.py) vs N 个单机 maniSdkClass 基准
+独立进程在 N 个端口上模拟 N 台操作机器人(收到控制帧即回一帧传感帧)，客户端每周期：
+    逐台  N 个 maniSdkClass，Python 循环逐台计算命令、send，再逐台 recv 直到收齐
+    批量  一个 sdkFleetClass，一条 NumPy 表达式算出 N 台命令，一次 sendmmsg 发出，recvmmsg 排空并整批解码
+统计每周期客户端 CPU 耗时(不含等待服务端的时间)与收齐率。
+
+用法: python benchmarks/bench_sdk_fleet.py [--robots 16] [--cycles 2000]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import selectors
+import socket
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servers"))
+from sim_server import fill_sim_sens_template
+from sdk.loong_mani_sdk.loong_mani_sdk_udp import maniSdkClass, maniSdkCtrlDataClass, maniSdkSensDataClass
+from sdk.loong_sdk_common.loong_sdk_fleet import sdkFleetClass
+
+DIMS = (12, 3, 3)
+CTRL_DIMS = (7, 3, 3, 2, 1)
+GAIN = 0.1
+
+
+def serve(base_port, robots):
+    sens = maniSdkSensDataClass(*DIMS)
+    fill_sim_sens_template(sens, DIMS[0])
+    buf = sens.packData()
+    sel = selectors.DefaultSelector()
+    for i in range(robots):
+        sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sk.bind(("127.0.0.1", base_port + i))
+        sk.setblocking(False)
+        sel.register(sk, selectors.EVENT_READ)
+    rx = bytearray(4096)
+    while True:
+        for key, _ in sel.select():
+            while True:
+                try:
+                    _, addr = key.fileobj.recvfrom_into(rx)
+                except BlockingIOError:
+                    break
+                sens.timestamp = time.time()
+                key.fileobj.sendto(buf, addr)
+
+
+def bench_single(addrs, cycles, target):
+    sdks = [maniSdkClass(ip, port, *DIMS) for ip, port in addrs]
+    ctrls = [maniSdkCtrlDataClass(*CTRL_DIMS) for _ in addrs]
+    cpu = 0.0
+    complete = 0
+    for _ in range(cycles):
+        t0 = time.process_time()
+        for sdk, ctrl in zip(sdks, ctrls):
+            ctrl.armCmd[0] += GAIN * (target - ctrl.armCmd[0])
+            sdk.send(ctrl)
+        got = 0
+        deadline = time.monotonic() + 0.05
+        for sdk in sdks:
+            _, seq, _ = sdk.recvTagged(max(0.0, deadline - time.monotonic()))
+            got += seq > 0
+            sdk.sensSeq = 0
+        cpu += time.process_time() - t0
+        complete += got == len(sdks)
+    for sdk in sdks:
+        sdk.sk.close()
+    return cpu / cycles, complete / cycles
+
+
+def bench_fleet(addrs, cycles, target):
+    fleet = sdkFleetClass(addrs, maniSdkCtrlDataClass(*CTRL_DIMS), maniSdkSensDataClass(*DIMS))
+    arm = fleet.ctrl["armCmd"][:, 0]
+    cpu = 0.0
+    complete = 0
+    got = np.zeros(fleet.num, bool)
+    for _ in range(cycles):
+        t0 = time.process_time()
+        arm += GAIN * (target - arm)
+        fleet.send()
+        got[:] = False
+        deadline = time.monotonic() + 0.05
+        while not got.all():
+            wait = deadline - time.monotonic()
+            if wait <= 0:
+                break
+            got[fleet.recv(wait)] = True
+        cpu += time.process_time() - t0
+        complete += got.all()
+    mmsg = fleet._sendmmsg is not None
+    fleet.close()
+    return cpu / cycles, complete / cycles, mmsg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多机批量 SDK 门面 vs 逐台 SDK 基准")
+    parser.add_argument("--robots", type=int, default=16)
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=18500)
+    args = parser.parse_args()
+
+    addrs = [("127.0.0.1", args.port + i) for i in range(args.robots)]
+    target = np.array([0.3, 0.2, 0.2, 0, 0, 0, 0.4], np.float32)
+    proc = mp.Process(target=serve, args=(args.port, args.robots), daemon=True)
+    proc.start()
+    time.sleep(0.5)
+    try:
+        single, single_ok = bench_single(addrs, args.cycles, target)
+        fleet, fleet_ok, mmsg = bench_fleet(addrs, args.cycles, target)
+    finally:
+        proc.terminate()
+
+    print(f"{args.robots} 台 x {args.cycles} 周期，客户端 CPU 耗时/周期：")
+    print(f"  逐台 maniSdkClass: {single * 1e6:.0f} us（收齐率 {single_ok:.0%}）")
+    print(f"  批量 sdkFleetClass: {fleet * 1e6:.0f} us（收齐率 {fleet_ok:.0%}，"
+          f"{'sendmmsg/recvmmsg' if mmsg else '逐包收发'}），加速 {single / fleet:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+SDK 收发帧录制(sdk/loong_sdk_common/loong_sdk_record.py)开销基准
+    写入  关节控制帧/操作传感帧原始字节追加写入内存映射文件，单帧耗时(含跨 chunk 新建映射)
+    挂接  maniSdkClass 挂接录制器后每个收发周期(一帧控制+一帧传感)多出的耗时
+    读取  整文件按时间顺序遍历帧的吞吐，以及按时间区间二分定位起点的耗时
+
+用法: python benchmarks/bench_sdk_record.py [--frames 200000] [--path /tmp/bench.lrec]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkCtrlDataClass
+from sdk.loong_mani_sdk.loong_mani_sdk_udp import maniSdkClass, maniSdkCtrlDataClass, maniSdkSensDataClass
+from sdk.loong_sdk_common.loong_sdk_record import sdkRecorderClass, sdkRecordReaderClass
+
+
+def bench_write(path, frames):
+    ctrl = jntSdkCtrlDataClass(31, 3, 3).packData()
+    sens = maniSdkSensDataClass(19, 6, 6).packData()
+    with sdkRecorderClass(path) as rec:
+        ch_ctrl = rec.channel("jnt.ctrl", "tx")
+        ch_sens = rec.channel("mani.sens", "rx")
+        t0 = time.perf_counter()
+        for i in range(frames):
+            if i & 1:
+                rec.write(ch_ctrl, ctrl)
+            else:
+                rec.write(ch_sens, sens)
+        cost = (time.perf_counter() - t0) / frames * 1e6
+    return cost, len(ctrl), len(sens)
+
+
+def bench_hook(path, cycles):
+    """maniSdkClass 挂接录制器后每周期多出的工作：send 记一帧控制帧、_drain 记一帧收到的数据报"""
+    sdk = maniSdkClass("127.0.0.1", 9, 19, 6, 6)
+    ctrl = maniSdkCtrlDataClass(7, 6, 6, 2, 3)
+    buf = sdk.packCtrlData(ctrl)
+    rx = sdk._rxBuf
+    n = sdk.sensSize
+    with sdkRecorderClass(path) as rec:
+        sdk.attachRecorder(rec)
+        tap = sdk.tap
+        t0 = time.perf_counter()
+        for _ in range(cycles):
+            tap.tx(ctrl, buf)
+            tap.rx(rx, n)
+        return (time.perf_counter() - t0) / cycles * 1e6
+
+
+def bench_read(path):
+    with sdkRecordReaderClass(path) as rd:
+        t0 = time.perf_counter()
+        n = sum(1 for _ in rd.frames())
+        scan = time.perf_counter() - t0
+        first, last = rd.timeRange()
+        mids = np.linspace(first, last, 200).astype(np.int64)
+        t0 = time.perf_counter()
+        for t in mids:
+            next(rd.frames(t0=int(t)), None)
+        seek = (time.perf_counter() - t0) / len(mids) * 1e6
+    return n, scan, seek
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SDK 收发帧录制开销基准")
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--cycles", type=int, default=100000)
+    parser.add_argument("--path", default="/tmp/bench_sdk_record.lrec")
+    args = parser.parse_args()
+
+    cost, ctrl_size, sens_size = bench_write(args.path, args.frames)
+    size = os.path.getsize(args.path)
+    print(f"写入: {cost:.2f} us/帧（关节控制帧 {ctrl_size}B / 操作传感帧 {sens_size}B 交替），"
+          f"文件 {size / 2**20:.1f} MiB")
+    n, scan, seek = bench_read(args.path)
+    print(f"读取: 顺序遍历 {n} 帧 {n / scan / 1e6:.2f} M帧/s，按时刻定位起点 {seek:.1f} us/次")
+
+    hook = bench_hook(args.path, args.cycles)
+    print(f"挂接: maniSdkClass 每周期录制开销(控制帧+传感帧) {hook:.2f} us")
+    os.remove(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+传感帧遥测日志(sdk/loong_sdk_common/loong_sdk_telemetry.py)基准
+    追加  关节传感帧按 1kHz 时间戳连续追加 N 小时数据，单帧耗时与落盘体积
+    查询  随机时间区间在 _t 索引上二分定位的耗时
+    读取  随机 1 分钟窗口取单列(actJ)并求均值，读取吞吐(只映射涉及的页)
+
+用法: python benchmarks/bench_telemetry.py [--hours 0.05] [--path /tmp/bench_telemetry]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkSensDataClass
+from sdk.loong_sdk_common.loong_sdk_telemetry import sdkTelemetryLogClass, sdkTelemetryReaderClass
+
+
+def bench_append(path, frames, hz):
+    sens = jntSdkSensDataClass(31, 3, 3)
+    buf = sens.getBuf()
+    t0 = 1.7e9
+    with sdkTelemetryLogClass(path, sens.getCodec()) as log:
+        start = time.perf_counter()
+        for i in range(frames):
+            sens.timestamp[0] = t0 + i / hz
+            sens.actJ[0] = i
+            log.append(buf)
+        cost = (time.perf_counter() - start) / frames * 1e6
+    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return cost, size, sens.getCodec().size
+
+
+def bench_query(path, queries, window):
+    rng = np.random.default_rng(0)
+    tlm = sdkTelemetryReaderClass(path)
+    first, last = tlm.timeRange()
+    starts = rng.uniform(first, max(first, last - window), queries)
+    start = time.perf_counter()
+    for t in starts:
+        tlm.span(t, t + window)
+    seek = (time.perf_counter() - start) / queries * 1e6
+    rows = 0
+    start = time.perf_counter()
+    for t in starts:
+        act_j = tlm.range(t, t + window, ["actJ"])["actJ"]
+        act_j.mean(axis=0)
+        rows += len(act_j)
+    read = time.perf_counter() - start
+    return len(tlm), seek, rows, read, tlm.columns["actJ"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="传感帧遥测日志基准")
+    parser.add_argument("--hours", type=float, default=0.05, help="模拟的 1kHz 数据时长")
+    parser.add_argument("--hz", type=float, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--window", type=float, default=60.0, help="区间读取窗口(秒)")
+    parser.add_argument("--path", default="/tmp/bench_telemetry")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.path, ignore_errors=True)
+    frames = int(args.hours * 3600 * args.hz)
+    cost, size, frame_size = bench_append(args.path, frames, args.hz)
+    print(f"追加: {frames} 帧（{args.hours:.2f}h x {args.hz:.0f}Hz，帧 {frame_size}B）{cost:.2f} us/帧，"
+          f"落盘 {size / 2**20:.0f} MiB")
+    n, seek, rows, read, (dtype, shape) = bench_query(args.path, args.queries, args.window)
+    mib = rows * dtype.itemsize * int(np.prod(shape)) / 2**20
+    print(f"查询: {n} 帧中按时间区间定位 {seek:.1f} us/次；{args.window:.0f}s 窗口读 actJ 并求均值 "
+          f"{read / args.queries * 1e3:.2f} ms/次（{mib / read:.0f} MiB/s）")
+    shutil.rmtree(args.path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+工作流整图吞吐基准：在本机拉起替身服务端与 dora 数据流，连续驱动 N 轮任务，输出 JSON 报告
+    udp   workflow/dataflow.yml，替身 LoongJntServer(8081) + RobotSimulator(8080)
+    grpc  ../openloong-dora-workflow/workflow/dataflow.yml，替身 chassis(50051) + upper(50052) gRPC 服务
+数据流不改原文件：复制一份到临时目录，节点路径改为绝对路径，触发节点(start_trigger)换成本脚本的驱动节点。
+驱动节点订阅图中所有边：发出 trigger，收到 workflow_status 为 COMPLETE/FAILED 即记一轮并立即再次触发；
+command 边到同名 status 边的首条应答记为该步延迟，各边消息数除以测量窗口即消息速率。
+测量窗口内按 /proc 采样各节点、dora 与替身进程的 CPU 时间。全程无界面，只依赖 Linux /proc 与 dora CLI。
+
+报告字段：cycles_per_min、cycle_latency/steps(各步)延迟分位数(ms)、rates(条/s)、cpu(各进程占单核百分比与每轮 CPU ms)。
+--baseline 给出此前的报告时，吞吐或任一步 p50 延迟劣化超过 --max-regression 即以退出码 1 结束，可接在 CI 中。
+
+用法: python benchmarks/bench_workflow.py [--graph udp] [--cycles 50] [--warmup 3] [--output result.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO = os.path.dirname(ROOT)
+sys.path.append(os.path.join(ROOT, "workflow"))
+
+GRAPHS = {
+    "udp": (os.path.join(ROOT, "workflow", "dataflow.yml"), ("jnt", "mani")),
+    "grpc": (os.path.join(REPO, "openloong-dora-workflow", "workflow", "dataflow.yml"), ("chassis", "upper")),
+}
+SERVERS = {
+    "jnt": os.path.join(ROOT, "servers", "loong_jnt_server.py"),  # LoongJntServer
+    "mani": os.path.join(ROOT, "servers", "sim_server.py"),  # RobotSimulator
+    "chassis": os.path.join(REPO, "openloong-dora-workflow", "servers", "chassis_controller_server.py"),
+    "upper": os.path.join(REPO, "openloong-dora-workflow", "servers", "upper_controller_server.py"),
+}
+END_STATUS = ("COMPLETE", "FAILED")
+STREAM_ACTIONS = ("JOINT_STREAM",)  # 流式模式下的周期状态(loong_jnt_client)
+
+# 驱动节点参数经数据流 env 传入
+RESULT_ENV = "BENCH_WORKFLOW_RESULT"
+CYCLES_ENV = "BENCH_WORKFLOW_CYCLES"
+WARMUP_ENV = "BENCH_WORKFLOW_WARMUP"
+TIMEOUT_ENV = "BENCH_WORKFLOW_CYCLE_TIMEOUT"
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def summarize(values):
+    """延迟列表(秒) -> 分位数统计(毫秒)"""
+    if not values:
+        return {"n": 0}
+    ms = np.asarray(values) * 1e3
+    return {"n": len(ms), "mean_ms": round(float(ms.mean()), 3),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3), "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "max_ms": round(float(ms.max()), 3)}
+
+
+# ==================== 驱动节点(在 dora 中运行) ====================
+def run_driver():
+    from dora import Node
+    from dora_payload import decode_event
+
+    cycles = int(os.environ[CYCLES_ENV])
+    warmup = int(os.environ.get(WARMUP_ENV, 0))
+    cycle_timeout = float(os.environ.get(TIMEOUT_ENV, 120))
+    node = Node()
+    counts = {}
+    steps = {}  # "边前缀/action" -> [延迟]
+    sent = {}  # 边前缀 -> (action, 发出时刻)，等待同名 status 边的首条应答
+    latencies = []
+    outcomes = {"COMPLETE": 0, "FAILED": 0, "TIMEOUT": 0}
+    done = 0
+    t_start = None  # 测量窗口起点(预热结束时刻)
+
+    def finish(status, now):
+        """记一轮结束，返回是否还需要下一轮"""
+        nonlocal done, t_start
+        if t_start is not None:
+            latencies.append(now - started)
+            outcomes[status] += 1
+        done += 1
+        if done == warmup:
+            t_start = now
+        return done < warmup + cycles
+
+    def trigger():
+        """触发下一轮，返回触发时刻"""
+        if t_start is not None:
+            counts["trigger"] = counts.get("trigger", 0) + 1
+        node.send_output("trigger", b"start")
+        return time.monotonic()
+
+    # 首轮触发：无预热时即开始测量
+    if warmup == 0:
+        t_start = time.monotonic()
+    started = trigger()
+    stuck_since = None  # 本轮已记超时，等待工作流自身的 COMPLETE/FAILED 回到空闲后再触发
+    while done < warmup + cycles:
+        event = node.next(timeout=0.5)
+        now = time.monotonic()
+        if event is not None and event["type"] == "STOP":
+            break
+        # 每次循环都检查超时：流式模式下 joint_status 等周期边持续到达，不能只在空等时检查
+        if stuck_since is None and now - started > cycle_timeout:
+            # 工作流卡住：记超时，但不在非空闲状态中途重新触发(trigger 会被忽略)，
+            # 等其状态超时转入 FAILED 后再开下一轮，那条结束状态不再计数
+            stuck_since = now
+            if not finish("TIMEOUT", now):
+                break
+        elif stuck_since is not None and now - stuck_since > cycle_timeout:
+            print(f"工作流超时后 {cycle_timeout:.0f}s 仍未结束，停止测量", file=sys.stderr)
+            break
+        if event is None or event["type"] != "INPUT":
+            continue
+
+        event_id = event["id"]
+        measuring = t_start is not None
+        if measuring:
+            counts[event_id] = counts.get(event_id, 0) + 1
+        value = decode_event(event["value"])
+        if not isinstance(value, dict):
+            continue
+        if event_id.endswith("_command"):
+            sent[event_id[:-len("_command")]] = (value.get("action"), now)
+        elif event_id == "workflow_status":
+            if value.get("status") in END_STATUS:
+                if stuck_since is not None:
+                    stuck_since = None
+                    started = trigger()
+                elif finish(value["status"], now):
+                    started = trigger()
+        elif event_id.endswith("_status"):
+            if value.get("action") in STREAM_ACTIONS:
+                continue  # 周期状态帧不是命令应答，等待沿用命令 action 的那一帧
+            prefix = event_id[:-len("_status")]
+            pending = sent.pop(prefix, None)
+            if pending is not None and measuring:
+                steps.setdefault(f"{prefix}/{pending[0]}", []).append(now - pending[1])
+
+    t_end = time.monotonic()
+    window = max(t_end - (t_start or t_end), 1e-9)
+    measured = sum(outcomes.values())
+    result = {
+        "window": [t_start, t_end],
+        "cycles": measured,
+        "outcomes": outcomes,
+        "cycles_per_min": round(measured / window * 60, 3),
+        "cycle_latency": summarize(latencies),
+        "steps": {key: summarize(values) for key, values in sorted(steps.items())},
+        "rates": {key: round(n / window, 3) for key, n in sorted(counts.items())},
+    }
+    path = os.environ[RESULT_ENV]
+    with open(path + ".tmp", "w") as f:
+        json.dump(result, f)
+    os.replace(path + ".tmp", path)
+
+
+# ==================== 进程 CPU 采样 ====================
+def proc_table():
+    """pid -> (ppid, 累计 CPU 秒, 命令行)"""
+    table = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                stat = f.read()
+            with open(f"/proc/{name}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode(errors="replace")
+        except OSError:
+            continue
+        # comm 可能含空格，从最后一个 ')' 之后按字段切分：[0]=state [1]=ppid [11]=utime [12]=stime
+        fields = stat[stat.rindex(b")") + 2:].split()
+        table[int(name)] = (int(fields[1]), (int(fields[11]) + int(fields[12])) / CLK_TCK, cmdline)
+    return table
+
+
+class CpuSampler(threading.Thread):
+    """定时采样 dora 进程树与替身服务端的累计 CPU 时间，按节点归类"""
+
+    def __init__(self, dora_proc, servers, node_paths, interval):
+        super().__init__(daemon=True)
+        self.dora_pid = dora_proc.pid
+        self.servers = {proc.pid: f"server:{name}" for name, proc in servers.items()}
+        self.node_paths = node_paths  # 节点 id -> 脚本绝对路径
+        self.interval = interval
+        self.samples = []  # (时刻, {标签: 累计 CPU 秒})
+        self.stopped = threading.Event()
+
+    def label(self, cmdline):
+        for node_id, path in self.node_paths.items():
+            if path in cmdline:
+                return node_id
+        return "dora"
+
+    def sample(self):
+        table = proc_table()
+        children = {}
+        for pid, (ppid, _, _) in table.items():
+            children.setdefault(ppid, []).append(pid)
+        cpu = {}
+        stack = [self.dora_pid]
+        while stack:
+            pid = stack.pop()
+            stack.extend(children.get(pid, ()))
+            if pid in table:
+                key = self.label(table[pid][2])
+                cpu[key] = cpu.get(key, 0.0) + table[pid][1]
+        for pid, key in self.servers.items():
+            if pid in table:
+                cpu[key] = table[pid][1]
+        self.samples.append((time.monotonic(), cpu))
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def report(self, t_start, t_end, cycles):
+        """窗口内各标签 CPU：占单核百分比与每轮 CPU 毫秒；进程在窗口末尾前退出的取其最后一次采样"""
+        before = [s for s in self.samples if s[0] <= t_start] or self.samples[:1]
+        after = [s for s in self.samples if s[0] <= t_end + self.interval] or self.samples[-1:]
+        if not before or not after:
+            return {}
+        start = before[-1][1]
+        end = {}
+        for _, cpu in after:
+            end.update(cpu)
+        window = max(t_end - t_start, 1e-9)
+        result = {}
+        for key in sorted(end):
+            used = end[key] - start.get(key, 0.0)
+            result[key] = {"cpu_percent": round(used / window * 100, 2),
+                           "cpu_ms_per_cycle": round(used / max(cycles, 1) * 1e3, 3)}
+        return result
+
+
+# ==================== 编排 ====================
+def derive_dataflow(path, workdir, trigger_node, driver_env):
+    """复制数据流：节点路径转绝对路径，触发节点换成驱动节点并订阅图中所有输出"""
+    with open(path, encoding="utf-8") as f:
+        spec = yaml.safe_load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    nodes = spec["nodes"]
+    node_paths = {}
+    for node in nodes:
+        if "path" in node and node["path"].endswith(".py"):
+            node["path"] = os.path.normpath(os.path.join(base, node["path"]))
+            node_paths[node["id"]] = node["path"]
+    driver = next((node for node in nodes if node["id"] == trigger_node), None)
+    if driver is None:
+        raise SystemExit(f"数据流 {path} 中没有触发节点 {trigger_node}")
+    inputs = {}
+    for node in nodes:
+        if node is driver:
+            continue
+        for output in node.get("outputs") or []:
+            key = output if output not in inputs else f"{node['id']}_{output}"
+            inputs[key] = f"{node['id']}/{output}"
+    driver_path = os.path.abspath(__file__)
+    driver.clear()
+    driver.update(id=trigger_node, path=driver_path, inputs=inputs, outputs=["trigger"], env=driver_env)
+    node_paths[trigger_node] = driver_path
+    derived = os.path.join(workdir, "dataflow.yml")
+    with open(derived, "w", encoding="utf-8") as f:
+        yaml.safe_dump(spec, f, allow_unicode=True, sort_keys=False)
+    return derived, node_paths
+
+
+def start_server(name, workdir):
+    script = SERVERS[name]
+    log = open(os.path.join(workdir, f"server_{name}.log"), "w")
+    env = dict(os.environ, JNT_SERVER_LOG_INTERVAL="-1", PYTHONUNBUFFERED="1")
+    return subprocess.Popen([sys.executable, script], cwd=os.path.dirname(script), env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+def stop(proc, sig=signal.SIGTERM, wait=10.0):
+    if proc.poll() is not None:
+        return
+    proc.send_signal(sig)
+    try:
+        proc.wait(wait)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def compare(report, baseline, limit):
+    """与基线报告比较，返回劣化项列表"""
+    worse = []
+    old, new = baseline.get("cycles_per_min"), report.get("cycles_per_min")
+    if old and new is not None and new < old * (1 - limit):
+        worse.append(f"cycles_per_min {old} -> {new}")
+    for key, stats in report.get("steps", {}).items():
+        old = baseline.get("steps", {}).get(key, {}).get("p50_ms")
+        if old and stats.get("p50_ms") is not None and stats["p50_ms"] > old * (1 + limit):
+            worse.append(f"steps[{key}].p50_ms {old} -> {stats['p50_ms']}")
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dora 工作流整图吞吐基准（本机替身服务端，无界面）")
+    parser.add_argument("--graph", choices=sorted(GRAPHS), default="udp")
+    parser.add_argument("--dataflow", default=None, help="数据流文件，默认按 --graph")
+    parser.add_argument("--servers", default=None, help="逗号分隔的替身服务端(jnt,mani,chassis,upper)，默认按 --graph")
+    parser.add_argument("--trigger-node", default="start_trigger", help="被驱动节点替换的触发节点 id")
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3, help="不计入统计的预热轮数")
+    parser.add_argument("--cycle-timeout", type=float, default=120.0, help="单轮无结束状态即记超时(秒)")
+    parser.add_argument("--sample-interval", type=float, default=0.2, help="CPU 采样间隔(秒)")
+    parser.add_argument("--dora-args", default="", help="追加给 dora run 的参数，如 --uv")
+    parser.add_argument("--output", default=None, help="报告另存为 JSON 文件")
+    parser.add_argument("--baseline", default=None, help="基线报告 JSON，劣化超过阈值时退出码为 1")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    dataflow, default_servers = GRAPHS[args.graph]
+    dataflow = os.path.abspath(args.dataflow or dataflow)
+    server_names = args.servers.split(",") if args.servers else list(default_servers)
+    workdir = tempfile.mkdtemp(prefix="bench_workflow_")
+    result_path = os.path.join(workdir, "driver.json")
+    derived, node_paths = derive_dataflow(dataflow, workdir, args.trigger_node, {
+        RESULT_ENV: result_path, CYCLES_ENV: str(args.cycles), WARMUP_ENV: str(args.warmup),
+        TIMEOUT_ENV: str(args.cycle_timeout),
+    })
+
+    servers = {name: start_server(name, workdir) for name in server_names if name}
+    dora = None
+    try:
+        time.sleep(1.0)
+        for name, proc in servers.items():
+            if proc.poll() is not None:
+                raise SystemExit(f"替身服务端 {name} 启动失败，见 {workdir}/server_{name}.log")
+        dora_log = open(os.path.join(workdir, "dora.log"), "w")
+        dora = subprocess.Popen(["dora", "run", derived, *args.dora_args.split()], cwd=workdir,
+                                stdout=dora_log, stderr=subprocess.STDOUT, start_new_session=True)
+        sampler = CpuSampler(dora, servers, node_paths, args.sample_interval)
+        sampler.start()
+
+        deadline = time.monotonic() + (args.cycles + args.warmup) * args.cycle_timeout + 60
+        while not os.path.exists(result_path):
+            if dora.poll() is not None or time.monotonic() > deadline:
+                raise SystemExit(f"数据流未产出结果(退出码 {dora.poll()})，见 {workdir}/dora.log")
+            time.sleep(0.2)
+        sampler.sample()
+        sampler.stopped.set()
+        with open(result_path) as f:
+            report = json.load(f)
+    finally:
+        if dora is not None:
+            stop(dora, signal.SIGINT)
+        for proc in servers.values():
+            stop(proc)
+
+    t_start, t_end = report.pop("window")
+    report["cpu"] = sampler.report(t_start, t_end, report["cycles"])
+    report["meta"] = {
+        "graph": args.graph, "dataflow": dataflow, "servers": server_names, "warmup": args.warmup,
+        "window_s": round(t_end - t_start, 3), "host": platform.node(), "cpus": os.cpu_count(),
+        "python": platform.python_version(), "logs": workdir,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            worse = compare(report, json.load(f), args.max_regression)
+        for line in worse:
+            print(f"劣化: {line}", file=sys.stderr)
+        if worse:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    if RESULT_ENV in os.environ:
+        run_driver()
+    else:
+        main()
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+asyncio udp通信，与loong_jnt_sdk_udp同线格式、同数据类，不依赖c++封装库
+可与其他通道在同一事件循环内收发，用法见loong_sdk_async
+======================================================'''
+from loong_jnt_sdk_datas import jntSdkSensDataClass, jntSdkCtrlDataClass
+from loong_sdk_async import sdkAsyncTransportClass
+
+# ===========================
+class jntSdkAsyncClass(sdkAsyncTransportClass):
+	def __init__(self, ip:str, port:int, jntNum, fingerDofLeft, fingerDofRight):
+		super().__init__(ip, port, jntSdkSensDataClass(jntNum, fingerDofLeft, fingerDofRight))
+
+	async def waitSens(self):
+		'''发送空命令直至收到首帧传感数据'''
+		ctrl=jntSdkCtrlDataClass(self.sens.actJ.size, self.sens.actFingerLeft.size, self.sens.actFingerRight.size)
+		while(1):
+			await self.send(ctrl)
+			sens=await self.recv(0.5)
+			if(sens is not None and sens.timestamp>0):
+				return sens
+			print("sdk等待连接...")
@@ -30,50 +30,21 @@ Author: YYP
 	vecXf j,w,t,kp,kd;
 	vecXf fingerLeft, fingerRight;
 ======================================================'''
-import struct
 import numpy as np
+from loong_sdk_schema import sdkFrameDataClass, getFrameCodec
 
 
-class jntSdkSensDataClass:
-	def __init__(self,jntNum, fingerDofLeft, fingerDofRight):
-		# ！！！顺序不能乱！！！！
-		self.size=np.zeros(1, np.int32)
-		self.timestamp=np.zeros(1, np.float64)
-		self.key=np.zeros(2, np.int16)
-		self.planName:str="none"
-		self.state=np.zeros(2, np.int16)
-		self.joy=np.zeros(4, np.float32)
-		self.rpy=np.zeros(3, np.float32)
-		self.gyr=np.zeros(3, np.float32)
-		self.acc=np.zeros(3, np.float32)
-		self.actJ=np.zeros(jntNum, np.float32)
-		self.actW=np.zeros(jntNum, np.float32)
-		self.actT=np.zeros(jntNum, np.float32)
-		self.drvTemp=np.zeros(jntNum, np.int16)
-		self.drvState=np.zeros(jntNum, np.int16)
-		self.drvErr=np.zeros(jntNum, np.int16)
-		self.tgtJ=np.zeros(jntNum, np.float32)
-		self.tgtW=np.zeros(jntNum, np.float32)
-		self.tgtT=np.zeros(jntNum, np.float32)
-
-		self.actFingerLeft=np.zeros(fingerDofLeft, np.float32)
-		self.actFingerRight=np.zeros(fingerDofRight, np.float32)
-		self.tgtFingerLeft=np.zeros(fingerDofLeft, np.float32)
-		self.tgtFingerRight=np.zeros(fingerDofRight, np.float32)
+def getSensDtype(jntNum, fingerDofLeft, fingerDofRight):
+	'''传感数据帧的numpy结构化dtype，由loong_sdk_schema统一登记生成'''
+	return getFrameCodec('jntSens', jntNum=jntNum, fingerDofLeft=fingerDofLeft, fingerDofRight=fingerDofRight).dtype
 
-		self.__fmts=['i','d','2h','16s','2h','4f']
-		self.__fmts.extend([f'3f']*3)
-		self.__fmts.extend([f'{jntNum}f']*3)#j w t
-		self.__fmts.extend([f'{jntNum}h']*3)#temp state err
-		self.__fmts.extend([f'{jntNum}f']*3)#j w t
-		self.__fmts.extend([f'{fingerDofLeft}f'])
-		self.__fmts.extend([f'{fingerDofRight}f'])
-		self.__fmts.extend([f'{fingerDofLeft}f'])
-		self.__fmts.extend([f'{fingerDofRight}f'])
 
-		self.__fmtSizes=[]
-		for it in self.__fmts:
-			self.__fmtSizes.append(struct.calcsize(it))
+class jntSdkSensDataClass(sdkFrameDataClass):
+	'''关节传感帧，布局见loong_sdk_schema之'jntSens'，各数组字段为帧缓冲上的视图'''
+	_schema='jntSens'
+	def __init__(self,jntNum, fingerDofLeft, fingerDofRight):
+		self._initFrame(jntNum=jntNum, fingerDofLeft=fingerDofLeft, fingerDofRight=fingerDofRight)
+		self.planName="none"
 
 		np.set_printoptions(suppress=1, threshold=np.inf)
 	def print(self):
@@ -82,30 +53,21 @@ class jntSdkSensDataClass:
 			if it.startswith("_"):
 				continue
 			print(it,'=',self.__dict__[it])
-	def unpackData(self,buf):
-		# 务必注意c++的自动内存对齐，数据连续问题
-		keys=list(self.__dict__.keys())
-		idx=0
-		for i in range(len(self.__fmts)):
-			setattr(self, keys[i], np.array(struct.unpack(self.__fmts[i], buf[idx : idx+self.__fmtSizes[i]] )))
-			idx+=self.__fmtSizes[i]
-		self.planName =self.planName.tobytes().decode('utf-8')
 		
 # ====================================
-class jntSdkCtrlDataClass:
+def getCtrlDtype(jntNum, fingerDofLeft, fingerDofRight):
+	'''命令数据帧的numpy结构化dtype，由loong_sdk_schema统一登记生成'''
+	return getFrameCodec('jntCtrl', jntNum=jntNum, fingerDofLeft=fingerDofLeft, fingerDofRight=fingerDofRight).dtype
+
+class jntSdkCtrlDataClass(sdkFrameDataClass):
+	'''关节命令帧，布局见loong_sdk_schema之'jntCtrl'，原地打包，packData逐周期无分配、无拷贝'''
+	_schema='jntCtrl'
 	def __init__(self, jntNum, fingerDofLeft, fingerDofRight):
+		self._initFrame(jntNum=jntNum, fingerDofLeft=fingerDofLeft, fingerDofRight=fingerDofRight)
 		self.checker	=3480	#short
 		self.size		=16 +jntNum*4*5 +(fingerDofLeft+fingerDofRight)*4	#short
-		self.state		=0
-		self.torLimitRate=0.2
-		self.filtRate	=0.05
-		self.j=self.getStdJnt()
-		self.w=np.zeros(jntNum, np.float32)
-		self.t=np.zeros(jntNum, np.float32)
-		self.kp=np.zeros(jntNum, np.float32)
-		self.kd=np.zeros(jntNum, np.float32)
-		self.fingerLeft=np.zeros(fingerDofLeft, np.float32)
-		self.fingerRight=np.zeros(fingerDofRight, np.float32)
+		if(self.size!=self._codec.size):
+			raise ValueError(f"jntSdk ctrl数据打包大小不匹配！{self._codec.size} {self.size}")
 		self.reset()
 	def reset(self):
 		self.state		=0
@@ -125,17 +87,3 @@ class jntSdkCtrlDataClass:
 			0,0,0,0,0,
 			0.0533331, 0, 0.325429, -0.712646, 0.387217,-0.0533331, 
 			-0.0533331, 0, 0.325429, -0.712646, 0.387217, 0.0533331], np.float32)
-	def packData(self):
-		buf=struct.pack('2hi', self.checker, self.size, self.state)
-		buf+=struct.pack('ff', self.torLimitRate, self.filtRate)
-		buf+=self.j.astype(dtype=np.float32).tobytes()
-		buf+=self.w.astype(dtype=np.float32).tobytes()
-		buf+=self.t.astype(dtype=np.float32).tobytes()
-		buf+=self.kp.astype(dtype=np.float32).tobytes()
-		buf+=self.kd.astype(dtype=np.float32).tobytes()
-		buf+=self.fingerLeft.astype(dtype=np.float32).tobytes()
-		buf+=self.fingerRight.astype(dtype=np.float32).tobytes()
-		if(len(buf)!=self.size):
-			print("jntSdk ctrl数据打包大小不匹配！",len(buf),self.size)
-			exit()
-		return buf
@@ -8,41 +8,100 @@ THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR I
 Author: YYP
 
 shm通信，仅可单机运行，亚毫秒级延时
+无预编译库或../config/driver.ini时退回纯Python共享内存(loong_sdk_shm，seqlock)，
+可与替身服务端(servers/loong_jnt_server.py --shm)联调，sensView()给出共享内存上的零拷贝视图
 
 ======================================================'''
 import ctypes
 import os
+import time
 import platform
 from loong_jnt_sdk_datas import jntSdkSensDataClass, jntSdkCtrlDataClass
+from loong_sdk_schema import getFrameCodec
+from loong_sdk_stats import sdkTimingStatsClass
+from loong_sdk_record import sdkRecorderClass, sdkRecordTapClass
+from loong_sdk_shm import sdkSeqlockShmClass
 
 # ===========================
 class jntSdkClass:
-	def __init__(self, jntNum, fingerDofLeft, fingerDofRight):
-		if(os.path.exists('../config/driver.ini')==0):
-			print("共享内存版需匹配当前所在目录层级，保证可以按 ../config/driver.ini 路径访问")
-			exit()
+	def __init__(self, jntNum, fingerDofLeft, fingerDofRight, shmName:str='loong_jnt_sdk'):
+		'''shmName: 纯Python共享内存的段名，仅在退回该传输时使用'''
+		self.sens=jntSdkSensDataClass(jntNum, fingerDofLeft, fingerDofRight)
+		self._ctrlSrc=None
+		self._ctrlCBuf=None
+		self.stats=None
+		self.tap=None
+		self.lib=None
+		self.shm=None
 		path=os.path.dirname(os.path.abspath(__file__))
 		if(platform.machine()=="x86_64" or platform.machine()=="amd64"):
-			self.lib=ctypes.CDLL(path+'/lib/libloong_jnt_sdk_shm_x64.so')
+			libPath=path+'/lib/libloong_jnt_sdk_shm_x64.so'
 		else:
-			self.lib=ctypes.CDLL(path+'/lib/libloong_jnt_sdk_shm_a64.so')
-		self.lib.initShmMode()
-		self.libCtrlDataSize=self.lib.getCtrlDataSize()
-		self.libSensDataSize=self.lib.getSensDataSize()
-
-		self.sens=jntSdkSensDataClass(jntNum, fingerDofLeft, fingerDofRight)
-		self.sensBuf=bytes(self.libSensDataSize)
+			libPath=path+'/lib/libloong_jnt_sdk_shm_a64.so'
+		if(os.path.exists('../config/driver.ini') and os.path.exists(libPath)):
+			self.lib=ctypes.CDLL(libPath)
+			self.lib.initShmMode()
+			self.libCtrlDataSize=self.lib.getCtrlDataSize()
+			self.libSensDataSize=self.lib.getSensDataSize()
+			# lib向缓冲写入，须为可写内存(bytes不可变)
+			self.sensBuf=bytearray(self.libSensDataSize)
+			self._sensCBuf=(ctypes.c_char*len(self.sensBuf)).from_buffer(self.sensBuf)
+		else:
+			print("未找到 ../config/driver.ini 或共享内存库，使用纯Python共享内存: "+shmName)
+			ctrlSize=getFrameCodec('jntCtrl', jntNum=jntNum, fingerDofLeft=fingerDofLeft, fingerDofRight=fingerDofRight).size
+			self.shm=sdkSeqlockShmClass(shmName, ctrlSize, self.sens.getCodec().size)
+			self.sensBuf=bytearray(self.sens.getCodec().size)
+			self.sensSeq=0			#最近读到的传感帧序号，未变化时recv不重复解码
 
 	def send(self,ctrl:jntSdkCtrlDataClass):
 		buf=ctrl.packData()
-		if(len(buf) == self.libCtrlDataSize):
-			self.lib.setCtrl(buf)
+		if(self.shm is not None):
+			self.shm.ctrl.write(buf)
+		else:
+			# ctrl原地打包，首次发送时在其帧缓冲上建立ctypes视图，之后每周期直接交给lib，无拷贝
+			if(buf is not self._ctrlSrc):
+				self._ctrlSrc=buf
+				self._ctrlCBuf=(ctypes.c_char*len(buf)).from_buffer(buf)
+			if(len(buf)!=self.libCtrlDataSize):
+				return
+			self.lib.setCtrl(self._ctrlCBuf)
+		if(self.stats is not None):
+			self.stats.markSend()
+		if(self.tap is not None):
+			self.tap.tx(ctrl, buf)
 	def waitSens(self):
 		pass
 	def recv(self)->jntSdkSensDataClass:
-		self.lib.getSens(self.sensBuf)
+		if(self.shm is not None):
+			seq=self.shm.sens.read(self.sensBuf, self.sensSeq)
+			if(not seq or seq==self.sensSeq):
+				return self.sens
+			self.sensSeq=seq
+		else:
+			self.lib.getSens(self._sensCBuf)
+		if(self.tap is not None):
+			self.tap.rx(self.sensBuf)
+		if(self.stats is None):
+			self.sens.unpackData(self.sensBuf)
+			return self.sens
+		t0=time.perf_counter_ns()
 		self.sens.unpackData(self.sensBuf)
+		self.stats.markRecv(self.sens.timestamp[0], time.perf_counter_ns()-t0)
 		return self.sens
+	def sensView(self):
+		'''纯Python共享内存时返回(结构化视图, 槽位)：视图直接映射共享内存，
+		读取前后以槽位begin()/validate()校验；lib模式返回None'''
+		if(self.shm is None):
+			return None
+		return self.shm.sens.view(self.sens.getCodec().dtype), self.shm.sens
+	def attachStats(self, stats:sdkTimingStatsClass=None):
+		'''挂接时序统计，之后send/recv自动打点；传None解除'''
+		self.stats=stats
+		return stats
+	def attachRecorder(self, rec:sdkRecorderClass=None, prefix:str='jnt'):
+		'''挂接录制器，之后send/recv的原始帧写入'<prefix>.ctrl'/'<prefix>.sens'通道；传None解除'''
+		self.tap=None if rec is None else sdkRecordTapClass(rec, prefix, self.sens, None)
+		return rec
 	
 	# def loopTimeAdapt(self,hz):
 	# 	self.lib.loopTimeAdapt(ctypes.c_float(hz))
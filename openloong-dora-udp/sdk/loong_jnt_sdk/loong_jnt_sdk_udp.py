@@ -9,12 +9,30 @@ Author: YYP
 
 udp通信，可多机联调，存在毫秒级不等的延时
 py自带的udp缓冲很诡异，故调用c++封装
+lib接口按ctypes声明参数/返回类型；getSens非阻塞读一个数据报，返回其长度(无新数据时<=0)，
+并在数据末尾补0，故接收缓冲按最大UDP数据报长度分配。recv排空积压、只解码最新一帧，无新帧时不解码；
+sensSeq/sensRecvTime/sensDropped 与 maniSdkClass 含义一致。lib不提供socket描述符，waitSens以指数退避轮询等待首帧
 ======================================================'''
 import ctypes
 import os
 import time
 import platform
 from loong_jnt_sdk_datas import jntSdkSensDataClass, jntSdkCtrlDataClass
+from loong_sdk_stats import sdkTimingStatsClass
+from loong_sdk_record import sdkRecorderClass, sdkRecordTapClass
+
+_RX_BYTES=65536			#最大UDP数据报65507字节，另加lib写入的结尾0
+
+def _declareLib(lib):
+	lib.initUdpMode.argtypes=[ctypes.c_char_p, ctypes.c_ushort]
+	lib.initUdpMode.restype=None
+	lib.getSens.argtypes=[ctypes.c_void_p]
+	lib.getSens.restype=ctypes.c_int
+	lib.setCtrl.argtypes=[ctypes.c_void_p]
+	lib.setCtrl.restype=None
+	for name in ('getCtrlDataSize', 'getSensDataSize', 'getJntNums'):
+		getattr(lib, name).argtypes=[]
+		getattr(lib, name).restype=ctypes.c_int
 
 # ===========================
 class jntSdkClass:
@@ -24,27 +42,110 @@ class jntSdkClass:
 			self.lib=ctypes.CDLL(path+'/lib/libloong_jnt_sdk_udp_x64.so')
 		else:
 			self.lib=ctypes.CDLL(path+'/lib/libloong_jnt_sdk_udp_a64.so')
-		self.lib.initUdpMode(bytes(ip.encode()), ctypes.c_int(port))
+		_declareLib(self.lib)
+		self.lib.initUdpMode(ip.encode(), port)
+		self.rbtIpPort=(ip,port)
 
 		self.sens=jntSdkSensDataClass(jntNum, fingerDofLeft, fingerDofRight)
-		self.sensBuf=bytes(2048)
+		self.sensSize=self.sens.getCodec().size
+		self.sensSeq=0			#已解码的新帧计数
+		self.sensRecvTime=0.	#最新帧到达时刻，time.monotonic()
+		self.sensDropped=0		#排空时被覆盖的旧帧及长度不符的数据报计数
+		self._ctrlSrc=None
+		self._ctrlCBuf=None
+		self.stats=None
+		self.tap=None
+		# lib写入的可写接收缓冲(bytearray上的ctypes视图)；收到完整帧后与sensBuf交换，sensBuf始终为最新完整帧
+		self._rxBuf=bytearray(_RX_BYTES)
+		self._rxCBuf=(ctypes.c_char*_RX_BYTES).from_buffer(self._rxBuf)
+		self.sensBuf=bytearray(_RX_BYTES)
+		self._sensCBuf=(ctypes.c_char*_RX_BYTES).from_buffer(self.sensBuf)
 
 	def send(self,ctrl:jntSdkCtrlDataClass):
+		# ctrl原地打包，首次发送时在其帧缓冲上建立ctypes视图，之后每周期直接交给lib，无拷贝
 		buf=ctrl.packData()
-		self.lib.setCtrl(buf)
-	def waitSens(self):
-		self.send(jntSdkCtrlDataClass(31,1,1))
+		if(buf is not self._ctrlSrc):
+			self._ctrlSrc=buf
+			self._ctrlCBuf=(ctypes.c_char*len(buf)).from_buffer(buf)
+		self.lib.setCtrl(self._ctrlCBuf)
+		if(self.stats is not None):
+			self.stats.markSend()
+		if(self.tap is not None):
+			self.tap.tx(ctrl, buf)
+	def waitSens(self, ctrl:jntSdkCtrlDataClass=None, timeout:float=None, resend:float=0.1)->bool:
+		'''发送ctrl(缺省为空指令)使对端开始回传，等到首个传感帧即返回；每resend秒重发一次。
+		timeout秒内未收到返回False，None一直等待'''
+		if(ctrl is None):
+			ctrl=jntSdkCtrlDataClass(**self.sens.getCodec().dims)
+		deadline=None if timeout is None else time.monotonic()+timeout
+		seq=self.sensSeq
+		nextSend=0.
+		waiting=False
+		poll=0.0005
 		while(1):
-			time.sleep(0.5)
-			print("sdk等待连接...")
-			sens=self.recv()
-			if(sens.timestamp>0):
-				break
+			now=time.monotonic()
+			if(now>=nextSend):
+				if(nextSend and not waiting):
+					print("sdk等待连接...")
+					waiting=True
+				self.send(ctrl)
+				nextSend=now+resend
+				poll=0.0005
+			self.recv()
+			if(self.sensSeq!=seq):
+				return True
+			wait=nextSend-time.monotonic()
+			if(deadline is not None):
+				if(deadline<=now):
+					return False
+				wait=min(wait, deadline-time.monotonic())
+			# 每次(重)发后自0.5ms起指数退避，上限5ms，兼顾首帧延迟与空等开销
+			time.sleep(max(min(wait, poll), 0.))
+			poll=min(poll*2, 0.005)
 
 	def recv(self)->jntSdkSensDataClass:
-		self.lib.getSens(self.sensBuf)
+		'''排空lib接收队列，仅解码最后一个完整帧；无新帧时直接返回上一帧'''
+		getSens=self.lib.getSens
+		fresh=0
+		while(1):
+			n=getSens(self._rxCBuf)
+			if(n<=0):
+				break
+			if(self.tap is not None):
+				self.tap.rx(self._rxBuf, n)
+			if(n<self.sensSize):
+				self.sensDropped+=1
+				continue
+			if(fresh):
+				self.sensDropped+=1
+			fresh=n
+			# 完整帧与收包缓冲交换，其后的短包/无效包只写入收包缓冲，不会覆盖已保存的帧
+			self._rxBuf, self.sensBuf=self.sensBuf, self._rxBuf
+			self._rxCBuf, self._sensCBuf=self._sensCBuf, self._rxCBuf
+		if(not fresh):
+			return self.sens
+		self.sensRecvTime=time.monotonic()
+		self.sensSeq+=1
+		if(self.stats is None):
+			self.sens.unpackData(self.sensBuf)
+			return self.sens
+		t0=time.perf_counter_ns()
 		self.sens.unpackData(self.sensBuf)
+		self.stats.markRecv(self.sens.timestamp[0], time.perf_counter_ns()-t0)
 		return self.sens
+	def recvTagged(self):
+		'''返回(sens, sensSeq, age)，age为最新帧距今秒数，尚无数据时为inf'''
+		self.recv()
+		age=time.monotonic()-self.sensRecvTime if self.sensSeq else float('inf')
+		return self.sens, self.sensSeq, age
+	def attachStats(self, stats:sdkTimingStatsClass=None):
+		'''挂接时序统计，之后send/recv自动打点；传None解除'''
+		self.stats=stats
+		return stats
+	def attachRecorder(self, rec:sdkRecorderClass=None, prefix:str='jnt'):
+		'''挂接录制器，之后send/recv的原始帧写入'<prefix>.ctrl'/'<prefix>.sens'通道；传None解除'''
+		self.tap=None if rec is None else sdkRecordTapClass(rec, prefix, self.sens, self.rbtIpPort)
+		return rec
 	
 	# def loopTimeAdapt(self,hz):
 	# 	self.lib.loopTimeAdapt(ctypes.c_float(hz))
@@ -1,3 +1,4 @@
 import os
 import sys
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
\ No newline at end of file
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'loong_sdk_common'))
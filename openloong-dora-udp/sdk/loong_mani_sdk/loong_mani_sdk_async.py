@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+asyncio udp通信，与loong_mani_sdk_udp同线格式、同数据类
+可与其他通道在同一事件循环内收发，用法见loong_sdk_async
+======================================================'''
+from loong_mani_sdk_udp import maniSdkSensDataClass
+from loong_sdk_async import sdkAsyncTransportClass
+
+# ===========================
+class maniSdkAsyncClass(sdkAsyncTransportClass):
+	def __init__(self, ip:str, port:int, jntNum, fingerDofLeft, fingerDofRight):
+		super().__init__(ip, port, maniSdkSensDataClass(jntNum, fingerDofLeft, fingerDofRight))
@@ -36,63 +36,20 @@ Author: YYP
 	vecXf neckCmd;		//neckDof
 	vecXf lumbarCmd;	//lumbarDof
 ======================================================'''
+import selectors
 import socket
-import struct
+import time
 import numpy as np
+from loong_sdk_schema import sdkFrameDataClass
+from loong_sdk_record import sdkRecorderClass, sdkRecordTapClass
 
 
-class maniSdkSensDataClass:
+class maniSdkSensDataClass(sdkFrameDataClass):
+	'''操作传感帧，布局见loong_sdk_schema之'maniSens'，各数组字段为帧缓冲上的视图'''
+	_schema='maniSens'
 	def __init__(self,jntNum,fingerDofLeft, fingerDofRight):
-		self.dataSize=np.zeros(1, np.int32)
-		self.timestamp=np.zeros(1, np.float64)
-		self.key=np.zeros(2, np.int16) #short
-		self.planName:str="none"
-		self.state=np.zeros(2, np.int16) #short
-		self.joy=np.zeros(4, np.float32)
-
-		self.rpy=np.zeros(3, np.float32)
-		self.gyr=np.zeros(3, np.float32)
-		self.acc=np.zeros(3, np.float32)
-		self.actJ=np.zeros(jntNum, np.float32)
-		self.actW=np.zeros(jntNum, np.float32)
-		self.actT=np.zeros(jntNum, np.float32)
-		self.drvTemp=np.zeros(jntNum, np.int16)
-		self.drvState=np.zeros(jntNum, np.int16)
-		self.drvErr=np.zeros(jntNum, np.int16)
-		self.tgtJ=np.zeros(jntNum, np.float32)
-		self.tgtW=np.zeros(jntNum, np.float32)
-		self.tgtT=np.zeros(jntNum, np.float32)
-
-		self.actFingerLeft=np.zeros(fingerDofLeft, np.float32)
-		self.actFingerRight=np.zeros(fingerDofRight, np.float32)
-		self.tgtFingerLeft=np.zeros(fingerDofLeft, np.float32)
-		self.tgtFingerRight=np.zeros(fingerDofRight, np.float32)
-
-		self.actTipPRpy2B=np.zeros((2,6), np.float32)
-		self.actTipVW2B  =np.zeros((2,6), np.float32)
-		self.actTipFM2B  =np.zeros((2,6), np.float32)
-		self.tgtTipPRpy2B=np.zeros((2,6), np.float32)
-		self.tgtTipVW2B  =np.zeros((2,6), np.float32)
-		self.tgtTipFM2B  =np.zeros((2,6), np.float32)
-
-		self.__fmts=['i','d','2h','16s','2h','4f']
-		self.__fmts.extend([f'3f']*3)
-		self.__fmts.extend([f'{jntNum}f']*3)
-		self.__fmts.extend([f'{jntNum}h']*3)
-		self.__fmts.extend([f'{jntNum}f']*3)
-		self.__fmts.extend([f'{fingerDofLeft}f'])
-		self.__fmts.extend([f'{fingerDofRight}f'])
-		self.__fmts.extend([f'{fingerDofLeft}f'])
-		self.__fmts.extend([f'{fingerDofRight}f'])
-		self.__fmts.extend(['12f']*6)
-
-		self.__fmtSizes=[]
-		for it in self.__fmts:
-			self.__fmtSizes.append(struct.calcsize(it))
-	def getFmts(self):
-		return self.__fmts
-	def getFmtSizes(self):
-		return self.__fmtSizes
+		self._initFrame(jntNum=jntNum, fingerDofLeft=fingerDofLeft, fingerDofRight=fingerDofRight)
+		self.planName="none"
 	def print(self):
 		np.set_printoptions(suppress=True)
 		print("============")
@@ -103,39 +60,14 @@ class maniSdkSensDataClass:
 
 	def packSensData(self):
 		"""打包传感器数据"""
-		buf = b""
-		buf += struct.pack('i', self.dataSize.item())
-		buf += struct.pack('d', self.timestamp.item())
-		buf += self.key.astype(np.int16).tobytes()
-		buf += self.planName.encode('utf-8')[:16].ljust(16, b'\x00')
-		buf += self.state.astype(np.int16).tobytes()
-		buf += self.joy.astype(np.float32).tobytes()
-		buf += self.rpy.astype(np.float32).tobytes()
-		buf += self.gyr.astype(np.float32).tobytes()
-		buf += self.acc.astype(np.float32).tobytes()
-		buf += self.actJ.astype(np.float32).tobytes()
-		buf += self.actW.astype(np.float32).tobytes()
-		buf += self.actT.astype(np.float32).tobytes()
-		buf += self.drvTemp.astype(np.int16).tobytes()
-		buf += self.drvState.astype(np.int16).tobytes()
-		buf += self.drvErr.astype(np.int16).tobytes()
-		buf += self.tgtJ.astype(np.float32).tobytes()
-		buf += self.tgtW.astype(np.float32).tobytes()
-		buf += self.tgtT.astype(np.float32).tobytes()
-		buf += self.actFingerLeft.astype(np.float32).tobytes()
-		buf += self.actFingerRight.astype(np.float32).tobytes()
-		buf += self.tgtFingerLeft.astype(np.float32).tobytes()
-		buf += self.tgtFingerRight.astype(np.float32).tobytes()
-		buf += self.actTipPRpy2B.astype(np.float32).tobytes()
-		buf += self.actTipVW2B.astype(np.float32).tobytes()
-		buf += self.actTipFM2B.astype(np.float32).tobytes()
-		buf += self.tgtTipPRpy2B.astype(np.float32).tobytes()
-		buf += self.tgtTipVW2B.astype(np.float32).tobytes()
-		buf += self.tgtTipFM2B.astype(np.float32).tobytes()
-		return buf
+		return self.packData()
 
-class maniSdkCtrlDataClass:
+class maniSdkCtrlDataClass(sdkFrameDataClass):
+	'''操作命令帧，布局见loong_sdk_schema之'maniCtrl'，原地打包'''
+	_schema='maniCtrl'
 	def __init__(self, armDof, fingerDofLeft, fingerDofRight, neckDof, lumbarDof):
+		self._initFrame(armDof=armDof, fingerDofLeft=fingerDofLeft, fingerDofRight=fingerDofRight,
+						neckDof=neckDof, lumbarDof=lumbarDof)
 		self.inCharge=  1	#short
 		self.filtLevel= 2	#short
 		self.armMode=   0	#short
@@ -143,16 +75,10 @@ class maniSdkCtrlDataClass:
 		self.neckMode=  5	#short
 		self.lumbarMode=0	#short
 
+		if(armDof!=7):
+			raise ValueError(f'臂自由度不匹配！{armDof}')
 		self.armCmd=   np.array([[0.4, 0.3, 0.1,   0,0,0,   0.5],
 								[0.2,-0.3, 0.1,   0,0,0,   0.5]],np.float32)
-		if(self.armCmd.shape[1]!=armDof):
-			print('臂自由度不匹配！')
-			exit()
-		self.armFM=      np.zeros((2,6),np.float32)
-		self.fingerLeft= np.zeros(fingerDofLeft, np.float32)
-		self.fingerRight=np.zeros(fingerDofRight, np.float32)
-		self.neckCmd=    np.zeros(neckDof,np.float32)
-		self.lumbarCmd=  np.zeros(lumbarDof,np.float32)
 
 		self.armDof=armDof
 		self.fingerDofLeft=fingerDofLeft
@@ -162,88 +88,85 @@ class maniSdkCtrlDataClass:
 
 
 class maniSdkClass:
+	'''接收采用最新帧语义：每次recv排空socket，仅解码最后一个完整数据报。
+	sensSeq每解到一帧新数据自增，sensRecvTime为其到达的单调时钟时刻，可据此区分新旧帧'''
 	def __init__(self, ip:str, port:int, jntNum, fingerDofLeft, fingerDofRight):
 		self.rbtIpPort=(ip,port)
 		self.sk=socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-		self.sk.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1)
 		self.sk.setblocking(0)
+		self.sel=selectors.DefaultSelector()
+		self.sel.register(self.sk, selectors.EVENT_READ)
 		self.sens=maniSdkSensDataClass(jntNum, fingerDofLeft, fingerDofRight)
+		self.sensSize=self.sens.getCodec().size
+		self.sensSeq=0			#已解码的新帧计数
+		self.sensRecvTime=0.	#最新帧到达时刻，time.monotonic()
+		self.sensDropped=0		#排空时丢弃的旧帧及长度不符的数据报计数
+		self._rxBuf=bytearray(2048)		#收包缓冲
+		self._rxFrame=bytearray(2048)	#最近一个完整帧，与收包缓冲交替使用，后续收包不会覆盖
+		self.tap=None
 
 	def send(self,ctrl:maniSdkCtrlDataClass):
-		self.sk.sendto(self.packCtrlData(ctrl), self.rbtIpPort)
-	def recv(self)->maniSdkSensDataClass:
-		try:
-			buf,_=self.sk.recvfrom(2048)
-			self.unpackData(buf)
-		except:
-			pass
+		buf=self.packCtrlData(ctrl)
+		self.sk.sendto(buf, self.rbtIpPort)
+		if(self.tap is not None):
+			self.tap.tx(ctrl, buf)
+	def attachRecorder(self, rec:sdkRecorderClass=None, prefix:str='mani'):
+		'''挂接录制器，send的控制帧与收到的每个数据报(含排空丢弃的)写入'<prefix>.ctrl'/'<prefix>.sens'；传None解除'''
+		self.tap=None if rec is None else sdkRecordTapClass(rec, prefix, self.sens, self.rbtIpPort)
+		return rec
+	def _drain(self)->bool:
+		# 非阻塞读空接收队列，仅解码最后一个完整帧；完整帧收到后与收包缓冲交换，
+		# 其后的短包/无效包只写入收包缓冲，不会撕裂已保存的帧
+		fresh=0
+		while(1):
+			try:
+				n=self.sk.recv_into(self._rxBuf)
+			except (BlockingIOError, InterruptedError):
+				break
+			except ConnectionResetError:
+				continue
+			if(self.tap is not None):
+				self.tap.rx(self._rxBuf, n)
+			if(n<self.sensSize):
+				self.sensDropped+=1
+				continue
+			if(fresh):
+				self.sensDropped+=1
+			fresh=n
+			self._rxBuf, self._rxFrame=self._rxFrame, self._rxBuf
+			self.sensRecvTime=time.monotonic()
+		if(fresh):
+			self.unpackData(self._rxFrame)
+			self.sensSeq+=1
+		return fresh>0
+	def recv(self, timeout:float=0.)->maniSdkSensDataClass:
+		'''timeout=0不阻塞；>0时无新帧则在selector上最多等待timeout秒；None一直等待。
+		无新帧时返回的仍是上一帧内容，需要判新旧请用recvTagged'''
+		self.recvTagged(timeout)
 		return self.sens
+	def recvTagged(self, timeout:float=0.):
+		'''返回(sens, sensSeq, age)，age为最新帧距今秒数，尚无数据时为inf'''
+		if(not self._drain() and timeout!=0):
+			deadline=None if timeout is None else time.monotonic()+timeout
+			while(1):
+				wait=None if deadline is None else deadline-time.monotonic()
+				if(wait is not None and wait<=0):
+					break
+				if(self.sel.select(wait) and self._drain()):
+					break
+		age=time.monotonic()-self.sensRecvTime if self.sensSeq else float('inf')
+		return self.sens, self.sensSeq, age
 
 	def packData(self):
 		"""打包传感器数据"""
 		return self.sens.packSensData()
 
 	def unpackData(self,buf):
-		# 务必注意c++的自动内存对齐，数据连续问题
-		fmts=self.sens.getFmts()
-		sizes=self.sens.getFmtSizes()
-		keys=list(self.sens.__dict__.keys())
-		idx=0
-		for i in range(len(fmts)):
-			setattr(self.sens, keys[i], np.array(struct.unpack(fmts[i],buf[idx:idx+sizes[i]])))
-			idx+=sizes[i]
-		self.sens.planName =self.sens.planName.tobytes().decode('utf-8')
-		self.sens.actTipPRpy2B =self.sens.actTipPRpy2B.reshape((2,-1))
-		self.sens.actTipVW2B =self.sens.actTipVW2B.reshape((2,-1))
-		self.sens.actTipFM2B =self.sens.actTipFM2B.reshape((2,-1))
-		self.sens.tgtTipPRpy2B =self.sens.tgtTipPRpy2B.reshape((2,-1))
-		self.sens.tgtTipVW2B =self.sens.tgtTipVW2B.reshape((2,-1))
-		self.sens.tgtTipFM2B =self.sens.tgtTipFM2B.reshape((2,-1))
+		self.sens.unpackData(buf)
 
 	def packCtrlData(self, ctrl:maniSdkCtrlDataClass):
-		buf=struct.pack('6h', ctrl.inCharge, ctrl.filtLevel, ctrl.armMode,
-								ctrl.fingerMode, ctrl.neckMode, ctrl.lumbarMode)
-		buf+=ctrl.armCmd.astype(dtype=np.float32).tobytes()
-		buf+=ctrl.armFM.astype(dtype=np.float32).tobytes()
-		buf+=ctrl.fingerLeft.astype(dtype=np.float32).tobytes()
-		buf+=ctrl.fingerRight.astype(dtype=np.float32).tobytes()
-		buf+=ctrl.neckCmd.astype(dtype=np.float32).tobytes()
-		buf+=ctrl.lumbarCmd.astype(dtype=np.float32).tobytes()
-		# if(len(buf)!=184):
-		# 	print("maniSdk cmd数据udp打包大小不匹配！",len(buf))
-		# 	exit()
-		return buf
+		return ctrl.packData()
 
 	def packSensData(self):
 		"""打包传感器数据"""
-		buf = b""
-		buf += struct.pack('i', self.sens.dataSize.item())
-		buf += struct.pack('d', self.sens.timestamp.item())
-		buf += self.sens.key.astype(np.int16).tobytes()
-		buf += self.sens.planName.encode('utf-8')[:16].ljust(16, b'\x00')
-		buf += self.sens.state.astype(np.int16).tobytes()
-		buf += self.sens.joy.astype(np.float32).tobytes()
-		buf += self.sens.rpy.astype(np.float32).tobytes()
-		buf += self.sens.gyr.astype(np.float32).tobytes()
-		buf += self.sens.acc.astype(np.float32).tobytes()
-		buf += self.sens.actJ.astype(np.float32).tobytes()
-		buf += self.sens.actW.astype(np.float32).tobytes()
-		buf += self.sens.actT.astype(np.float32).tobytes()
-		buf += self.sens.drvTemp.astype(np.int16).tobytes()
-		buf += self.sens.drvState.astype(np.int16).tobytes()
-		buf += self.sens.drvErr.astype(np.int16).tobytes()
-		buf += self.sens.tgtJ.astype(np.float32).tobytes()
-		buf += self.sens.tgtW.astype(np.float32).tobytes()
-		buf += self.sens.tgtT.astype(np.float32).tobytes()
-		buf += self.sens.actFingerLeft.astype(np.float32).tobytes()
-		buf += self.sens.actFingerRight.astype(np.float32).tobytes()
-		buf += self.sens.tgtFingerLeft.astype(np.float32).tobytes()
-		buf += self.sens.tgtFingerRight.astype(np.float32).tobytes()
-		buf += self.sens.actTipPRpy2B.astype(np.float32).tobytes()
-		buf += self.sens.actTipVW2B.astype(np.float32).tobytes()
-		buf += self.sens.actTipFM2B.astype(np.float32).tobytes()
-		buf += self.sens.tgtTipPRpy2B.astype(np.float32).tobytes()
-		buf += self.sens.tgtTipVW2B.astype(np.float32).tobytes()
-		buf += self.sens.tgtTipFM2B.astype(np.float32).tobytes()
-		return buf
-
+		return self.sens.packSensData()
@@ -0,0 +1,3 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
\ No newline at end of file
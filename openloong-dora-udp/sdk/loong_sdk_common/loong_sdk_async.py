@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+SDK的asyncio UDP传输(asyncio.DatagramProtocol)
+
+与同步SDK使用同一套数据类与线格式，收发在事件循环内完成，多路通道(底盘、关节、操作)
+可由一个事件循环驱动，无需每路一个线程。接收为最新帧语义：两次读取之间到达的多帧只解码最后一帧。
+	await sdk.open()
+	await sdk.send(ctrl)
+	async for sens in sdk: ...		#每到一帧新数据产出一次
+	sens=await sdk.recv(timeout)	#超时返回None
+======================================================'''
+import asyncio
+import time
+from loong_sdk_schema import sdkFrameDataClass
+from loong_sdk_record import sdkRecordTapClass
+
+
+class _sdkDatagramProtocol(asyncio.DatagramProtocol):
+	def __init__(self, owner):
+		self.owner=owner
+	def datagram_received(self, data, addr):
+		self.owner._onDatagram(data)
+	def error_received(self, exc):
+		# 对端未启动时的ICMP不可达等，忽略后继续等待
+		pass
+	def connection_lost(self, exc):
+		self.owner._onClosed()
+
+
+class sdkAsyncTransportClass:
+	def __init__(self, ip:str, port:int, sens:sdkFrameDataClass):
+		self.rbtIpPort=(ip,port)
+		self.sens=sens
+		self.sensSize=sens.getCodec().size
+		self.sensSeq=0			#已解码的新帧计数
+		self.sensRecvTime=0.	#最新帧到达时刻，time.monotonic()
+		self.sensDropped=0		#被更新帧覆盖而未解码的帧及长度不符的数据报计数
+		self.transport=None
+		self._pending=None
+		self._event=None
+		self._closed=False
+		self.stats=None
+		self.tap=None
+
+	async def open(self):
+		loop=asyncio.get_running_loop()
+		self._event=asyncio.Event()
+		self.transport,_=await loop.create_datagram_endpoint(
+			lambda: _sdkDatagramProtocol(self), remote_addr=self.rbtIpPort)
+		return self
+	def close(self):
+		if(self.transport is not None):
+			self.transport.close()
+	async def __aenter__(self):
+		return await self.open()
+	async def __aexit__(self, *exc):
+		self.close()
+
+	def _onDatagram(self, data):
+		if(self.tap is not None):
+			self.tap.rx(data, len(data))
+		if(len(data)<self.sensSize):
+			self.sensDropped+=1
+			return
+		if(self._pending is not None):
+			self.sensDropped+=1
+		self._pending=data
+		self.sensRecvTime=time.monotonic()
+		self._event.set()
+	def _onClosed(self):
+		self._closed=True
+		if(self._event is not None):
+			self._event.set()
+
+	async def send(self, ctrl:sdkFrameDataClass):
+		buf=ctrl.packData()
+		self.transport.sendto(buf)
+		if(self.stats is not None):
+			self.stats.markSend()
+		if(self.tap is not None):
+			self.tap.tx(ctrl, buf)
+	def _take(self):
+		data,self._pending=self._pending,None
+		self._event.clear()
+		if(data is None):
+			return None
+		if(self.stats is None):
+			self.sens.unpackData(data)
+		else:
+			t0=time.perf_counter_ns()
+			self.sens.unpackData(data)
+			self.stats.markRecv(self.sens.timestamp[0], time.perf_counter_ns()-t0)
+		self.sensSeq+=1
+		return self.sens
+	def attachStats(self, stats=None):
+		'''挂接sdkTimingStatsClass，之后send与每帧新数据自动打点；传None解除'''
+		self.stats=stats
+		return stats
+	def attachRecorder(self, rec=None, prefix:str='sdk'):
+		'''挂接sdkRecorderClass，send的控制帧与收到的每个数据报写入'<prefix>.ctrl'/'<prefix>.sens'；传None解除'''
+		self.tap=None if rec is None else sdkRecordTapClass(rec, prefix, self.sens, self.rbtIpPort)
+		return rec
+	async def recv(self, timeout:float=None):
+		'''等待并解码下一帧新数据，timeout秒内无新帧返回None'''
+		if(self._pending is None and not self._closed):
+			try:
+				await asyncio.wait_for(self._event.wait(), timeout)
+			except asyncio.TimeoutError:
+				return None
+		return self._take()
+
+	def __aiter__(self):
+		return self
+	async def __anext__(self):
+		while(1):
+			if(self._pending is None):
+				if(self._closed):
+					raise StopAsyncIteration
+				await self._event.wait()
+			sens=self._take()
+			if(sens is not None):
+				return sens
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+收敛监视：按传感流判断运动是否真正到位，取代收到命令即报完成或固定阈值判断
+
+每个通道为一个传感字段：与目标的逐元素误差均不超过容差(容差可为标量或逐元素数组，按numpy广播)，
+且(可选)对应速度字段逐元素不超过速度阈值，即为该通道到位；全部通道连续到位dwell秒后判定收敛。
+	conv=sdkConvergeClass(dwell=0.3, timeout=10)
+	conv.expect('actTipPRpy2B', ctrl.armCmd[:, :6], tol=[0.02]*3+[0.1]*3, vel='actTipVW2B', velTol=0.05)
+	conv.expect('actFingerLeft', ctrl.fingerLeft, tol=5)
+	conv.expect(None, vel='actW', velTol=0.05, sl=slice(0, 14))	#只看速度：双臂关节静止
+	...
+	if(conv.update(sens)):			#sens为帧对象(按属性取字段)、结构化帧或dict(按键取字段)
+		报完成
+	elif(conv.expired):		#无新帧时用conv.poll()检查超时
+		报超时
+目标在expect时拷贝并转为float64，之后修改命令帧不影响本次判定；重新下发命令时clear()后重新expect。
+======================================================'''
+import time
+import numpy as np
+
+def _field(src, name):
+	try:
+		return src[name]
+	except (TypeError, KeyError, IndexError, ValueError):
+		return getattr(src, name)
+
+
+class sdkConvergeClass:
+	def __init__(self, dwell:float=0.2, timeout:float=None, clock=time.monotonic):
+		'''dwell: 全部通道须连续到位的秒数；timeout: 自clear/创建起未收敛即过期的秒数，None不过期'''
+		self.dwell=dwell
+		self.timeout=timeout
+		self.clock=clock
+		self.channels=[]
+		self.clear()
+
+	def clear(self):
+		'''清空通道并重新计时'''
+		self.channels=[]
+		self.startAt=self.clock()
+		self.inTolSince=None	#本轮连续到位的起始时刻
+		self.settledAt=None		#判定收敛的时刻
+		self.expired=False
+		self.updates=0
+		self._err={}
+		return self
+
+	def expect(self, name, target=None, tol=0., vel:str=None, velTol=0., sl=None):
+		'''登记一个通道：name字段逼近target(target为None时只看速度)，vel字段不超过velTol；
+		sl为取字段(及速度字段)子区间的切片/下标，如slice(0,14)只看双臂'''
+		if(target is None and vel is None):
+			raise ValueError(f'通道{name}既无目标也无速度条件')
+		if(target is not None):
+			target=np.array(target, np.float64)
+			tol=np.broadcast_to(np.asarray(tol, np.float64), target.shape).copy()
+		velTol=None if vel is None else np.asarray(velTol, np.float64)
+		self.channels.append((name, target, tol, vel, velTol, sl))
+		return self
+
+	def _check(self, src)->bool:
+		ok=True
+		for name, target, tol, vel, velTol, sl in self.channels:
+			if(target is not None):
+				act=np.asarray(_field(src, name), np.float64)
+				if(sl is not None):
+					act=act[sl]
+				# 误差按容差归一化，<=1即到位，最大值留作诊断
+				err=float(np.max(np.abs(act-target)/np.maximum(tol, 1e-12))) if act.size else 0.
+				self._err[name]=err
+				ok&=err<=1.
+			if(vel is not None):
+				v=np.asarray(_field(src, vel), np.float64)
+				if(sl is not None):
+					v=v[sl]
+				err=float(np.max(np.abs(v)/np.maximum(velTol, 1e-12))) if v.size else 0.
+				self._err[vel]=err
+				ok&=err<=1.
+		return ok
+
+	def update(self, src, t:float=None)->bool:
+		'''喂一帧传感数据，已收敛返回True；t缺省取clock()'''
+		t=self.clock() if t is None else t
+		self.updates+=1
+		if(self.settledAt is not None):
+			return True
+		if(self._check(src)):
+			if(self.inTolSince is None):
+				self.inTolSince=t
+			if(t-self.inTolSince>=self.dwell):
+				self.settledAt=t
+				return True
+		else:
+			self.inTolSince=None
+		if(self.timeout is not None and t-self.startAt>=self.timeout):
+			self.expired=True
+		return False
+
+	def poll(self, t:float=None)->bool:
+		'''无新帧时只检查超时，返回expired'''
+		t=self.clock() if t is None else t
+		if(self.settledAt is None and self.timeout is not None and t-self.startAt>=self.timeout):
+			self.expired=True
+		return self.expired
+
+	@property
+	def done(self)->bool:
+		return self.settledAt is not None
+	def error(self)->dict:
+		'''最近一次各字段的最大归一化误差(误差/容差，速度/阈值)，>1为未到位'''
+		return dict(self._err)
+	def elapsed(self)->float:
+		'''自计时起到收敛(或至今)的秒数'''
+		return (self.clock() if self.settledAt is None else self.settledAt)-self.startAt
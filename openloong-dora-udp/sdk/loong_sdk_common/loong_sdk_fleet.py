@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+多机批量SDK门面：N台同构机器人的控制帧、传感帧各存一个(N,)结构化数组，
+各字段即(N, ...)的堆叠视图，控制器可一条NumPy表达式算出全部机器人的命令。
+	fleet=sdkFleetClass([('192.168.1.201',8081), ('192.168.1.202',8081)],
+						jntSdkCtrlDataClass(31,3,3), jntSdkSensDataClass(31,3,3))	#以单机帧对象为模板，各行复制其当前内容
+	fleet.ctrl['j'][:]=fleet.sens['actJ']+0.1*(tgt-fleet.sens['actJ'])				#(N, jntNum)
+	fleet.send()							#一次sendmmsg发出全部N帧，各帧直接取自ctrl数组的行
+	rows=fleet.recv(timeout=0.002)			#一次或数次recvmmsg排空，按来源地址向量化映射到行，整批拷入sens
+	fleet.sens['actJ'][rows]				#本次有新帧的机器人
+全部机器人共用一个非阻塞UDP套接字；接收为最新帧语义，同一台一次收到多帧时只保留最后一帧。
+libc无recvmmsg/sendmmsg时退化为逐包sendto/recvfrom_into，行映射与解码仍为向量化。
+======================================================'''
+import ctypes
+import errno
+import os
+import selectors
+import socket
+import struct
+import time
+import numpy as np
+from loong_sdk_schema import sdkFrameDataClass
+
+_MSG_DONTWAIT=0x40
+_MAX_VLEN=1024		#UIO_MAXIOV，单次mmsg调用的数据报上限
+
+class _iovec(ctypes.Structure):
+	_fields_=[("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _sockaddr_in(ctypes.Structure):
+	_fields_=[("sin_family", ctypes.c_ushort), ("sin_port", ctypes.c_ushort),
+			("sin_addr", ctypes.c_uint32), ("sin_zero", ctypes.c_char*8)]
+
+class _msghdr(ctypes.Structure):
+	_fields_=[("msg_name", ctypes.c_void_p), ("msg_namelen", ctypes.c_uint32),
+			("msg_iov", ctypes.c_void_p), ("msg_iovlen", ctypes.c_size_t),
+			("msg_control", ctypes.c_void_p), ("msg_controllen", ctypes.c_size_t), ("msg_flags", ctypes.c_int)]
+
+class _mmsghdr(ctypes.Structure):
+	_fields_=[("msg_hdr", _msghdr), ("msg_len", ctypes.c_uint)]
+
+def _fieldView(arr, struct, fields):
+	'''ctypes结构体数组上的numpy视图，只取所需字段，可向量化读写'''
+	dt=np.dtype({'names': [f for f, _ in fields], 'formats': [fmt for _, fmt in fields],
+				'offsets': [_fieldOffset(struct, f) for f, _ in fields], 'itemsize': ctypes.sizeof(struct)})
+	return np.frombuffer(arr, dt)
+
+def _fieldOffset(struct, path):
+	off=0
+	for name in path.split('.'):
+		desc=getattr(struct, name)
+		off+=desc.offset
+		struct=dict(struct._fields_)[name]
+	return off
+
+def _addrKey(addr, port):
+	'''(sin_addr, sin_port)按网络字节序原值拼成u64，与收包的sockaddr_in直接比较'''
+	return (np.asarray(addr, np.uint64)<<np.uint64(16))|np.asarray(port, np.uint64)
+
+
+class sdkFleetClass:
+	def __init__(self, addrs, ctrl:sdkFrameDataClass, sens:sdkFrameDataClass, batch:int=0):
+		'''addrs: 各机器人(ip, port)，行号即其下标；ctrl/sens: 单机帧对象，给出帧格式与各行初值；
+		batch: 单次recvmmsg最多收取的数据报数，缺省为台数的2倍'''
+		self.num=len(addrs)
+		self.addrs=[(socket.gethostbyname(ip), port) for ip, port in addrs]
+		self.ctrlCodec=ctrl.getCodec()
+		self.sensCodec=sens.getCodec()
+		self.ctrlSize=self.ctrlCodec.size
+		self.sensSize=self.sensCodec.size
+		self.ctrl=np.repeat(ctrl.getFrame(), self.num)	#(N,)控制帧，send直接发其各行
+		self.sens=np.repeat(sens.getFrame(), self.num)	#(N,)传感帧，recv原地刷新
+		self._ctrlU8=self.ctrl.view(np.uint8).reshape(self.num, self.ctrlSize)
+		self._sensU8=self.sens.view(np.uint8).reshape(self.num, self.sensSize)
+		self.sensSeq=np.zeros(self.num, np.int64)		#各台已解码的新帧计数
+		self.sensRecvTime=np.zeros(self.num)			#各台最新帧到达时刻，time.monotonic()
+		self.sensDropped=0		#排空时丢弃的旧帧、长度不符及来源不明的数据报计数
+		self.sk=socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		self.sk.setblocking(0)
+		self.sel=selectors.DefaultSelector()
+		self.sel.register(self.sk, selectors.EVENT_READ)
+
+		# 来源地址 -> 行号：按键排序后二分
+		self._names=(_sockaddr_in*self.num)()
+		for i, (ip, port) in enumerate(self.addrs):
+			self._names[i].sin_family=socket.AF_INET
+			self._names[i].sin_port=socket.htons(port)
+			self._names[i].sin_addr=struct.unpack('I', socket.inet_aton(ip))[0]
+		nameView=_fieldView(self._names, _sockaddr_in, [('sin_port', '<u2'), ('sin_addr', '<u4')])
+		keys=_addrKey(nameView['sin_addr'], nameView['sin_port'])
+		if(len(np.unique(keys))!=self.num):
+			raise ValueError(f'机器人地址重复：{addrs}')
+		self._order=np.argsort(keys)
+		self._keys=keys[self._order]
+
+		self.batch=min(_MAX_VLEN, batch or max(32, 2*self.num))
+		self._rxSize=(self.sensSize+64)//64*64		#长于帧的数据报截断后仍可判出长度不符
+		self._rx=np.zeros((self.batch, self._rxSize), np.uint8)
+		self._rxAddr=np.zeros(self.batch, np.uint32)
+		self._rxPort=np.zeros(self.batch, np.uint16)
+		self._rxLen=np.zeros(self.batch, np.int64)
+		self._fresh=np.zeros(self.num, bool)
+		try:
+			self._initMmsg()
+		except (OSError, AttributeError) as e:
+			print(f'批量收发不可用，改为逐包收发：{e}')
+			self._sendmmsg=None
+
+	def _initMmsg(self):
+		libc=ctypes.CDLL(None, use_errno=True)
+		self._recvmmsg=libc.recvmmsg
+		self._recvmmsg.argtypes=[ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+		self._recvmmsg.restype=ctypes.c_int
+		self._sendmmsg=libc.sendmmsg
+		self._sendmmsg.argtypes=[ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+		self._sendmmsg.restype=ctypes.c_int
+		self.fd=self.sk.fileno()
+		nameSize=ctypes.sizeof(_sockaddr_in)
+		# 发送：第i条消息固定指向ctrl第i行与第i台地址，全发时无需逐行填写；
+		# 部分发送在_txSub上按行号向量化改写名字与iov指针
+		self._txIov=(_iovec*self.num)()
+		self._txMsgs=(_mmsghdr*self.num)()
+		self._txSubMsgs=(_mmsghdr*self.num)()
+		for i in range(self.num):
+			self._txIov[i].iov_base=self._ctrlU8.ctypes.data+i*self.ctrlSize
+			self._txIov[i].iov_len=self.ctrlSize
+			for msgs in (self._txMsgs, self._txSubMsgs):
+				hdr=msgs[i].msg_hdr
+				hdr.msg_name=ctypes.addressof(self._names[i])
+				hdr.msg_namelen=nameSize
+				hdr.msg_iov=ctypes.addressof(self._txIov[i])
+				hdr.msg_iovlen=1
+		self._txSub=_fieldView(self._txSubMsgs, _mmsghdr, [('msg_hdr.msg_name', '<u8'), ('msg_hdr.msg_iov', '<u8')])
+		self._nameAddr=ctypes.addressof(self._names)+np.arange(self.num, dtype=np.uint64)*nameSize
+		self._iovAddr=ctypes.addressof(self._txIov)+np.arange(self.num, dtype=np.uint64)*ctypes.sizeof(_iovec)
+		# 接收：第i个数据报写入_rx第i行，来源地址写入_rxNames[i]
+		self._rxNames=(_sockaddr_in*self.batch)()
+		self._rxIov=(_iovec*self.batch)()
+		self._rxMsgs=(_mmsghdr*self.batch)()
+		for i in range(self.batch):
+			self._rxIov[i].iov_base=self._rx.ctypes.data+i*self._rxSize
+			self._rxIov[i].iov_len=self._rxSize
+			hdr=self._rxMsgs[i].msg_hdr
+			hdr.msg_name=ctypes.addressof(self._rxNames[i])
+			hdr.msg_iov=ctypes.addressof(self._rxIov[i])
+			hdr.msg_iovlen=1
+		self._rxHdr=_fieldView(self._rxMsgs, _mmsghdr, [('msg_hdr.msg_namelen', '<u4'), ('msg_len', '<u4')])
+		self._rxNameView=_fieldView(self._rxNames, _sockaddr_in, [('sin_port', '<u2'), ('sin_addr', '<u4')])
+		self._nameSize=nameSize
+
+	def send(self, rows=None)->int:
+		'''发出ctrl各行(rows为行号序列或布尔掩码，缺省全部)，返回发出帧数'''
+		if(rows is None):
+			n=self.num
+			if(self._sendmmsg is not None):
+				return self._sendAll(self._txMsgs, n)
+			rows=range(n)
+		else:
+			rows=np.arange(self.num)[rows] if np.asarray(rows).dtype==bool else np.asarray(rows, np.intp)
+			n=len(rows)
+			if(self._sendmmsg is not None):
+				self._txSub['msg_hdr.msg_name'][:n]=self._nameAddr[rows]
+				self._txSub['msg_hdr.msg_iov'][:n]=self._iovAddr[rows]
+				return self._sendAll(self._txSubMsgs, n)
+		for i in rows:
+			self.sk.sendto(self._ctrlU8[i], self.addrs[i])
+		return n
+	def _sendAll(self, msgs, n:int)->int:
+		base=ctypes.addressof(msgs)
+		msgSize=ctypes.sizeof(_mmsghdr)
+		sent=0
+		while(sent<n):
+			k=self._sendmmsg(self.fd, base+sent*msgSize, min(n-sent, _MAX_VLEN), 0)
+			if(k<0):
+				err=ctypes.get_errno()
+				if(err==errno.EINTR):
+					continue
+				raise OSError(err, os.strerror(err))
+			sent+=k
+		return sent
+
+	def _recvBatch(self)->int:
+		'''非阻塞收一批到_rx，填写各数据报的来源地址与长度，返回个数(无数据为0)'''
+		if(self._sendmmsg is not None):
+			self._rxHdr['msg_hdr.msg_namelen']=self._nameSize
+			n=self._recvmmsg(self.fd, ctypes.addressof(self._rxMsgs), self.batch, _MSG_DONTWAIT, None)
+			if(n<0):
+				err=ctypes.get_errno()
+				if(err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR, errno.ECONNREFUSED)):
+					return 0
+				raise OSError(err, os.strerror(err))
+			self._rxAddr[:n]=self._rxNameView['sin_addr'][:n]
+			self._rxPort[:n]=self._rxNameView['sin_port'][:n]
+			self._rxLen[:n]=self._rxHdr['msg_len'][:n]
+			return n
+		n=0
+		while(n<self.batch):
+			try:
+				size, (ip, port)=self.sk.recvfrom_into(self._rx[n])
+			except (BlockingIOError, InterruptedError, ConnectionRefusedError):
+				break
+			self._rxAddr[n]=struct.unpack('I', socket.inet_aton(ip))[0]
+			self._rxPort[n]=socket.htons(port)
+			self._rxLen[n]=size
+			n+=1
+		return n
+	def _drain(self)->np.ndarray:
+		# 逐批：来源地址二分映射到行，同一台取批内最后一帧，一次花式索引拷入sens
+		fresh=self._fresh
+		fresh[:]=False
+		valid=0
+		while(1):
+			n=self._recvBatch()
+			if(n==0):
+				break
+			keys=_addrKey(self._rxAddr[:n], self._rxPort[:n])
+			pos=np.minimum(np.searchsorted(self._keys, keys), self.num-1)
+			ok=(self._keys[pos]==keys)&(self._rxLen[:n]>=self.sensSize)
+			idx=np.flatnonzero(ok)[::-1]
+			rows, first=np.unique(self._order[pos[idx]], return_index=True)
+			self._sensU8[rows]=self._rx[idx[first], :self.sensSize]
+			fresh[rows]=True
+			valid+=len(idx)
+			self.sensDropped+=n-len(idx)
+			if(n<self.batch):
+				break
+		rows=np.flatnonzero(fresh)
+		if(len(rows)):
+			self.sensDropped+=valid-len(rows)
+			self.sensSeq[rows]+=1
+			self.sensRecvTime[rows]=time.monotonic()
+		return rows
+	def recv(self, timeout:float=0.)->np.ndarray:
+		'''排空接收队列，返回本次有新帧的行号；timeout=0不阻塞，>0时一帧未收到则最多等待timeout秒，None一直等待'''
+		rows=self._drain()
+		if(len(rows) or timeout==0):
+			return rows
+		deadline=None if timeout is None else time.monotonic()+timeout
+		while(1):
+			wait=None if deadline is None else deadline-time.monotonic()
+			if(wait is not None and wait<=0):
+				return rows
+			if(self.sel.select(wait)):
+				rows=self._drain()
+				if(len(rows)):
+					return rows
+	def age(self)->np.ndarray:
+		'''各台最新帧距今秒数，尚无数据为inf'''
+		return np.where(self.sensSeq>0, time.monotonic()-self.sensRecvTime, np.inf)
+	def close(self):
+		self.sel.close()
+		self.sk.close()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+固定周期控制循环调度器
+
+按time.monotonic_ns的绝对截止时刻推进，不随单步耗时漂移；等待采用先sleep、末段自旋的混合方式，
+可选SCHED_FIFO实时优先级与CPU绑核。统计超时(overrun，单步在截止时刻后才结束)次数与因此错过的整周期数，并以直方图记录每周期唤醒延迟
+(实际唤醒时刻-截止时刻)，给出p50/p99/max。
+	loop=sdkLoopClass(500, name='jnt')
+	for i in loop.range(steps):
+		...
+	print(loop.report())
+======================================================'''
+import os
+import time
+
+
+class sdkLoopClass:
+	def __init__(self, hz:float, name:str='loop', spinUs:int=300, fifoPrio:int=0, cpus=None,
+				histBinUs:int=10, histMaxUs:int=100000):
+		'''spinUs: 截止前改为自旋的时长；fifoPrio>0时尝试SCHED_FIFO；cpus: 绑定的CPU编号集合'''
+		self.name=name
+		self.periodNs=int(round(1e9/hz))
+		self.spinNs=spinUs*1000
+		self.histBinNs=histBinUs*1000
+		self.hist=[0]*(histMaxUs//histBinUs+1)		#末格为溢出格
+		self.maxLatNs=0
+		self.count=0
+		self.overruns=0		#单步结束时已过截止时刻的次数
+		self.missed=0		#因超时跳过的整周期数
+		self.deadline=0
+		setRealtime(fifoPrio, cpus)
+
+	def start(self):
+		'''以当前时刻为相位起点，下一截止时刻为一个周期后'''
+		self.deadline=time.monotonic_ns()+self.periodNs
+	def remaining(self)->float:
+		'''距进入自旋段的秒数，可作为本周期内阻塞等待(如收包)的超时'''
+		return max(0, self.deadline-self.spinNs-time.monotonic_ns())*1e-9
+	def wait(self)->int:
+		'''等待至本周期截止时刻并推进到下一周期，返回跳过的整周期数(单步超时但不足一个周期时为0，仍计入overruns)'''
+		now=time.monotonic_ns()
+		remain=self.deadline-now
+		if(remain<0):
+			self.overruns+=1
+		if(remain>self.spinNs):
+			time.sleep((remain-self.spinNs)*1e-9)
+		while(time.monotonic_ns()<self.deadline):
+			pass
+		now=time.monotonic_ns()
+		lat=now-self.deadline
+		self.count+=1
+		if(lat>self.maxLatNs):
+			self.maxLatNs=lat
+		idx=lat//self.histBinNs
+		self.hist[idx if idx<len(self.hist) else -1]+=1
+		# 本周期已被整周期地错过时不补跑，跳到下一个未来的截止时刻
+		missed=lat//self.periodNs
+		self.missed+=missed
+		self.deadline+=(missed+1)*self.periodNs
+		return missed
+	def range(self, steps:int):
+		'''产出0..steps-1，首步立即执行，之后每步前等待至截止时刻'''
+		self.start()
+		for i in range(steps):
+			if(i):
+				self.wait()
+			yield i
+
+	def percentile(self, q:float)->float:
+		'''唤醒延迟的q分位(0~100)，单位us，按直方图格上沿估计'''
+		if(self.count==0):
+			return 0.
+		target=q/100*self.count
+		acc=0
+		for i,n in enumerate(self.hist):
+			acc+=n
+			if(acc>=target and n):
+				if(i==len(self.hist)-1):
+					return self.maxLatNs/1000
+				return min((i+1)*self.histBinNs, self.maxLatNs)/1000
+		return self.maxLatNs/1000
+	def stats(self)->dict:
+		return {
+			"name": self.name,
+			"hz": 1e9/self.periodNs,
+			"count": self.count,
+			"overruns": self.overruns,
+			"missed": self.missed,
+			"p50_us": self.percentile(50),
+			"p99_us": self.percentile(99),
+			"max_us": self.maxLatNs/1000,
+		}
+	def report(self)->str:
+		st=self.stats()
+		return (f"[{st['name']}] {st['hz']:.0f}Hz 周期数 {st['count']} 超时 {st['overruns']} 跳过周期 {st['missed']} "
+				f"唤醒延迟 p50 {st['p50_us']:.0f}us p99 {st['p99_us']:.0f}us max {st['max_us']:.0f}us")
+	def resetStats(self):
+		self.hist=[0]*len(self.hist)
+		self.maxLatNs=0
+		self.count=0
+		self.overruns=0
+		self.missed=0
+
+
+def setRealtime(fifoPrio:int=0, cpus=None):
+	'''尽力设置当前进程的SCHED_FIFO优先级与CPU亲和性，权限不足或平台不支持时仅提示'''
+	if(cpus):
+		try:
+			os.sched_setaffinity(0, set(cpus))
+		except (AttributeError, OSError) as e:
+			print(f"CPU绑核失败: {e}")
+	if(fifoPrio>0):
+		try:
+			os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(fifoPrio))
+		except (AttributeError, OSError) as e:
+			print(f"SCHED_FIFO设置失败(需root或CAP_SYS_NICE): {e}")
+
+def loopFromEnv(defaultHz:float, name:str)->sdkLoopClass:
+	'''按环境变量构造调度器，便于在dataflow.yml的env中配置：
+	LOOP_HZ 频率，LOOP_SPIN_US 自旋时长，RT_PRIO SCHED_FIFO优先级，CPU_AFFINITY 如"2,3"'''
+	cpus=os.environ.get("CPU_AFFINITY", "")
+	return sdkLoopClass(float(os.environ.get("LOOP_HZ", defaultHz)), name=name,
+						spinUs=int(os.environ.get("LOOP_SPIN_US", 300)),
+						fifoPrio=int(os.environ.get("RT_PRIO", 0)),
+						cpus=[int(c) for c in cpus.split(",") if c.strip()])
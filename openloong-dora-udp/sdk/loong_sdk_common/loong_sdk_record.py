@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+SDK UDP收发帧录制与回放
+
+录制：原始控制帧、传感帧连同time.monotonic_ns时刻追加写入内存映射文件，文件按定长chunk分块、
+块内列式存放(时刻t、通道chan、长度len、偏移off 四列 + 负载区)，文件头含通道元数据与chunk索引
+(每块首末时刻、条数)。写入只是几次类型化memoryview赋值与一次负载拷贝，可常开。
+	rec=sdkRecorderClass('run.lrec')
+	sdk.attachRecorder(rec)				#jntSdkClass/maniSdkClass/异步SDK，之后send/recv自动录制
+	ch=rec.channel('chassis.cmd', 'tx', peer=(ip,port))
+	rec.write(ch, buf)
+	rec.close()
+回放：
+	rd=sdkRecordReaderClass('run.lrec')
+	for t,name,payload in rd.frames(t0=..., t1=...): ...	#按chunk索引+二分定位起点
+	sdkReplayClass(rd, {'jnt.ctrl':('127.0.0.1',8081)}).play(speed=2.)
+命令行：python loong_sdk_record.py info run.lrec / play run.lrec --speed 2 --to jnt.ctrl=127.0.0.1:8081
+文件布局(小端)：
+	[0,4096)		头：magic、版本、chunk参数、已用chunk数、元数据(JSON)
+	[4096,hdr)		chunk索引：每项 tFirst(i8) tLast(i8) count(u4) used(u4) 保留(8)
+	hdr+k*chunkBytes	第k个chunk：块头64字节，t列(i8)、chan列(u2)、len列(u4)、off列(u4)，其后为负载区
+======================================================'''
+import json
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+_MAGIC=b'LOONGREC'
+_CHUNK_MAGIC=b'CHNK'
+_VERSION=1
+_META_OFF=64
+_HEAD_BYTES=4096
+_HEAD_FMT='<8sIIIIII'		#magic version chunkBytes chunkCap maxChunks nChunks metaLen
+_INDEX_DTYPE=np.dtype([('tFirst','<i8'), ('tLast','<i8'), ('count','<u4'), ('used','<u4'), ('_pad','V8')])
+_CHUNK_HEAD=64
+_CHUNK_FMT='<4sII'			#magic count used
+
+def _pageAlign(n:int)->int:
+	return (n+mmap.ALLOCATIONGRANULARITY-1)//mmap.ALLOCATIONGRANULARITY*mmap.ALLOCATIONGRANULARITY
+
+def _chunkLayout(chunkBytes:int, chunkCap:int):
+	'''chunk内各列与负载区的偏移'''
+	tOff=_CHUNK_HEAD
+	chanOff=tOff+8*chunkCap
+	lenOff=chanOff+2*chunkCap
+	offOff=lenOff+4*chunkCap
+	payOff=offOff+4*chunkCap
+	if(payOff>=chunkBytes):
+		raise ValueError(f"chunkBytes过小，列区已占{payOff}字节")
+	return tOff, chanOff, lenOff, offOff, payOff
+
+
+class sdkRecorderClass:
+	def __init__(self, path:str, chunkBytes:int=1<<22, chunkCap:int=8192, maxChunks:int=16384):
+		'''chunkBytes: 每块字节数(按页对齐)；chunkCap: 每块最多帧数；maxChunks: 索引容量(默认4MB x 16384 = 64GB)'''
+		self.path=path
+		self.chunkBytes=_pageAlign(chunkBytes)
+		self.chunkCap=chunkCap
+		self.maxChunks=maxChunks
+		self.layout=_chunkLayout(self.chunkBytes, chunkCap)
+		self.payloadCap=self.chunkBytes-self.layout[4]
+		self.headBytes=_pageAlign(_HEAD_BYTES+maxChunks*_INDEX_DTYPE.itemsize)
+		self.meta={"startWallNs": time.time_ns(), "startMonoNs": time.monotonic_ns(), "channels": []}
+		self._names={}
+		self._lock=threading.Lock()
+		self.frames=0
+		self.dropped=0			#单帧超过负载区容量而未写入的帧数
+		self._fd=os.open(path, os.O_RDWR|os.O_CREAT|os.O_TRUNC, 0o644)
+		os.ftruncate(self._fd, self.headBytes)
+		self._head=mmap.mmap(self._fd, self.headBytes)
+		self._index=np.frombuffer(self._head, _INDEX_DTYPE, maxChunks, _HEAD_BYTES)
+		self._nChunks=0
+		self._chunk=None
+		self._writeHead()
+		self._openChunk()
+
+	def _writeHead(self):
+		meta=json.dumps(self.meta, ensure_ascii=False).encode('utf-8')
+		if(_META_OFF+len(meta)>_HEAD_BYTES):
+			raise ValueError("录制元数据超出文件头容量，通道过多")
+		struct.pack_into(_HEAD_FMT, self._head, 0, _MAGIC, _VERSION, self.chunkBytes, self.chunkCap,
+						self.maxChunks, self._nChunks, len(meta))
+		self._head[_META_OFF:_META_OFF+len(meta)]=meta
+
+	def channel(self, name:str, direction:str='tx', schema:str=None, dims:dict=None, peer=None)->int:
+		'''登记通道并返回其编号，同名通道返回已有编号；schema/dims为loong_sdk_schema帧格式，便于回放端解码'''
+		with self._lock:
+			ch=self._names.get(name)
+			if(ch is not None):
+				return ch
+			ch=len(self.meta["channels"])
+			self.meta["channels"].append({"name": name, "dir": direction, "schema": schema,
+										"dims": dims or {}, "peer": list(peer) if peer else None})
+			self._names[name]=ch
+			self._writeHead()
+			return ch
+
+	def _openChunk(self):
+		if(self._nChunks>=self.maxChunks):
+			raise RuntimeError(f"录制chunk数已达上限{self.maxChunks}")
+		self._sealChunk()
+		k=self._nChunks
+		os.ftruncate(self._fd, self.headBytes+(k+1)*self.chunkBytes)
+		chunk=mmap.mmap(self._fd, self.chunkBytes, offset=self.headBytes+k*self.chunkBytes)
+		struct.pack_into(_CHUNK_FMT, chunk, 0, _CHUNK_MAGIC, 0, 0)
+		mv=memoryview(chunk)
+		tOff, chanOff, lenOff, offOff, payOff=self.layout
+		cap=self.chunkCap
+		self._chunk=chunk
+		self._mv=mv
+		self._count=mv[4:8].cast('I')
+		self._used=mv[8:12].cast('I')
+		self._colT=mv[tOff:tOff+8*cap].cast('q')
+		self._colChan=mv[chanOff:chanOff+2*cap].cast('H')
+		self._colLen=mv[lenOff:lenOff+4*cap].cast('I')
+		self._colOff=mv[offOff:offOff+4*cap].cast('I')
+		self._payload=mv[payOff:]
+		self._n=0
+		self._u=0
+		self._nChunks=k+1
+		self._index[k]['count']=0
+		struct.pack_into('<I', self._head, 28, self._nChunks)
+
+	def _sealChunk(self):
+		'''写入当前chunk的索引项并释放其映射'''
+		if(self._chunk is None):
+			return
+		k=self._nChunks-1
+		entry=self._index[k]
+		if(self._n):
+			entry['tFirst']=self._colT[0]
+			entry['tLast']=self._colT[self._n-1]
+		entry['count']=self._n
+		entry['used']=self._u
+		for view in (self._count, self._used, self._colT, self._colChan, self._colLen, self._colOff, self._payload, self._mv):
+			view.release()
+		self._chunk.flush()
+		self._chunk.close()
+		self._chunk=None
+
+	def write(self, ch:int, buf, tNs:int=None):
+		'''追加一帧；buf为bytes/bytearray/memoryview等字节缓冲，tNs缺省为当前time.monotonic_ns()'''
+		n=len(buf)
+		if(n>self.payloadCap):
+			self.dropped+=1
+			return
+		if(tNs is None):
+			tNs=time.monotonic_ns()
+		with self._lock:
+			i=self._n
+			u=self._u
+			if(i>=self.chunkCap or u+n>self.payloadCap):
+				self._openChunk()
+				i=u=0
+			self._colT[i]=tNs
+			self._colChan[i]=ch
+			self._colLen[i]=n
+			self._colOff[i]=u
+			self._payload[u:u+n]=buf
+			self._n=i+1
+			self._u=u+n
+			# 块头计数最后写，读端(含异常退出后)以其为准
+			self._used[0]=u+n
+			self._count[0]=i+1
+			self.frames+=1
+
+	def flush(self):
+		with self._lock:
+			if(self._chunk is not None):
+				self._chunk.flush()
+			self._head.flush()
+
+	def close(self):
+		with self._lock:
+			if(self._head is None):
+				return
+			self._sealChunk()
+			self._writeHead()
+			del self._index
+			self._head.flush()
+			self._head.close()
+			self._head=None
+			os.close(self._fd)
+	def __enter__(self):
+		return self
+	def __exit__(self, *exc):
+		self.close()
+
+
+class sdkRecordTapClass:
+	'''SDK收发挂接点：以prefix登记'<prefix>.ctrl'(tx)与'<prefix>.sens'(rx)两个通道，
+	帧格式由帧对象的codec得出(ctrl在首次发送时登记)，供SDK的attachRecorder使用'''
+	def __init__(self, rec:sdkRecorderClass, prefix:str, sens, peer=None):
+		self.rec=rec
+		self.prefix=prefix
+		self.peer=peer
+		codec=sens.getCodec()
+		self.sensSize=codec.size
+		self.sensCh=rec.channel(prefix+'.sens', 'rx', codec.name, codec.dims, peer)
+		self.ctrlCh=None
+	def tx(self, ctrl, buf):
+		if(self.ctrlCh is None):
+			codec=ctrl.getCodec()
+			self.ctrlCh=self.rec.channel(self.prefix+'.ctrl', 'tx', codec.name, codec.dims, self.peer)
+		self.rec.write(self.ctrlCh, buf)
+	def rx(self, buf, n:int=None):
+		'''n为数据报实际长度，缺省按传感帧长截取(接收缓冲可长于帧)'''
+		self.rec.write(self.sensCh, memoryview(buf)[:self.sensSize if n is None else n])
+
+
+class sdkRecordReaderClass:
+	'''只读映射录制文件，各列为文件上的numpy零拷贝视图；未正常关闭的文件以块头计数恢复'''
+	def __init__(self, path:str):
+		self.path=path
+		self._file=open(path, 'rb')
+		self._mm=mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, version, self.chunkBytes, self.chunkCap, self.maxChunks, nChunks, metaLen=struct.unpack_from(_HEAD_FMT, self._mm, 0)
+		if(magic!=_MAGIC):
+			raise ValueError(f"不是录制文件: {path}")
+		self.meta=json.loads(bytes(self._mm[_META_OFF:_META_OFF+metaLen]).decode('utf-8'))
+		self.channels=[c["name"] for c in self.meta["channels"]]
+		self.headBytes=_pageAlign(_HEAD_BYTES+self.maxChunks*_INDEX_DTYPE.itemsize)
+		self.layout=_chunkLayout(self.chunkBytes, self.chunkCap)
+		self.nChunks=min(nChunks, (len(self._mm)-self.headBytes)//self.chunkBytes)
+		self.index=np.frombuffer(self._mm, _INDEX_DTYPE, self.nChunks, _HEAD_BYTES).copy()
+		self._chunks=[self._loadChunk(k) for k in range(self.nChunks)]
+		for k, cols in enumerate(self._chunks):
+			t=cols[0]
+			self.index[k]['count']=len(t)
+			if(len(t)):
+				self.index[k]['tFirst']=t[0]
+				self.index[k]['tLast']=t[-1]
+		self.index=self.index[self.index['count']>0]
+		self._chunks=[c for c in self._chunks if len(c[0])]
+
+	def _loadChunk(self, k:int):
+		base=self.headBytes+k*self.chunkBytes
+		magic, count, used=struct.unpack_from(_CHUNK_FMT, self._mm, base)
+		if(magic!=_CHUNK_MAGIC):
+			count=0
+		tOff, chanOff, lenOff, offOff, payOff=self.layout
+		mm=self._mm
+		return (np.frombuffer(mm, '<i8', count, base+tOff),
+				np.frombuffer(mm, '<u2', count, base+chanOff),
+				np.frombuffer(mm, '<u4', count, base+lenOff),
+				np.frombuffer(mm, '<u4', count, base+offOff),
+				base+payOff)
+
+	def __len__(self):
+		return int(self.index['count'].sum())
+	def timeRange(self):
+		'''(首帧, 末帧) monotonic_ns'''
+		if(len(self.index)==0):
+			return (0, 0)
+		return int(self.index['tFirst'][0]), int(self.index['tLast'][-1])
+	def channelId(self, name:str)->int:
+		return self.channels.index(name)
+	def codec(self, name:str):
+		'''通道登记了schema时返回其帧编解码器'''
+		from loong_sdk_schema import getFrameCodec
+		info=self.meta["channels"][self.channelId(name)]
+		return getFrameCodec(info["schema"], **info["dims"]) if info["schema"] else None
+
+	def column(self, field:str)->np.ndarray:
+		'''整列(t/chan/len)拼接，跨chunk时拷贝'''
+		i={"t": 0, "chan": 1, "len": 2}[field]
+		cols=[c[i] for c in self._chunks]
+		return np.concatenate(cols) if cols else np.empty(0)
+
+	def frames(self, channels=None, t0:int=None, t1:int=None):
+		'''按时间顺序产出(tNs, 通道名, 负载memoryview)，[t0, t1)为monotonic_ns区间
+		起点由chunk索引与块内t列二分定位，不扫描之前的数据；负载为映射上的零拷贝视图，需保留时bytes(payload)'''
+		want=None if channels is None else {self.channelId(c) for c in channels}
+		k0=0 if t0 is None else int(np.searchsorted(self.index['tLast'], t0, 'left'))
+		mv=memoryview(self._mm)
+		names=self.channels
+		for k in range(k0, len(self._chunks)):
+			if(t1 is not None and self.index['tFirst'][k]>=t1):
+				break
+			t, chan, length, off, payOff=self._chunks[k]
+			i0=0 if t0 is None else int(np.searchsorted(t, t0, 'left'))
+			i1=len(t) if t1 is None else int(np.searchsorted(t, t1, 'left'))
+			for i in range(i0, i1):
+				c=int(chan[i])
+				if(want is not None and c not in want):
+					continue
+				start=payOff+int(off[i])
+				yield int(t[i]), names[c], mv[start:start+int(length[i])]
+
+	def close(self):
+		self._chunks=[]
+		self.index=None
+		try:
+			self._mm.close()
+		except BufferError:
+			# 仍有外部持有的负载memoryview(循环变量、未走完的frames生成器)，映射随其释放
+			pass
+		self._mm=None
+		self._file.close()
+	def __enter__(self):
+		return self
+	def __exit__(self, *exc):
+		self.close()
+
+
+class sdkReplayClass:
+	'''按原始节奏(或speed倍速)把录制帧重新发往替身服务端或客户端
+	targets: {通道名: (ip, port)}；未给出的tx通道默认发往录制时的对端地址，rx通道需显式给出'''
+	def __init__(self, reader:sdkRecordReaderClass, targets:dict=None):
+		self.reader=reader
+		self.targets={}
+		for info in reader.meta["channels"]:
+			addr=(targets or {}).get(info["name"])
+			if(addr is None and info["dir"]=='tx' and info["peer"]):
+				addr=tuple(info["peer"])
+			if(addr is not None):
+				self.targets[info["name"]]=tuple(addr)
+		self.sk=socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		self.sent=0
+
+	def play(self, speed:float=1., t0:int=None, t1:int=None, spinUs:int=200)->int:
+		'''speed<=0时不等待、尽快发送；返回发送帧数'''
+		spinNs=spinUs*1000
+		start=None
+		for t, name, payload in self.reader.frames(list(self.targets), t0, t1):
+			if(speed>0):
+				if(start is None):
+					start=(t, time.monotonic_ns())
+				due=start[1]+int((t-start[0])/speed)
+				remain=due-time.monotonic_ns()
+				if(remain>spinNs):
+					time.sleep((remain-spinNs)*1e-9)
+				while(time.monotonic_ns()<due):
+					pass
+			self.sk.sendto(payload, self.targets[name])
+			self.sent+=1
+		return self.sent
+
+
+def recorderFromEnv(name:str='LOONG_SDK_RECORD'):
+	'''环境变量给出录制路径时创建录制器(路径中{pid}替换为进程号)，否则返回None'''
+	path=os.environ.get(name)
+	if(not path):
+		return None
+	return sdkRecorderClass(path.replace('{pid}', str(os.getpid())))
+
+
+if __name__=='__main__':
+	import argparse
+	parser=argparse.ArgumentParser(description="SDK UDP录制文件查看与回放")
+	sub=parser.add_subparsers(dest="cmd", required=True)
+	p=sub.add_parser("info")
+	p.add_argument("path")
+	p=sub.add_parser("play")
+	p.add_argument("path")
+	p.add_argument("--speed", type=float, default=1., help="回放倍速，<=0为尽快发送")
+	p.add_argument("--to", action="append", default=[], help="通道=ip:port，可多次给出")
+	args=parser.parse_args()
+	with sdkRecordReaderClass(args.path) as rd:
+		if(args.cmd=="info"):
+			t0,t1=rd.timeRange()
+			chan=rd.column("chan")
+			print(f"{args.path}: {len(rd)} 帧, {len(rd.index)} 个chunk, 时长 {(t1-t0)*1e-9:.3f}s")
+			for i,info in enumerate(rd.meta["channels"]):
+				print(f"  [{i}] {info['name']:<16} {info['dir']}  {int((chan==i).sum())} 帧  schema={info['schema']} peer={info['peer']}")
+		else:
+			targets={}
+			for item in args.to:
+				name,addr=item.split("=")
+				ip,port=addr.rsplit(":",1)
+				targets[name]=(ip,int(port))
+			player=sdkReplayClass(rd, targets)
+			t=time.monotonic()
+			n=player.play(args.speed)
+			print(f"回放 {n} 帧，用时 {time.monotonic()-t:.3f}s，目标 {player.targets}")
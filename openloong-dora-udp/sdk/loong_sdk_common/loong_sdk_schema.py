@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+SDK数据帧的统一线格式(wire schema)登记表
+
+每种帧以 (字段名, dtype, 数量表达式) 声明一次，按维度参数生成numpy结构化dtype，
+jnt/mani 的传感、命令帧的打包与解包均由此生成，SDK、服务端、dora客户端共用同一份布局。
+	数量表达式：None 为标量；字符串按维度参数求值，如 'jntNum'、'2,armDof'
+	字段紧凑排列(无对齐填充)，与c++散装内存及原逐段struct打包一致
+======================================================'''
+import functools
+import numpy as np
+
+_schemas={}
+
+def registerSchema(name:str, fields):
+	'''登记帧格式，fields为[(字段名, dtype, 数量表达式), ...]，顺序即线上顺序'''
+	_schemas[name]=tuple(fields)
+	_getFrameCodec.cache_clear()
+
+def getSchema(name:str):
+	return _schemas[name]
+
+def _evalCount(expr, dims):
+	if(expr is None):
+		return ()
+	shape=eval(expr, {'__builtins__': {}}, dims)
+	return shape if isinstance(shape, tuple) else (shape,)
+
+class frameCodecClass:
+	'''某帧格式在一组维度参数下的编解码器，dtype只构建一次'''
+	def __init__(self, name:str, dims:dict):
+		self.name=name
+		self.dims=dict(dims)
+		self.dtype=np.dtype([(field, np.dtype(fmt), _evalCount(cnt, self.dims))
+							for field, fmt, cnt in getSchema(name)])
+		self.size=self.dtype.itemsize
+		self.names=self.dtype.names
+		self.scalarNames=tuple(n for n in self.names if not self.dtype[n].shape and self.dtype[n].kind!='S')
+		self.strNames=tuple(n for n in self.names if self.dtype[n].kind=='S')
+
+	def newFrames(self, count:int=1)->np.ndarray:
+		'''全零的结构化帧数组'''
+		return np.zeros(count, self.dtype)
+	def decode(self, buf)->np.ndarray:
+		'''零拷贝解码单帧，返回buf上的结构化视图(shape=(1,))；buf可长于帧'''
+		return np.frombuffer(buf, self.dtype, 1)
+	def decodeBatch(self, buf, count:int=-1)->np.ndarray:
+		'''零拷贝解码连续排列的多帧'''
+		return np.frombuffer(buf, self.dtype, count)
+	def decodeInto(self, buf, frames:np.ndarray):
+		'''拷入预分配帧数组，frames可为单帧或多帧'''
+		np.copyto(frames.view(np.uint8).reshape(-1), np.frombuffer(buf, np.uint8, frames.nbytes))
+	def encode(self, frames:np.ndarray)->memoryview:
+		'''帧数组的线格式字节视图(连续数组时零拷贝)'''
+		return memoryview(np.ascontiguousarray(frames, self.dtype).view(np.uint8))
+	def toDict(self, frame)->dict:
+		'''单帧按字段名展开为{字段名: 数组视图}，字符串字段解码为str'''
+		out={}
+		for name in self.names:
+			val=frame[name]
+			if(name in self.strNames):
+				val=bytes(val).rstrip(b'\x00').decode('utf-8', 'ignore')
+			out[name]=val
+		return out
+
+def getFrameCodec(name:str, **dims)->frameCodecClass:
+	return _getFrameCodec(name, tuple(sorted(dims.items())))
+
+@functools.lru_cache(maxsize=None)
+def _getFrameCodec(name, dimItems):
+	return frameCodecClass(name, dict(dimItems))
+
+
+class sdkFrameDataClass:
+	'''基于schema的帧数据基类
+	实例持有一块预分配帧缓冲：数组字段为其上的可写视图，标量/字符串字段赋值时同步写入缓冲，
+	packData直接返回该缓冲，unpackData原地刷新，逐帧不分配数组。
+	注意：持有字段引用时，下一帧到来后其内容随之更新，需保留历史请自行copy()'''
+	_schema:str=''
+	def _initFrame(self, **dims):
+		codec=getFrameCodec(self._schema, **dims)
+		object.__setattr__(self, '_codec', codec)
+		object.__setattr__(self, '_raw', bytearray(codec.size))
+		object.__setattr__(self, '_u8', np.frombuffer(self._raw, np.uint8))
+		object.__setattr__(self, '_rec', np.frombuffer(self._raw, codec.dtype))
+		mv=memoryview(self._raw)
+		strViews={}
+		for name in codec.strNames:
+			off=codec.dtype.fields[name][1]
+			strViews[name]=(mv[off:off+codec.dtype[name].itemsize], bytearray(codec.dtype[name].itemsize))
+		object.__setattr__(self, '_strViews', strViews)
+		# ！！！顺序不能乱！！！！
+		for name in codec.names:
+			if(name in codec.strNames):
+				object.__setattr__(self, name, "none")
+			elif(name in codec.scalarNames):
+				object.__setattr__(self, name, self._rec[name][0].item())
+			else:
+				object.__setattr__(self, name, self._rec[name][0])
+	def __setattr__(self, name, value):
+		# 字段赋值写入帧缓冲而非替换视图，兼容 sens.actJ=np.array(...) 写法
+		strView=self._strViews.get(name)
+		if(strView is not None):
+			self._rec[name]=str(value).encode('utf-8')
+			strView[1][:]=strView[0]
+		elif(name in self._codec.scalarNames):
+			self._rec[name]=value
+		else:
+			view=self.__dict__.get(name)
+			if(isinstance(view, np.ndarray) and name in self._codec.names):
+				view[...]=value
+				return
+		object.__setattr__(self, name, value)
+	def getCodec(self)->frameCodecClass:
+		return self._codec
+	def getFrame(self)->np.ndarray:
+		'''帧缓冲上的结构化视图(shape=(1,))'''
+		return self._rec
+	def getBuf(self)->bytearray:
+		'''整帧线格式字节，原地复用'''
+		return self._raw
+	def packData(self)->bytearray:
+		'''返回原地打包好的帧缓冲（非拷贝，下次修改字段后内容随之变化）'''
+		return self._raw
+	def unpackData(self,buf):
+		# 单次np.frombuffer拷入预分配帧缓冲，字段视图随之更新
+		np.copyto(self._u8, np.frombuffer(buf, np.uint8, self._u8.size))
+		for name in self._codec.scalarNames:
+			object.__setattr__(self, name, self._rec[name][0].item())
+		for name, (view, cache) in self._strViews.items():
+			if(view!=cache):
+				cache[:]=view
+				object.__setattr__(self, name, bytes(cache).rstrip(b'\x00').decode('utf-8', 'ignore'))
+
+
+# ==================== 帧格式登记 ====================
+# 传感帧公共部分：jnt与mani仅首字段名不同
+def _sensFields(sizeName):
+	return [
+		(sizeName,		'i4',	'1'),
+		('timestamp',	'f8',	'1'),
+		('key',			'i2',	'2'),
+		('planName',	'S16',	None),
+		('state',		'i2',	'2'),
+		('joy',			'f4',	'4'),
+		('rpy',			'f4',	'3'),
+		('gyr',			'f4',	'3'),
+		('acc',			'f4',	'3'),
+		('actJ',		'f4',	'jntNum'),
+		('actW',		'f4',	'jntNum'),
+		('actT',		'f4',	'jntNum'),
+		('drvTemp',		'i2',	'jntNum'),
+		('drvState',	'i2',	'jntNum'),
+		('drvErr',		'i2',	'jntNum'),
+		('tgtJ',		'f4',	'jntNum'),
+		('tgtW',		'f4',	'jntNum'),
+		('tgtT',		'f4',	'jntNum'),
+		('actFingerLeft',	'f4',	'fingerDofLeft'),
+		('actFingerRight',	'f4',	'fingerDofRight'),
+		('tgtFingerLeft',	'f4',	'fingerDofLeft'),
+		('tgtFingerRight',	'f4',	'fingerDofRight'),
+	]
+
+registerSchema('jntSens', _sensFields('size'))
+
+registerSchema('jntCtrl', [
+	('checker',		'i2',	None),
+	('size',		'i2',	None),
+	('state',		'i4',	None),
+	('torLimitRate','f4',	None),
+	('filtRate',	'f4',	None),
+	('j',			'f4',	'jntNum'),
+	('w',			'f4',	'jntNum'),
+	('t',			'f4',	'jntNum'),
+	('kp',			'f4',	'jntNum'),
+	('kd',			'f4',	'jntNum'),
+	('fingerLeft',	'f4',	'fingerDofLeft'),
+	('fingerRight',	'f4',	'fingerDofRight'),
+])
+
+registerSchema('maniSens', _sensFields('dataSize')+[
+	('actTipPRpy2B','f4',	'2,6'),
+	('actTipVW2B',	'f4',	'2,6'),
+	('actTipFM2B',	'f4',	'2,6'),
+	('tgtTipPRpy2B','f4',	'2,6'),
+	('tgtTipVW2B',	'f4',	'2,6'),
+	('tgtTipFM2B',	'f4',	'2,6'),
+])
+
+registerSchema('maniCtrl', [
+	('inCharge',	'i2',	None),
+	('filtLevel',	'i2',	None),
+	('armMode',		'i2',	None),
+	('fingerMode',	'i2',	None),
+	('neckMode',	'i2',	None),
+	('lumbarMode',	'i2',	None),
+	('armCmd',		'f4',	'2,armDof'),
+	('armFM',		'f4',	'2,6'),
+	('fingerLeft',	'f4',	'fingerDofLeft'),
+	('fingerRight',	'f4',	'fingerDofRight'),
+	('neckCmd',		'f4',	'neckDof'),
+	('lumbarCmd',	'f4',	'lumbarDof'),
+])
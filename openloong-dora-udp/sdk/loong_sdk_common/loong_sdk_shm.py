@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+纯Python共享内存传输(mmap + 顺序锁seqlock)，供无预编译共享内存库时使用
+
+一段共享内存含ctrl、sens两个槽位，各有一个u64序号：写端(每槽唯一)先把序号加1成奇数，
+写入整帧后再加1成偶数；读端读序号(奇数则重试)、拷贝、再读序号，两次一致即为完整帧。
+序号不变说明没有新帧，读端可直接跳过拷贝。
+	shm=sdkSeqlockShmClass('loong_jnt_sdk', ctrlSize, sensSize)	#不存在则创建，存在则挂接
+	shm.ctrl.write(ctrl.packData())
+	seq=shm.sens.read(buf, lastSeq)			#返回读到的序号，无新帧时不拷贝
+	view=shm.sens.view(codec.dtype)			#共享内存上的零拷贝结构化视图
+	s=shm.sens.begin(); x=view['actJ'][0].copy(); ok=shm.sens.validate(s)	#乐观读
+段文件位于/dev/shm(无则系统临时目录)，布局：
+	[0,64)		头：magic、版本、ctrl帧长、sens帧长
+	[64,...)	ctrl槽：序号(u64，占64字节) + 帧
+	其后		sens槽(64字节对齐)：序号 + 帧
+x86上Python/NumPy的存储按程序顺序可见；弱内存序平台上为尽力而为，以序号校验兜底
+======================================================'''
+import mmap
+import os
+import struct
+import tempfile
+import time
+import numpy as np
+
+_MAGIC=b'LSHM'
+_VERSION=1
+_HEAD_FMT='<4sIII'
+_SLOT_HEAD=64
+
+def _align64(n:int)->int:
+	return (n+63)//64*64
+
+def shmPath(name:str)->str:
+	base='/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+	return os.path.join(base, name)
+
+
+class sdkSeqlockSlotClass:
+	'''共享内存中的单个帧槽'''
+	def __init__(self, mm:mmap.mmap, off:int, size:int):
+		self.size=size
+		# 序号与帧区用类型化memoryview读写，比numpy标量运算开销小
+		mv=memoryview(mm)
+		self._seq=mv[off:off+8].cast('Q')
+		self._buf=mv[off+_SLOT_HEAD:off+_SLOT_HEAD+size]
+		self.torn=0			#读到写端写了一半而重试的次数
+	@property
+	def seq(self)->int:
+		return self._seq[0]
+	def write(self, buf):
+		'''整帧写入(单写端)；buf可长于帧'''
+		seq=self._seq
+		s=seq[0]&~1		#上一个写端死在写入中途时序号停在奇数，取偶校正，否则之后每次写完仍为奇数
+		seq[0]=s+1
+		if(len(buf)==self.size):
+			self._buf[:]=buf
+		else:
+			self._buf[:]=memoryview(buf)[:self.size]
+		seq[0]=s+2
+	def read(self, into, lastSeq:int=-1, spins:int=1000):
+		'''拷贝一致的一帧到into(可写缓冲，可长于帧)，返回其序号；序号等于lastSeq时不拷贝直接返回；
+		尚无数据返回0；写端长时间停在写入中(如异常退出)时返回None'''
+		seq=self._seq
+		for i in range(spins):
+			s1=seq[0]
+			if(s1&1):
+				# 写端被抢占时让出CPU(同进程写线程还需要GIL)
+				self.torn+=1
+				if(i>=8):
+					time.sleep(0)
+				continue
+			if(s1==lastSeq or s1==0):
+				return s1
+			if(len(into)==self.size):
+				into[:]=self._buf
+			else:
+				memoryview(into)[:self.size]=self._buf
+			if(seq[0]==s1):
+				return s1
+			self.torn+=1
+		return None
+	def view(self, dtype)->np.ndarray:
+		'''槽位上的零拷贝结构化视图(shape=(1,))，读取须配合begin/validate'''
+		return np.frombuffer(self._buf, dtype, 1)
+	def begin(self)->int:
+		'''乐观读开始：等到序号为偶数并返回'''
+		while(1):
+			s=self._seq[0]
+			if(not s&1):
+				return s
+			time.sleep(0)
+	def validate(self, s:int)->bool:
+		'''自begin以来无写入，期间读到的视图内容完整'''
+		return self._seq[0]==s
+
+
+class sdkSeqlockShmClass:
+	def __init__(self, name:str, ctrlSize:int, sensSize:int):
+		self.name=name
+		self.path=shmPath(name)
+		ctrlOff=64
+		sensOff=_align64(ctrlOff+_SLOT_HEAD+ctrlSize)
+		total=_align64(sensOff+_SLOT_HEAD+sensSize)
+		fd=os.open(self.path, os.O_RDWR|os.O_CREAT, 0o666)
+		try:
+			# 首个打开者截断到全长并写头，后来者校验帧长一致
+			if(os.fstat(fd).st_size==0):
+				os.ftruncate(fd, total)
+			self._mm=mmap.mmap(fd, total)
+		finally:
+			os.close(fd)
+		magic, version, cs, ss=struct.unpack_from(_HEAD_FMT, self._mm, 0)
+		if(magic!=_MAGIC):
+			struct.pack_into(_HEAD_FMT, self._mm, 0, _MAGIC, _VERSION, ctrlSize, sensSize)
+		elif((cs,ss)!=(ctrlSize,sensSize)):
+			self._mm.close()
+			raise ValueError(f"共享内存{self.path}帧长为ctrl={cs} sens={ss}，与本端ctrl={ctrlSize} sens={sensSize}不符")
+		self.ctrl=sdkSeqlockSlotClass(self._mm, ctrlOff, ctrlSize)
+		self.sens=sdkSeqlockSlotClass(self._mm, sensOff, sensSize)
+
+	def close(self):
+		try:
+			for slot in (self.ctrl, self.sens):
+				slot._seq.release()
+				slot._buf.release()
+			self._mm.close()
+		except BufferError:
+			# 仍有外部持有的numpy视图(sensView)，映射随其释放
+			pass
+		self.ctrl=self.sens=None
+	def unlink(self):
+		'''删除段文件(已挂接的进程不受影响)'''
+		try:
+			os.unlink(self.path)
+		except FileNotFoundError:
+			pass
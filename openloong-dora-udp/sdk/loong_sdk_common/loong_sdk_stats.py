@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+SDK收发时序统计
+
+每周期记录 发送时刻、接收时刻、传感器时间戳、解码耗时 到定长环形缓冲(预分配结构化数组，不随运行增长)，
+每publishEvery个周期对窗口内数据求一次分位数并回调，热循环内只做一次行写入，不打印。
+	stats=sdkTimingStatsClass(1024, publishEvery=250, callback=lambda st: ...)
+	sdk.attachStats(stats)		#之后send/recv自动打点
+统计项(均含p50/p90/p99/max)：
+	periodUs	相邻两次发送间隔，反映控制周期抖动
+	rttUs		发送至收到传感数据的间隔
+	sensAgeMs	接收时刻(time.time)-传感器时间戳，跨主机时含时钟偏差
+	decodeUs	传感帧解码耗时
+======================================================'''
+import time
+import numpy as np
+
+_timingDtype=np.dtype([
+	('sendT',	'f8'),		#time.monotonic()，本周期最近一次send
+	('recvT',	'f8'),		#time.monotonic()
+	('wallT',	'f8'),		#time.time()，与传感器时间戳比较
+	('sensT',	'f8'),
+	('decodeNs','i8'),
+])
+
+class sdkTimingStatsClass:
+	def __init__(self, capacity:int=1024, publishEvery:int=0, callback=None, name:str='jnt'):
+		'''capacity: 环形缓冲周期数；publishEvery>0时每隔该周期数以统计结果调用callback(dict)'''
+		self.name=name
+		self.ring=np.zeros(capacity, _timingDtype)
+		self.capacity=capacity
+		self.count=0
+		self.publishEvery=publishEvery
+		self.callback=callback
+		self._sendT=float('nan')
+
+	def markSend(self):
+		self._sendT=time.monotonic()
+	def markRecv(self, sensT:float, decodeNs:int):
+		row=self.ring[self.count%self.capacity]
+		row['sendT']=self._sendT
+		row['recvT']=time.monotonic()
+		row['wallT']=time.time()
+		row['sensT']=sensT
+		row['decodeNs']=decodeNs
+		self.count+=1
+		if(self.publishEvery>0 and self.count%self.publishEvery==0 and self.callback is not None):
+			self.callback(self.summary())
+
+	def window(self)->np.ndarray:
+		'''按时间顺序排列的有效记录(拷贝)'''
+		if(self.count<=self.capacity):
+			return self.ring[:self.count].copy()
+		head=self.count%self.capacity
+		return np.concatenate((self.ring[head:], self.ring[:head]))
+	def summary(self)->dict:
+		win=self.window()
+		out={"name": self.name, "cycles": self.count, "window": len(win)}
+		if(len(win)==0):
+			return out
+		sendT=win['sendT']
+		items={
+			"periodUs": np.diff(sendT)*1e6,
+			"rttUs": (win['recvT']-sendT)*1e6,
+			"sensAgeMs": (win['wallT']-win['sensT'])*1e3,
+			"decodeUs": win['decodeNs']*1e-3,
+		}
+		for key, val in items.items():
+			val=val[np.isfinite(val)]
+			if(len(val)==0):
+				continue
+			p50,p90,p99=np.percentile(val, (50,90,99))
+			out[key]={"p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(val.max())}
+		return out
+	def reset(self):
+		self.count=0
+		self._sendT=float('nan')
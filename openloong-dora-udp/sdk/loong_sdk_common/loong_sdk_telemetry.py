@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# coding=utf-8
+'''=========== ***doc description*** ===========
+传感帧遥测日志：按字段分列、内存映射的NumPy列存
+
+目录布局：meta.json(帧格式schema/dims、各列dtype与形状) + 每字段一个列文件<字段>.col + 时间索引_t.col(float64)。
+写入端把整帧拷入批缓冲(单次memcpy)，攒满batch帧后逐列追加到文件末尾，_t最后写，
+读端以_t的长度为已完整落盘的帧数，进程异常退出也不会读到半帧。
+	log=sdkTelemetryLogClass('/data/mani_tlm', sens.getCodec())
+	log.append(sens.getBuf())			#或收到的原始数据报；t缺省取帧内timestamp
+	log.close()
+读取端各列为文件上的np.memmap，切片零拷贝、按需换页，数小时1kHz数据无需整体载入内存：
+	tlm=sdkTelemetryReaderClass('/data/mani_tlm')
+	sl=tlm.span(t0, t1)					#_t上二分，O(log n)
+	actJ=tlm.column('actJ')[sl]			#(帧数, jntNum)零拷贝视图
+	cols=tlm.range(t0, t1, ['actJ','actT'])
+	tlm.refresh()						#写入端仍在运行时刷新可见帧数
+======================================================'''
+import json
+import os
+import numpy as np
+from loong_sdk_schema import frameCodecClass, getFrameCodec
+
+_META='meta.json'
+_INDEX='_t'
+
+def _colPath(path:str, name:str)->str:
+	return os.path.join(path, name+'.col')
+
+
+class sdkTelemetryLogClass:
+	def __init__(self, path:str, codec:frameCodecClass, fields=None, batch:int=256):
+		'''path: 日志目录，已存在同格式日志时接着追加；fields: 记录的字段名，缺省为全部字段；
+		batch: 批缓冲帧数，攒满后落盘，未落盘的帧在flush/close时写出'''
+		self.path=path
+		self.codec=codec
+		self.fields=tuple(codec.names if fields is None else fields)
+		self.batch=batch
+		self.frameSize=codec.size
+		self._stage=codec.newFrames(batch)
+		self._stageU8=self._stage.view(np.uint8).reshape(batch, self.frameSize)
+		self._stageT=np.empty(batch, np.float64)
+		self._n=0
+		self.frames=0
+		meta={"schema": codec.name, "dims": codec.dims,
+			"columns": {name: [codec.dtype[name].base.str, list(codec.dtype[name].shape)] for name in self.fields}}
+		os.makedirs(path, exist_ok=True)
+		metaPath=os.path.join(path, _META)
+		if(os.path.exists(metaPath)):
+			with open(metaPath) as f:
+				old=json.load(f)
+			if(old!=json.loads(json.dumps(meta))):
+				raise ValueError(f"{path} 已有不同帧格式或字段的遥测日志")
+		else:
+			with open(metaPath, 'w') as f:
+				json.dump(meta, f, ensure_ascii=False, indent=1)
+		flags=os.O_WRONLY|os.O_CREAT|os.O_APPEND
+		self._fds={name: os.open(_colPath(path, name), flags, 0o644) for name in self.fields}
+		self._fdT=os.open(_colPath(path, _INDEX), flags, 0o644)
+		# 续写时先把各列截到_t的帧数：上次在flush中途退出时列文件可能比_t多出半批，不截掉则新帧与_t错位
+		n=os.fstat(self._fdT).st_size//8
+		os.ftruncate(self._fdT, n*8)
+		for name, fd in self._fds.items():
+			os.ftruncate(fd, min(os.fstat(fd).st_size, n*codec.dtype[name].itemsize))
+		# 取已有末帧时刻，保证_t单调不减
+		self._last=-np.inf
+		if(n):
+			with open(_colPath(path, _INDEX), 'rb') as f:
+				f.seek(n*8-8)
+				self._last=float(np.frombuffer(f.read(8), np.float64)[0])
+
+	def append(self, buf, t:float=None):
+		'''追加一帧；buf为整帧线格式字节(bytes/bytearray/memoryview/帧数组，可长于帧)，
+		t为索引时刻，缺省取帧内timestamp，早于上一帧时按上一帧计，保证可二分'''
+		i=self._n
+		self._stageU8[i]=np.frombuffer(buf, np.uint8, self.frameSize)
+		if(t is None):
+			t=float(self._stage['timestamp'][i, 0])
+		if(t<self._last):
+			t=self._last
+		self._stageT[i]=t
+		self._last=t
+		self._n=i+1
+		if(self._n==self.batch):
+			self.flush()
+
+	def flush(self):
+		n=self._n
+		if(n==0):
+			return
+		stage=self._stage[:n]
+		for name, fd in self._fds.items():
+			os.write(fd, np.ascontiguousarray(stage[name]).data)
+		os.write(self._fdT, self._stageT[:n].data)
+		self.frames+=n
+		self._n=0
+
+	def close(self):
+		if(self._fds is None):
+			return
+		self.flush()
+		for fd in self._fds.values():
+			os.close(fd)
+		os.close(self._fdT)
+		self._fds=None
+	def __enter__(self):
+		return self
+	def __exit__(self, *exc):
+		self.close()
+
+
+class sdkTelemetryReaderClass:
+	def __init__(self, path:str):
+		self.path=path
+		with open(os.path.join(path, _META)) as f:
+			self.meta=json.load(f)
+		self.codec=getFrameCodec(self.meta["schema"], **self.meta["dims"])
+		self.columns={name: (np.dtype(dt), tuple(shape)) for name, (dt, shape) in self.meta["columns"].items()}
+		self._maps={}
+		self._n=-1
+		self.refresh()
+
+	def refresh(self)->int:
+		'''重读已落盘帧数(以_t长度为准)，帧数增长时重建列映射；返回帧数'''
+		n=os.path.getsize(_colPath(self.path, _INDEX))//8
+		if(n!=self._n):
+			self._n=n
+			self._maps={}
+		return n
+
+	def _map(self, name:str, dtype, shape):
+		col=self._maps.get(name)
+		if(col is None):
+			if(self._n==0):
+				col=np.empty((0,)+shape, dtype)
+			else:
+				col=np.memmap(_colPath(self.path, name), dtype, 'r', shape=(self._n,)+shape)
+			self._maps[name]=col
+		return col
+
+	def __len__(self):
+		return self._n
+	@property
+	def t(self)->np.ndarray:
+		'''时间索引列(单调不减)'''
+		return self._map(_INDEX, np.dtype(np.float64), ())
+	def column(self, name:str)->np.ndarray:
+		'''整列只读映射，形状(帧数,)+字段形状'''
+		dtype, shape=self.columns[name]
+		return self._map(name, dtype, shape)
+
+	def span(self, t0:float=None, t1:float=None)->slice:
+		'''[t0, t1)对应的帧切片'''
+		t=self.t
+		i0=0 if t0 is None else int(np.searchsorted(t, t0, 'left'))
+		i1=self._n if t1 is None else int(np.searchsorted(t, t1, 'left'))
+		return slice(i0, max(i0, i1))
+	def range(self, t0:float=None, t1:float=None, fields=None)->dict:
+		'''[t0, t1)内各字段的零拷贝视图，另含'_t'时间索引'''
+		sl=self.span(t0, t1)
+		out={_INDEX: self.t[sl]}
+		for name in (self.columns if fields is None else fields):
+			out[name]=self.column(name)[sl]
+		return out
+	def timeRange(self):
+		if(self._n==0):
+			return (0., 0.)
+		t=self.t
+		return float(t[0]), float(t[-1])
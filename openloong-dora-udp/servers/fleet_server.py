@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+多客户端、多核的 UDP 替身服务端（jnt / mani 协议）
+SO_REUSEPORT 下多个工作进程绑定同一端口，内核按客户端地址哈希分流，同一客户端固定落在同一进程，
+会话状态因此只需进程内保存：每个客户端占本进程传感/控制帧数组中的一行，应答直接发送该行缓冲。
+Linux 下以 recvmmsg/sendmmsg 批量收发（ctypes 调用 libc），其他平台退化为逐包 recvfrom/sendto。
+各会话的关节由 sim_dynamics 批量积分，按收到的控制指令收敛（--no-dynamics 时只返回静态模板）。
+    python servers/fleet_server.py --protocol jnt --workers 4
+    python servers/fleet_server.py --protocol mani --port 8080 --batch 64
+"""
+
+import argparse
+import ctypes
+import errno
+import multiprocessing as mp
+import os
+import select
+import socket
+import struct
+import sys
+import time
+
+import numpy as np
+
+# 添加SDK路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkSensDataClass, jntSdkCtrlDataClass
+from sdk.loong_mani_sdk.loong_mani_sdk_udp import maniSdkSensDataClass, maniSdkCtrlDataClass
+from loong_jnt_server import fill_jnt_sens_template
+from sim_server import fill_sim_sens_template
+from sim_dynamics import MODELS
+
+
+def _jnt_frames():
+    sens = jntSdkSensDataClass(31, 3, 3)
+    fill_jnt_sens_template(sens, 31)
+    return sens, jntSdkCtrlDataClass(31, 3, 3)
+
+def _mani_frames():
+    sens = maniSdkSensDataClass(12, 3, 3)
+    fill_sim_sens_template(sens, 12)
+    return sens, maniSdkCtrlDataClass(7, 3, 3, 2, 1)
+
+# 协议 -> (默认端口, 构造 (传感帧模板, 控制帧) 的函数)，维度与 LoongJntServer / RobotSimulator 一致
+PROTOCOLS = {
+    "jnt": (8081, _jnt_frames),
+    "mani": (8080, _mani_frames),
+}
+
+
+class FleetSessions:
+    """单个工作进程内的客户端会话表
+    会话即帧数组中的一行：sens 为各客户端的传感帧(由模板初始化)，ctrl 为最近一次收到的整帧控制指令，
+    按行批量更新；dynamics 为真时各行由 sim_dynamics 模型向量化积分"""
+    def __init__(self, protocol, capacity=64, timeout=5.0, dynamics=True):
+        sens, ctrl = PROTOCOLS[protocol][1]()
+        self.sens_codec = sens.getCodec()
+        self.ctrl_codec = ctrl.getCodec()
+        self.template = sens.getFrame()[0].copy()
+        self.timeout = timeout
+        self.rows = {}  # 客户端键 -> 行号
+        self.free = []
+        self.addrs = []
+        self.sens = None
+        self.model = MODELS[protocol](capacity) if dynamics else None
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        """按容量(重新)分配帧数组，已有会话的行原样保留"""
+        old = 0 if self.sens is None else len(self.sens)
+        sens = self.sens_codec.newFrames(capacity)
+        ctrl = self.ctrl_codec.newFrames(capacity)
+        last_seen = np.zeros(capacity)
+        requests = np.zeros(capacity, np.int64)
+        if old:
+            sens[:old], ctrl[:old] = self.sens, self.ctrl
+            last_seen[:old], requests[:old] = self.last_seen, self.requests
+        self.sens, self.ctrl, self.last_seen, self.requests = sens, ctrl, last_seen, requests
+        self.addrs += [None] * (capacity - old)
+        self.sens_u8 = sens.view(np.uint8).reshape(capacity, self.sens_codec.size)
+        self.ctrl_u8 = ctrl.view(np.uint8).reshape(capacity, self.ctrl_codec.size)
+        self.free.extend(range(capacity - 1, old - 1, -1))
+        if self.model is not None and old:
+            self.model.resize(capacity)
+
+    def open(self, key, addr):
+        """为新客户端分配一行并以模板初始化，容量不足时翻倍"""
+        if not self.free:
+            self._alloc(len(self.sens) * 2)
+        row = self.free.pop()
+        self.rows[key] = row
+        self.addrs[row] = addr
+        self.sens[row] = self.template
+        self.ctrl[row] = 0
+        self.requests[row] = 0
+        if self.model is not None:
+            self.model.reset(row, self.template)
+        return row
+
+    def touch(self, row, now):
+        self.last_seen[row] = now
+        self.requests[row] += 1
+
+    def store_ctrl(self, row, buf):
+        """整帧控制指令拷入该客户端的控制帧行，长度不符时忽略"""
+        if len(buf) != self.ctrl_codec.size:
+            return False
+        self.ctrl_u8[row] = np.frombuffer(buf, np.uint8)
+        return True
+
+    def update(self, rows, now, cmd_rows=()):
+        """生成本批应答：cmd_rows 的新指令送入模型，模型推进到 now，写回 rows 的传感字段与时间戳"""
+        if self.model is not None:
+            self.model.command(self.ctrl, cmd_rows)
+            self.model.advance(now)
+            self.model.write(self.sens, rows)
+        self.sens["timestamp"][rows, 0] = now
+
+    def expire(self, now):
+        """回收超时未发指令的会话行"""
+        for key, row in list(self.rows.items()):
+            if now - self.last_seen[row] > self.timeout:
+                del self.rows[key]
+                self.addrs[row] = None
+                self.free.append(row)
+
+
+class _iovec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _sockaddr_in(ctypes.Structure):
+    _fields_ = [("sin_family", ctypes.c_ushort), ("sin_port", ctypes.c_uint16),
+                ("sin_addr", ctypes.c_uint32), ("sin_zero", ctypes.c_char * 8)]
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [("msg_name", ctypes.c_void_p), ("msg_namelen", ctypes.c_uint32),
+                ("msg_iov", ctypes.c_void_p), ("msg_iovlen", ctypes.c_size_t),
+                ("msg_control", ctypes.c_void_p), ("msg_controllen", ctypes.c_size_t),
+                ("msg_flags", ctypes.c_int)]
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _msghdr), ("msg_len", ctypes.c_uint)]
+
+MSG_DONTWAIT = 0x40
+SEND_FULL_ERRNOS = (errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS)  # 非阻塞发送缓冲区满
+
+
+class MmsgIO:
+    """recvmmsg/sendmmsg 批量收发：一次系统调用收取至多 batch 个数据报，应答按行地址直接从帧数组发出
+    libc 无对应符号时构造抛出 OSError，由调用方退化为逐包收发"""
+    def __init__(self, sock, batch=32, bufsize=2048):
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not (hasattr(libc, "recvmmsg") and hasattr(libc, "sendmmsg")):
+            raise OSError("libc 不支持 recvmmsg/sendmmsg")
+        self._recvmmsg = libc.recvmmsg
+        self._recvmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+        self._recvmmsg.restype = ctypes.c_int
+        self._sendmmsg = libc.sendmmsg
+        self._sendmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+        self._sendmmsg.restype = ctypes.c_int
+        self.fd = sock.fileno()
+        self.batch = batch
+        self.rx = np.zeros((batch, bufsize), np.uint8)
+        self.names = (_sockaddr_in * batch)()
+        self.rx_iov = (_iovec * batch)()
+        self.rx_msgs = (_mmsghdr * batch)()
+        self.tx_iov = (_iovec * batch)()
+        self.tx_msgs = (_mmsghdr * batch)()
+        name_size = ctypes.sizeof(_sockaddr_in)
+        for i in range(batch):
+            self.rx_iov[i].iov_base = self.rx.ctypes.data + i * bufsize
+            self.rx_iov[i].iov_len = bufsize
+            for msgs, iov in ((self.rx_msgs, self.rx_iov), (self.tx_msgs, self.tx_iov)):
+                hdr = msgs[i].msg_hdr
+                hdr.msg_name = ctypes.addressof(self.names[i])
+                hdr.msg_namelen = name_size
+                hdr.msg_iov = ctypes.addressof(iov[i])
+                hdr.msg_iovlen = 1
+        self._name_size = name_size
+        self._used = batch
+
+    def recv(self):
+        """非阻塞收取一批，返回数据报个数(无数据时为0)"""
+        for i in range(self._used):
+            self.rx_msgs[i].msg_hdr.msg_namelen = self._name_size
+        n = self._recvmmsg(self.fd, ctypes.addressof(self.rx_msgs), self.batch, MSG_DONTWAIT, None)
+        if n < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                self._used = 0
+                return 0
+            raise OSError(err, os.strerror(err))
+        self._used = n
+        return n
+
+    def key(self, i):
+        name = self.names[i]
+        return name.sin_addr, name.sin_port
+
+    def addr(self, i):
+        name = self.names[i]
+        return socket.inet_ntoa(struct.pack("I", name.sin_addr)), socket.ntohs(name.sin_port)
+
+    def payload(self, i):
+        return self.rx[i, :self.rx_msgs[i].msg_len]
+
+    def send(self, frames_u8, rows, n):
+        """第 i 个应答为 frames_u8[rows[i]]，发往第 i 个数据报的来源地址；
+        返回实际发出的个数，发送缓冲区满(EAGAIN/ENOBUFS)时其余应答丢弃"""
+        base = frames_u8.ctypes.data
+        size = frames_u8.shape[1]
+        for i in range(n):
+            self.tx_iov[i].iov_base = base + int(rows[i]) * size
+            self.tx_iov[i].iov_len = size
+        sent = 0
+        msg_size = ctypes.sizeof(_mmsghdr)
+        while sent < n:
+            k = self._sendmmsg(self.fd, ctypes.addressof(self.tx_msgs) + sent * msg_size, n - sent, 0)
+            if k < 0:
+                err = ctypes.get_errno()
+                if err == errno.EINTR:
+                    continue
+                if err in SEND_FULL_ERRNOS:
+                    break
+                raise OSError(err, os.strerror(err))
+            sent += k
+        return sent
+
+
+class FleetWorker:
+    """工作进程：收一批指令 -> 按来源地址找会话行 -> 存控制帧 -> 批量更新 -> 批量应答"""
+    def __init__(self, protocol="jnt", ip="127.0.0.1", port=None, batch=32, reuse_port=True,
+                 session_timeout=5.0, log_interval=2.0, worker_id=0, dynamics=True):
+        self.protocol = protocol
+        self.port = PROTOCOLS[protocol][0] if port is None else port
+        self.batch = batch
+        self.log_interval = log_interval
+        self.worker_id = worker_id
+        self.sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if reuse_port:
+            self.sk.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.sk.bind((ip, self.port))
+        self.sk.setblocking(False)
+        self.sessions = FleetSessions(protocol, timeout=session_timeout, dynamics=dynamics)
+        try:
+            self.io = MmsgIO(self.sk, batch)
+        except (OSError, AttributeError) as e:
+            print(f"[fleet {worker_id}] 批量收发不可用，改为逐包收发: {e}")
+            self.io = None
+        self.rows = np.zeros(batch, np.intp)
+        self.valid = np.zeros(batch, bool)  # 本批各数据报是否为完整控制帧
+        self._rx_buf = bytearray(2048)
+        self.replies = 0
+        self.send_dropped = 0  # 发送缓冲区满而丢弃的应答数
+
+    def _recv_batch(self, now):
+        """收取一批并登记会话，返回本批数据报个数；self.rows[:n] 为各数据报的会话行"""
+        sessions = self.sessions
+        if self.io is not None:
+            n = self.io.recv()
+            for i in range(n):
+                key = self.io.key(i)
+                row = sessions.rows.get(key)
+                if row is None:
+                    row = sessions.open(key, self.io.addr(i))
+                sessions.touch(row, now)
+                self.valid[i] = sessions.store_ctrl(row, self.io.payload(i))
+                self.rows[i] = row
+            return n
+        self._addrs = []
+        for n in range(self.batch):
+            try:
+                size, addr = self.sk.recvfrom_into(self._rx_buf)
+            except (BlockingIOError, InterruptedError):
+                return n
+            row = sessions.rows.get(addr)
+            if row is None:
+                row = sessions.open(addr, addr)
+            sessions.touch(row, now)
+            self.valid[n] = sessions.store_ctrl(row, memoryview(self._rx_buf)[:size])
+            self.rows[n] = row
+            self._addrs.append(addr)
+        return self.batch
+
+    def _send_batch(self, n):
+        frames_u8 = self.sessions.sens_u8
+        if self.io is not None:
+            sent = self.io.send(frames_u8, self.rows, n)
+        else:
+            sent = 0
+            for i in range(n):
+                try:
+                    self.sk.sendto(frames_u8[self.rows[i]], self._addrs[i])
+                except OSError as e:
+                    if e.errno not in SEND_FULL_ERRNOS:
+                        raise
+                    break
+                sent += 1
+        # 非阻塞套接字负载高时发送缓冲区会满：丢弃本批余下应答(客户端按超时重发)，工作进程不退出
+        self.replies += sent
+        self.send_dropped += n - sent
+
+    def run(self):
+        poller = select.poll()
+        poller.register(self.sk, select.POLLIN)
+        last_log = last_expire = time.monotonic()
+        last_replies = 0
+        while True:
+            if poller.poll(500):
+                now = time.time()
+                n = self._recv_batch(now)
+                if n:
+                    rows = self.rows[:n]
+                    self.sessions.update(rows, now, rows[self.valid[:n]])
+                    self._send_batch(n)
+            mono = time.monotonic()
+            if mono - last_expire > 1.0:
+                self.sessions.expire(time.time())
+                last_expire = mono
+            if self.log_interval > 0 and mono - last_log >= self.log_interval:
+                rate = (self.replies - last_replies) / (mono - last_log)
+                print(f"[fleet {self.worker_id}] {self.protocol} 会话 {len(self.sessions.rows)} 个，应答 {rate:.0f} 帧/s，"
+                      f"发送缓冲区满丢弃 {self.send_dropped}")
+                last_log, last_replies = mono, self.replies
+
+
+def _worker_entry(kwargs):
+    FleetWorker(**kwargs).run()
+
+
+class FleetServer:
+    """按工作进程数启动 FleetWorker；平台无 SO_REUSEPORT 时只启动一个进程"""
+    def __init__(self, protocol="jnt", ip="127.0.0.1", port=None, workers=None, **worker_kwargs):
+        self.reuse_port = hasattr(socket, "SO_REUSEPORT")
+        workers = workers or os.cpu_count() or 1
+        if not self.reuse_port and workers > 1:
+            print("平台不支持 SO_REUSEPORT，仅启动一个工作进程")
+            workers = 1
+        port = PROTOCOLS[protocol][0] if port is None else port
+        self.worker_args = [dict(protocol=protocol, ip=ip, port=port, reuse_port=self.reuse_port,
+                                 worker_id=i, **worker_kwargs) for i in range(workers)]
+        self.procs = []
+        print(f"{protocol} 替身服务端启动，监听 {ip}:{port}，工作进程 {workers} 个")
+
+    def start(self):
+        for kwargs in self.worker_args:
+            proc = mp.Process(target=_worker_entry, args=(kwargs,), daemon=True)
+            proc.start()
+            self.procs.append(proc)
+
+    def stop(self):
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            proc.join()
+        self.procs = []
+
+    def run(self):
+        self.start()
+        try:
+            for proc in self.procs:
+                proc.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="多客户端、多核 UDP 替身服务端")
+    parser.add_argument("--protocol", choices=sorted(PROTOCOLS), default="jnt")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="默认 jnt 8081 / mani 8080")
+    parser.add_argument("--workers", type=int, default=0, help="工作进程数，默认 CPU 核数")
+    parser.add_argument("--batch", type=int, default=32, help="每次 recvmmsg 最多收取的数据报数")
+    parser.add_argument("--session-timeout", type=float, default=5.0, help="会话超时回收(秒)")
+    parser.add_argument("--log-interval", type=float, default=2.0, help="各进程统计打印间隔(秒)，<=0 关闭")
+    parser.add_argument("--no-dynamics", action="store_true", help="不积分关节模型，只返回静态模板（纯 I/O 压测）")
+    args = parser.parse_args()
+    FleetServer(args.protocol, args.ip, args.port, args.workers, batch=args.batch,
+                session_timeout=args.session_timeout, log_interval=args.log_interval,
+                dynamics=not args.no_dynamics).run()
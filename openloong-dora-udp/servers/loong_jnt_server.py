@@ -3,8 +3,13 @@
 """
 龙机器人关节控制服务端
 基于dora workflow框架，提供关节控制服务
+传感帧在启动时按模板预先填好，每次应答只原地写入时间戳等动态字段后直接发送帧缓冲；
+控制帧整帧解码到复用对象，关节/手指按 sim_dynamics 模型收敛到指令；
+日志按 log_interval 限频（环境变量 JNT_SERVER_LOG_INTERVAL，秒；0 为逐条打印，<0 关闭），便于压测
+--shm [段名] 时改为纯Python共享内存（loong_sdk_shm）服务，按固定频率读新控制帧、写传感帧，供 loong_jnt_sdk_shm 退回模式联调
 """
 
+import argparse
 import socket
 import struct
 import numpy as np
@@ -16,11 +21,50 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sdk.loong_jnt_sdk.loong_jnt_sdk_udp import jntSdkClass
 from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkSensDataClass, jntSdkCtrlDataClass
+from sdk.loong_sdk_common.loong_sdk_shm import sdkSeqlockShmClass
+from sdk.loong_sdk_common.loong_sdk_loop import sdkLoopClass
+from sim_dynamics import JntRobotModel
+
+def fill_jnt_sens_template(sens, jnt_num):
+    """填写关节传感帧模板的静态字段（模拟关节数据），单服务端与 fleet_server 共用"""
+    sens.size = np.int32(1024)
+    sens.key = np.array([1, 2], np.int16)
+    sens.planName = "jnt_plan"  # 字符串类型
+    sens.state = np.array([0, 1], np.int16)
+    sens.joy = np.array([0.1, -0.2, 0.3, -0.4], np.float32)
+    
+    # IMU数据
+    sens.rpy = np.array([0.05, -0.02, 0.01], np.float32)
+    sens.gyr = np.array([0.01, 0.02, -0.01], np.float32)
+    sens.acc = np.array([9.8, 0.1, -0.2], np.float32)
+    
+    # 关节数据
+    sens.actJ = np.array([i * 0.1 + 0.01 for i in range(jnt_num)], np.float32)
+    sens.actW = np.array([0.02 * i for i in range(jnt_num)], np.float32)
+    sens.actT = np.array([0.5 * i for i in range(jnt_num)], np.float32)
+    sens.tgtJ = np.array([i * 0.1 for i in range(jnt_num)], np.float32)
+    sens.tgtW = np.array([0.02 * i for i in range(jnt_num)], np.float32)
+    sens.tgtT = np.array([0.5 * i for i in range(jnt_num)], np.float32)
+    
+    # 驱动器数据
+    sens.drvTemp = np.array([30 + i for i in range(jnt_num)], np.int16)
+    sens.drvState = np.array([0] * jnt_num, np.int16)
+    sens.drvErr = np.array([0] * jnt_num, np.int16)
+    
+    # 手指数据
+    sens.actFingerLeft = np.array([0.3, 0.3, 0.3], np.float32)
+    sens.actFingerRight = np.array([0.2, 0.2, 0.2], np.float32)
+    sens.tgtFingerLeft = np.array([0.3, 0.3, 0.3], np.float32)
+    sens.tgtFingerRight = np.array([0.2, 0.2, 0.2], np.float32)
 
 class LoongJntServer:
-    def __init__(self, ip="127.0.0.1", port=8081):
+    def __init__(self, ip="127.0.0.1", port=8081, log_interval=1.0):
         self.ip = ip
         self.port = port
+        self.log_interval = log_interval
+        self._last_log = 0.0
+        self._suppressed = 0
+        self.requests = 0
         self.sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sk.bind((self.ip, self.port))
         print(f"龙机器人关节控制服务端启动，监听 {ip}:{port}")
@@ -30,139 +74,132 @@ class LoongJntServer:
         self.finger_dof_left = 3
         self.finger_dof_right = 3
         
-        # 初始化传感器数据
+        # 初始化传感器数据，静态字段一次性写入帧模板
         self.sens = jntSdkSensDataClass(self.jnt_num, self.finger_dof_left, self.finger_dof_right)
+        self.build_sens_template()
+        self._rx_buf = bytearray(2048)
+
+        # 复用的控制帧对象：约定 checker 与帧长取自SDK定义，逐包只做整帧拷贝
+        self.ctrl = jntSdkCtrlDataClass(self.jnt_num, self.finger_dof_left, self.finger_dof_right)
+        self.ctrl_size = self.ctrl.getCodec().size
+        self.checker = self.ctrl.checker
+        self.bad_frames = 0
+
+        # 关节模型：以模板为初始状态，收到指令后按 PD + 执行器模型收敛
+        self.model = JntRobotModel(1, self.jnt_num, self.finger_dof_left, self.finger_dof_right)
+        self.model.reset(0, self.sens.getFrame()[0])
+        self._row = slice(0, 1)  # 单机器人：以切片代替花式索引
+
+    def log_due(self):
+        """限频日志判断：log_interval 内只放行首条，其余计数；放行时返回附注（省略条数），否则返回 None
+        先判断再格式化日志，被省略的请求不产生字符串开销"""
+        if self.log_interval < 0:
+            return None
+        now = time.monotonic()
+        if self.log_interval and now - self._last_log < self.log_interval:
+            self._suppressed += 1
+            return None
+        note = ""
+        if self._suppressed:
+            note = f"（此前 {self.log_interval:g}s 内省略 {self._suppressed} 条，累计请求 {self.requests}）"
+            self._suppressed = 0
+        self._last_log = now
+        return note
+
+    def build_sens_template(self):
+        """填写传感帧模板中的静态字段（模拟关节数据），之后每帧只更新动态字段"""
+        fill_jnt_sens_template(self.sens, self.jnt_num)
 
     def generate_jnt_sens_data(self):
-        """生成关节传感器数据"""
-        # 模拟关节数据
-        current_time = time.time()
-        
-        # 更新传感器数据
-        self.sens.size = np.int32(1024)
-        self.sens.timestamp = np.float64(current_time)
-        self.sens.key = np.array([1, 2], np.int16)
-        self.sens.planName = "jnt_plan"  # 字符串类型
-        self.sens.state = np.array([0, 1], np.int16)
-        self.sens.joy = np.array([0.1, -0.2, 0.3, -0.4], np.float32)
-        
-        # IMU数据
-        self.sens.rpy = np.array([0.05, -0.02, 0.01], np.float32)
-        self.sens.gyr = np.array([0.01, 0.02, -0.01], np.float32)
-        self.sens.acc = np.array([9.8, 0.1, -0.2], np.float32)
-        
-        # 关节数据
-        self.sens.actJ = np.array([i * 0.1 + 0.01 for i in range(self.jnt_num)], np.float32)
-        self.sens.actW = np.array([0.02 * i for i in range(self.jnt_num)], np.float32)
-        self.sens.actT = np.array([0.5 * i for i in range(self.jnt_num)], np.float32)
-        self.sens.tgtJ = np.array([i * 0.1 for i in range(self.jnt_num)], np.float32)
-        self.sens.tgtW = np.array([0.02 * i for i in range(self.jnt_num)], np.float32)
-        self.sens.tgtT = np.array([0.5 * i for i in range(self.jnt_num)], np.float32)
-        
-        # 驱动器数据
-        self.sens.drvTemp = np.array([30 + i for i in range(self.jnt_num)], np.int16)
-        self.sens.drvState = np.array([0] * self.jnt_num, np.int16)
-        self.sens.drvErr = np.array([0] * self.jnt_num, np.int16)
-        
-        # 手指数据
-        self.sens.actFingerLeft = np.array([0.3, 0.3, 0.3], np.float32)
-        self.sens.actFingerRight = np.array([0.2, 0.2, 0.2], np.float32)
-        self.sens.tgtFingerLeft = np.array([0.3, 0.3, 0.3], np.float32)
-        self.sens.tgtFingerRight = np.array([0.2, 0.2, 0.2], np.float32)
-        
+        """生成关节传感器数据：模型推进到当前时刻并写回动态字段与时间戳，返回帧缓冲（非拷贝）"""
+        now = time.time()
+        self.model.advance(now)
+        self.model.write(self.sens.getFrame(), self._row)
+        self.sens.timestamp[0] = now
         return self.pack_sens_data()
 
     def pack_sens_data(self):
-        """打包传感器数据"""
-        # 构建格式字符串
-        fmt_list = [
-            'i', 'd', '2h', '16s', '2h', '4f',  # 基础数据
-            '3f', '3f', '3f',  # IMU数据
-            f'{self.jnt_num}f', f'{self.jnt_num}f', f'{self.jnt_num}f',  # 关节数据
-            f'{self.jnt_num}h', f'{self.jnt_num}h', f'{self.jnt_num}h',  # 驱动器数据
-            f'{self.jnt_num}f', f'{self.jnt_num}f', f'{self.jnt_num}f',  # 目标关节数据
-            f'{self.finger_dof_left}f', f'{self.finger_dof_right}f',  # 手指数据
-            f'{self.finger_dof_left}f', f'{self.finger_dof_right}f'
-        ]
-        
-        # 打包数据
-        buf = b""
-        buf += struct.pack('i', self.sens.size.item())
-        buf += struct.pack('d', self.sens.timestamp.item())
-        buf += self.sens.key.astype(np.int16).tobytes()
-        buf += self.sens.planName.encode('utf-8')[:16].ljust(16, b'\x00')
-        buf += self.sens.state.astype(np.int16).tobytes()
-        buf += self.sens.joy.astype(np.float32).tobytes()
-        buf += self.sens.rpy.astype(np.float32).tobytes()
-        buf += self.sens.gyr.astype(np.float32).tobytes()
-        buf += self.sens.acc.astype(np.float32).tobytes()
-        buf += self.sens.actJ.astype(np.float32).tobytes()
-        buf += self.sens.actW.astype(np.float32).tobytes()
-        buf += self.sens.actT.astype(np.float32).tobytes()
-        buf += self.sens.drvTemp.astype(np.int16).tobytes()
-        buf += self.sens.drvState.astype(np.int16).tobytes()
-        buf += self.sens.drvErr.astype(np.int16).tobytes()
-        buf += self.sens.tgtJ.astype(np.float32).tobytes()
-        buf += self.sens.tgtW.astype(np.float32).tobytes()
-        buf += self.sens.tgtT.astype(np.float32).tobytes()
-        buf += self.sens.actFingerLeft.astype(np.float32).tobytes()
-        buf += self.sens.actFingerRight.astype(np.float32).tobytes()
-        buf += self.sens.tgtFingerLeft.astype(np.float32).tobytes()
-        buf += self.sens.tgtFingerRight.astype(np.float32).tobytes()
-        
-        return buf
+        """打包传感器数据（帧布局由 loong_sdk_schema 统一生成，直接返回帧缓冲）"""
+        return self.sens.packData()
 
     def parse_control_command(self, ctrl_buf):
-        """解析控制指令"""
-        if len(ctrl_buf) < 12:
+        """解析控制指令：先按帧长与头部 checker/size 校验，通过后整帧拷入复用的控制帧对象并送入关节模型
+        返回该对象（各数组字段为其帧缓冲上的视图，下一包到来时被覆盖），校验失败返回 None"""
+        if len(ctrl_buf) != self.ctrl_size:
+            self.bad_frames += 1
             return None
-            
-        # 解析基础控制参数
-        base_ctrl = struct.unpack('2hi', ctrl_buf[:8])  # checker, size, state
-        ctrl = jntSdkCtrlDataClass(self.jnt_num, self.finger_dof_left, self.finger_dof_right)
-        
-        ctrl.checker = base_ctrl[0]
-        ctrl.size = base_ctrl[1]
-        ctrl.state = base_ctrl[2]
-        
-        # 解析其他参数
-        offset = 8
-        if len(ctrl_buf) > offset:
-            # 解析torLimitRate和filtRate
-            if len(ctrl_buf) >= offset + 8:
-                tor_filt = struct.unpack('ff', ctrl_buf[offset:offset + 8])
-                ctrl.torLimitRate = tor_filt[0]
-                ctrl.filtRate = tor_filt[1]
-                offset += 8
-        
-        return ctrl
+        checker, size = struct.unpack_from('<2h', ctrl_buf)
+        if checker != self.checker or size != self.ctrl_size:
+            self.bad_frames += 1
+            return None
+        self.ctrl.unpackData(ctrl_buf)
+        self.model.command(self.ctrl.getFrame(), self._row)
+        return self.ctrl
 
     def run(self):
         """启动服务端，循环接收并响应"""
         print("关节控制服务端运行中...")
         
+        rx_view = memoryview(self._rx_buf)
         while True:
             try:
-                # 接收客户端指令
-                ctrl_buf, client_addr = self.sk.recvfrom(2048)
-                print(f"\n收到客户端 {client_addr} 的关节控制指令，长度：{len(ctrl_buf)}字节")
+                # 接收客户端指令（复用接收缓冲）
+                n, client_addr = self.sk.recvfrom_into(self._rx_buf)
+                self.requests += 1
 
                 # 解析控制指令
-                ctrl = self.parse_control_command(ctrl_buf)
-                if ctrl:
-                    print(f"解析到控制参数：checker={ctrl.checker}, state={ctrl.state}")
+                ctrl = self.parse_control_command(rx_view[:n])
 
-                # 生成传感器数据
-                sens_buf = self.generate_jnt_sens_data()
+                # 生成传感器数据并返回
+                self.sk.sendto(self.generate_jnt_sens_data(), client_addr)
 
-                # 返回传感器数据
-                self.sk.sendto(sens_buf, client_addr)
-                print("已返回关节传感器数据")
+                note = self.log_due()
+                if note is not None:
+                    print(f"\n收到客户端 {client_addr} 的关节控制指令，长度：{n}字节")
+                    if ctrl is not None:
+                        print(f"解析到控制参数：checker={ctrl.checker}, state={ctrl.state}, j[:3]={ctrl.j[:3]}")
+                    else:
+                        print(f"控制帧校验失败（长度或 checker/size 不符），累计 {self.bad_frames} 帧")
+                    print(f"已返回关节传感器数据{note}")
 
             except Exception as e:
                 print(f"处理请求时出错：{e}")
                 continue
 
+    def run_shm(self, name="loong_jnt_sdk", hz=1000.0, stop_event=None):
+        """共享内存服务：每周期序号有变化时解析控制帧，模型推进后写入传感帧（与真机一样按固定频率发布）"""
+        shm = sdkSeqlockShmClass(name, self.ctrl_size, self.sens.getCodec().size)
+        print(f"关节控制服务端共享内存模式运行中: {shm.path}，{hz:g}Hz")
+        loop = sdkLoopClass(hz, name="jnt_shm_server")
+        loop.start()
+        last_seq = shm.ctrl.seq
+        try:
+            while stop_event is None or not stop_event.is_set():
+                seq = shm.ctrl.read(self._rx_buf, last_seq)
+                if seq and seq != last_seq:
+                    last_seq = seq
+                    self.requests += 1
+                    ctrl = self.parse_control_command(memoryview(self._rx_buf)[:self.ctrl_size])
+                    note = self.log_due()
+                    if note is not None:
+                        if ctrl is not None:
+                            print(f"解析到控制参数：checker={ctrl.checker}, state={ctrl.state}, j[:3]={ctrl.j[:3]}{note}")
+                        else:
+                            print(f"控制帧校验失败，累计 {self.bad_frames} 帧{note}")
+                shm.sens.write(self.generate_jnt_sens_data())
+                loop.wait()
+        finally:
+            print(loop.report())
+            shm.close()
+
 if __name__ == "__main__":
-    server = LoongJntServer()
-    server.run()
+    parser = argparse.ArgumentParser(description="关节控制替身服务端")
+    parser.add_argument("--shm", nargs="?", const="loong_jnt_sdk", default=None,
+                        help="纯Python共享内存模式及段名（缺省 loong_jnt_sdk），不给出时为 UDP 模式")
+    parser.add_argument("--hz", type=float, default=1000.0, help="共享内存模式的传感帧发布频率")
+    args = parser.parse_args()
+    server = LoongJntServer(log_interval=float(os.environ.get("JNT_SERVER_LOG_INTERVAL", 1.0)))
+    if args.shm:
+        server.run_shm(args.shm, args.hz)
+    else:
+        server.run()
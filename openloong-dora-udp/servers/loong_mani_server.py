@@ -6,7 +6,6 @@
 """
 
 import socket
-import struct
 import numpy as np
 import time
 import sys
@@ -41,8 +40,9 @@ class LoongManiServer:
             fingerDofRight=self.finger_dof_right
         )
         
-        # 初始化传感器数据
+        # 初始化传感器数据与复用的控制指令对象
         self.sens = maniSdkSensDataClass(self.jnt_num, self.finger_dof_left, self.finger_dof_right)
+        self.ctrl = maniSdkCtrlDataClass(self.arm_dof, self.finger_dof_left, self.finger_dof_right, self.neck_dof, self.lumbar_dof)
 
     def generate_mani_sens_data(self):
         """生成机械臂传感器数据"""
@@ -92,65 +92,11 @@ class LoongManiServer:
         return self.sens.packSensData()
 
     def parse_control_command(self, ctrl_buf):
-        """解析机械臂控制指令"""
-        if len(ctrl_buf) < 12:
+        """解析机械臂控制指令，按统一帧布局整帧解码到复用的控制对象"""
+        if len(ctrl_buf) < self.ctrl.getCodec().size:
             return None
-            
-        # 解析基础控制参数
-        base_ctrl = struct.unpack('6h', ctrl_buf[:12])
-        ctrl = maniSdkCtrlDataClass(self.arm_dof, self.finger_dof_left, self.finger_dof_right, self.neck_dof, self.lumbar_dof)
-        
-        ctrl.inCharge = base_ctrl[0]
-        ctrl.filtLevel = base_ctrl[1]
-        ctrl.armMode = base_ctrl[2]
-        ctrl.fingerMode = base_ctrl[3]
-        ctrl.neckMode = base_ctrl[4]
-        ctrl.lumbarMode = base_ctrl[5]
-        
-        # 解析机械臂命令数据
-        offset = 12
-        
-        # 解析armCmd (2 * armDof * 4 bytes)
-        arm_cmd_size = 2 * self.arm_dof * 4
-        if len(ctrl_buf) >= offset + arm_cmd_size:
-            arm_cmd_data = struct.unpack(f'{2 * self.arm_dof}f', ctrl_buf[offset:offset + arm_cmd_size])
-            ctrl.armCmd = np.array(arm_cmd_data, dtype=np.float32).reshape(2, self.arm_dof)
-            offset += arm_cmd_size
-        
-        # 解析armFM (2 * 6 * 4 bytes)
-        arm_fm_size = 2 * 6 * 4
-        if len(ctrl_buf) >= offset + arm_fm_size:
-            arm_fm_data = struct.unpack('12f', ctrl_buf[offset:offset + arm_fm_size])
-            ctrl.armFM = np.array(arm_fm_data, dtype=np.float32).reshape(2, 6)
-            offset += arm_fm_size
-        
-        # 解析手指命令
-        finger_left_size = self.finger_dof_left * 4
-        if len(ctrl_buf) >= offset + finger_left_size:
-            finger_left_data = struct.unpack(f'{self.finger_dof_left}f', ctrl_buf[offset:offset + finger_left_size])
-            ctrl.fingerLeft = np.array(finger_left_data, dtype=np.float32)
-            offset += finger_left_size
-        
-        finger_right_size = self.finger_dof_right * 4
-        if len(ctrl_buf) >= offset + finger_right_size:
-            finger_right_data = struct.unpack(f'{self.finger_dof_right}f', ctrl_buf[offset:offset + finger_right_size])
-            ctrl.fingerRight = np.array(finger_right_data, dtype=np.float32)
-            offset += finger_right_size
-        
-        # 解析颈部命令
-        neck_size = self.neck_dof * 4
-        if len(ctrl_buf) >= offset + neck_size:
-            neck_data = struct.unpack(f'{self.neck_dof}f', ctrl_buf[offset:offset + neck_size])
-            ctrl.neckCmd = np.array(neck_data, dtype=np.float32)
-            offset += neck_size
-        
-        # 解析腰部命令
-        lumbar_size = self.lumbar_dof * 4
-        if len(ctrl_buf) >= offset + lumbar_size:
-            lumbar_data = struct.unpack(f'{self.lumbar_dof}f', ctrl_buf[offset:offset + lumbar_size])
-            ctrl.lumbarCmd = np.array(lumbar_data, dtype=np.float32)
-        
-        return ctrl
+        self.ctrl.unpackData(ctrl_buf)
+        return self.ctrl
 
     def run(self):
         """启动服务端，循环接收并响应"""
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+替身服务端的简化关节动力学（physics-lite）
+所有状态按 (机器人, 关节) 二维数组保存，一次积分步对全部机器人向量化计算，单进程可承载大量模拟机器人：
+    目标滤波    tgt += filt * (cmd - tgt)               （即 SDK 的 filtRate 语义）
+    PD+前馈     tau_cmd = kp*(tgt - q) + kd*(w - dq) + t，按 torLimitRate*tau_max 限幅
+    执行器      tau += (tau_cmd - tau) * dt/act_tau     （一阶滞后）
+    刚体        ddq = (tau - damping*dq) / inertia，半隐式欧拉积分
+手指与末端位姿采用一阶跟踪。模型以固定内部步长 dt 推进到给定时刻（advance），与应答频率解耦。
+    model = MODELS["jnt"](capacity)
+    model.command(ctrl_frames, rows)   # 由整帧控制指令(结构化数组)更新各行目标；rows 为 intp 数组或切片
+    model.advance(time.time())
+    model.write(sens_frames, rows)     # 写回传感帧的 act*/tgt* 字段
+"""
+
+import numpy as np
+
+
+class JointDynamics:
+    """批量 PD + 一阶执行器 + 刚体积分；kp/kd 为 0 的关节使用默认增益（客户端只发位置时仍能收敛）"""
+    def __init__(self, robots, jnt_num, dt=1e-3, inertia=0.05, damping=0.5, act_tau=0.005,
+                 tau_max=60.0, kp=100.0, kd=4.0):
+        self.jnt_num = jnt_num
+        self.dt = dt
+        self.inertia = inertia
+        self.damping = damping
+        self.act_alpha = min(1.0, dt / act_tau)
+        self.tau_max = tau_max
+        self.default_kp = kp
+        self.default_kd = kd
+        # 各状态量：(机器人, 关节) 或 (机器人,)
+        self._fields = {name: ((jnt_num,), np.float64, 0.0) for name in
+                        ("q", "dq", "tau", "cmd_q", "tgt_q", "tgt_w", "tgt_t", "kp", "kd")}
+        self._fields.update(filt=((), np.float64, 1.0), tor_limit=((), np.float64, 1.0), active=((), bool, False))
+        for name, (shape, dtype, fill) in self._fields.items():
+            setattr(self, name, np.full((robots,) + shape, fill, dtype))
+        self.robots = robots
+
+    def resize(self, robots):
+        """调整机器人数，已有行保留"""
+        n = min(robots, self.robots)
+        for name, (shape, dtype, fill) in self._fields.items():
+            new = np.full((robots,) + shape, fill, dtype)
+            new[:n] = getattr(self, name)[:n]
+            setattr(self, name, new)
+        self.robots = robots
+
+    def reset(self, row, q0):
+        """某行以给定关节角静止起步，并以其为保持目标"""
+        self.q[row] = q0
+        self.cmd_q[row] = q0
+        self.tgt_q[row] = q0
+        self.dq[row] = 0
+        self.tau[row] = 0
+        self.tgt_w[row] = 0
+        self.tgt_t[row] = 0
+        self.kp[row] = 0
+        self.kd[row] = 0
+        self.filt[row] = 1.0
+        self.tor_limit[row] = 1.0
+        self.active[row] = True
+
+    def step(self, steps=1):
+        active = self.active[:, None]
+        kp = np.where(self.kp > 0, self.kp, self.default_kp)
+        kd = np.where(self.kd > 0, self.kd, self.default_kd)
+        # 系数按 [0, 1] 限幅，每次推进只算一次
+        limit = (np.clip(self.tor_limit, 0.0, 1.0) * self.tau_max)[:, None]
+        filt = np.clip(self.filt, 0.0, 1.0)[:, None]
+        dt = self.dt
+        for _ in range(steps):
+            self.tgt_q += filt * (self.cmd_q - self.tgt_q)
+            tau_cmd = kp * (self.tgt_q - self.q) + kd * (self.tgt_w - self.dq) + self.tgt_t
+            np.minimum(tau_cmd, limit, out=tau_cmd)
+            np.maximum(tau_cmd, -limit, out=tau_cmd)
+            # 未使能(state=0)的机器人输出零力矩，仅受阻尼
+            tau_cmd *= active
+            self.tau += self.act_alpha * (tau_cmd - self.tau)
+            self.dq += (self.tau - self.damping * self.dq) * (dt / self.inertia)
+            self.q += self.dq * dt
+
+
+class FirstOrderLag:
+    """批量一阶跟踪：x += (target - x) * dt/tau，同时给出速度"""
+    def __init__(self, shape, dt=1e-3, tau=0.05):
+        self.alpha = min(1.0, dt / tau)
+        self.dt = dt
+        self.x = np.zeros(shape)
+        self.target = np.zeros(shape)
+        self.vel = np.zeros(shape)
+
+    def resize(self, robots):
+        for name in ("x", "target", "vel"):
+            old = getattr(self, name)
+            new = np.zeros((robots,) + old.shape[1:])
+            n = min(robots, len(old))
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
+    def reset(self, row, x0):
+        self.x[row] = x0
+        self.target[row] = x0
+        self.vel[row] = 0
+
+    def step(self, steps=1):
+        delta = None
+        for _ in range(steps):
+            delta = self.alpha * (self.target - self.x)
+            self.x += delta
+        if delta is not None:
+            self.vel = delta / self.dt
+
+
+class _RobotModel:
+    """按固定步长推进的公共部分：advance 把模型时钟推进到 now，单次最多追 max_steps 步，其余丢弃并计数"""
+    def __init__(self, dt=1e-3, max_steps=50):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.t = None
+        self.steps = 0
+        self.dropped_steps = 0
+
+    def advance(self, now):
+        if self.t is None:
+            self.t = now
+            return 0
+        steps = int((now - self.t) / self.dt)
+        if steps <= 0:
+            return 0
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            self.t = now
+            steps = self.max_steps
+        else:
+            self.t += steps * self.dt
+        self._step(steps)
+        self.steps += steps
+        return steps
+
+
+class JntRobotModel(_RobotModel):
+    """jnt 协议：关节由 j/w/t/kp/kd、filtRate、torLimitRate、state 驱动，手指一阶跟踪 fingerLeft/Right"""
+    def __init__(self, capacity, jnt_num=31, finger_dof_left=3, finger_dof_right=3, dt=1e-3, **kwargs):
+        super().__init__(dt, kwargs.pop("max_steps", 50))
+        self.jnt_num = jnt_num
+        self.finger_split = finger_dof_left
+        self.joints = JointDynamics(capacity, jnt_num, dt, **kwargs)
+        self.fingers = FirstOrderLag((capacity, finger_dof_left + finger_dof_right), dt)
+
+    def resize(self, capacity):
+        self.joints.resize(capacity)
+        self.fingers.resize(capacity)
+
+    def reset(self, row, sens_row):
+        """以传感帧模板为初始状态"""
+        self.joints.reset(row, sens_row["actJ"])
+        self.fingers.reset(row, np.concatenate((sens_row["actFingerLeft"], sens_row["actFingerRight"])))
+
+    def command(self, ctrl, rows):
+        joints = self.joints
+        joints.cmd_q[rows] = ctrl["j"][rows]
+        joints.tgt_w[rows] = ctrl["w"][rows]
+        joints.tgt_t[rows] = ctrl["t"][rows]
+        joints.kp[rows] = ctrl["kp"][rows]
+        joints.kd[rows] = ctrl["kd"][rows]
+        joints.filt[rows] = ctrl["filtRate"][rows]
+        joints.tor_limit[rows] = ctrl["torLimitRate"][rows]
+        joints.active[rows] = ctrl["state"][rows] != 0
+        k = self.finger_split
+        self.fingers.target[rows, :k] = ctrl["fingerLeft"][rows]
+        self.fingers.target[rows, k:] = ctrl["fingerRight"][rows]
+
+    def _step(self, steps):
+        self.joints.step(steps)
+        self.fingers.step(steps)
+
+    def write(self, sens, rows):
+        j = self.joints
+        sens["actJ"][rows] = j.q[rows]
+        sens["actW"][rows] = j.dq[rows]
+        sens["actT"][rows] = j.tau[rows]
+        sens["tgtJ"][rows] = j.tgt_q[rows]
+        sens["tgtW"][rows] = j.tgt_w[rows]
+        sens["tgtT"][rows] = j.tgt_t[rows]
+        k = self.finger_split
+        sens["actFingerLeft"][rows] = self.fingers.x[rows, :k]
+        sens["actFingerRight"][rows] = self.fingers.x[rows, k:]
+        sens["tgtFingerLeft"][rows] = self.fingers.target[rows, :k]
+        sens["tgtFingerRight"][rows] = self.fingers.target[rows, k:]
+
+
+class ManiRobotModel(_RobotModel):
+    """mani 协议：关节顺序 [左臂, 右臂, 颈, 腰]，传感帧只报告前 jnt_num 个
+    armMode 3 轴控(armCmd 为关节角)，1 回正；2/4 笛卡尔时末端位姿一阶跟踪 armCmd 前 6 维；0 保持
+    neck/lumbar 同理(3 轴控，1 回正)；fingerMode 3 轴控，1/4 回零；filtLevel 0~4 映射为滤波系数，>=5 不滤波"""
+    def __init__(self, capacity, jnt_num=12, arm_dof=7, neck_dof=2, lumbar_dof=1,
+                 finger_dof_left=3, finger_dof_right=3, dt=1e-3, **kwargs):
+        super().__init__(dt, kwargs.pop("max_steps", 50))
+        self.jnt_num = jnt_num
+        self.arm_dof = arm_dof
+        self.neck = slice(2 * arm_dof, 2 * arm_dof + neck_dof)
+        self.lumbar = slice(self.neck.stop, self.neck.stop + lumbar_dof)
+        self.finger_split = finger_dof_left
+        self.joints = JointDynamics(capacity, self.lumbar.stop, dt, **kwargs)
+        self.fingers = FirstOrderLag((capacity, finger_dof_left + finger_dof_right), dt)
+        self.tips = FirstOrderLag((capacity, 2, 6), dt, tau=0.1)
+        self.tip_home = np.zeros((capacity, 2, 6))
+        self.tip_fm = np.zeros((capacity, 2, 6))
+
+    def resize(self, capacity):
+        self.joints.resize(capacity)
+        self.fingers.resize(capacity)
+        self.tips.resize(capacity)
+        for name in ("tip_home", "tip_fm"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, 2, 6))
+            n = min(capacity, len(old))
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
+    def reset(self, row, sens_row):
+        q0 = np.zeros(self.joints.jnt_num)
+        n = min(self.jnt_num, len(q0))
+        q0[:n] = sens_row["actJ"][:n]
+        self.joints.reset(row, q0)
+        self.fingers.reset(row, np.concatenate((sens_row["actFingerLeft"], sens_row["actFingerRight"])))
+        self.tips.reset(row, sens_row["actTipPRpy2B"])
+        self.tip_home[row] = sens_row["actTipPRpy2B"]
+        self.tip_fm[row] = 0
+
+    def command(self, ctrl, rows):
+        if isinstance(rows, slice):
+            rows = np.arange(len(ctrl))[rows]
+        if len(rows) == 0:
+            return
+        c = ctrl[rows]
+        joints = self.joints
+        arm = slice(0, 2 * self.arm_dof)
+        arm_mode = c["armMode"]
+        m = arm_mode == 3
+        joints.cmd_q[rows[m], arm] = c["armCmd"][m].reshape(-1, 2 * self.arm_dof)
+        m = arm_mode == 1
+        joints.cmd_q[rows[m], arm] = 0
+        self.tips.target[rows[m]] = self.tip_home[rows[m]]
+        m = (arm_mode == 2) | (arm_mode == 4)
+        self.tips.target[rows[m]] = c["armCmd"][m][:, :, :6]
+        self.tip_fm[rows] = np.where(((arm_mode == 2) | (arm_mode == 3))[:, None, None], c["armFM"], 0)
+        for part, mode, cmd in ((self.neck, c["neckMode"], c["neckCmd"]), (self.lumbar, c["lumbarMode"], c["lumbarCmd"])):
+            m = mode == 3
+            joints.cmd_q[rows[m], part] = cmd[m]
+            joints.cmd_q[rows[mode == 1], part] = 0
+        finger_mode = c["fingerMode"]
+        m = finger_mode == 3
+        self.fingers.target[rows[m]] = np.concatenate((c["fingerLeft"][m], c["fingerRight"][m]), axis=1)
+        self.fingers.target[rows[(finger_mode == 1) | (finger_mode == 4)]] = 0
+        level = c["filtLevel"]
+        joints.filt[rows] = np.where(level >= 5, 1.0, 0.02 * (np.clip(level, 0, 4) + 1))
+        joints.active[rows] = c["inCharge"] != 0
+
+    def _step(self, steps):
+        self.joints.step(steps)
+        self.fingers.step(steps)
+        self.tips.step(steps)
+
+    def write(self, sens, rows):
+        j, n = self.joints, self.jnt_num
+        sens["actJ"][rows] = j.q[rows, :n]
+        sens["actW"][rows] = j.dq[rows, :n]
+        sens["actT"][rows] = j.tau[rows, :n]
+        sens["tgtJ"][rows] = j.tgt_q[rows, :n]
+        sens["tgtW"][rows] = j.tgt_w[rows, :n]
+        sens["tgtT"][rows] = j.tgt_t[rows, :n]
+        k = self.finger_split
+        sens["actFingerLeft"][rows] = self.fingers.x[rows, :k]
+        sens["actFingerRight"][rows] = self.fingers.x[rows, k:]
+        sens["tgtFingerLeft"][rows] = self.fingers.target[rows, :k]
+        sens["tgtFingerRight"][rows] = self.fingers.target[rows, k:]
+        sens["actTipPRpy2B"][rows] = self.tips.x[rows]
+        sens["actTipVW2B"][rows] = self.tips.vel[rows]
+        sens["actTipFM2B"][rows] = self.tip_fm[rows]
+        sens["tgtTipPRpy2B"][rows] = self.tips.target[rows]
+        sens["tgtTipFM2B"][rows] = self.tip_fm[rows]
+
+
+MODELS = {
+    "jnt": JntRobotModel,
+    "mani": ManiRobotModel,
+}
@@ -2,6 +2,49 @@ import socket
 import struct
 import numpy as np
 import time
+import sys
+import os
+
+# 添加SDK路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sdk.loong_mani_sdk.loong_mani_sdk_udp import maniSdkSensDataClass, maniSdkCtrlDataClass
+from sim_dynamics import ManiRobotModel
+
+def fill_sim_sens_template(sens, jnt_num):
+    """填写机械臂传感帧模板的静态字段（模拟数据），RobotSimulator 与 fleet_server 共用"""
+    sens.dataSize = 1024
+    sens.key = [1, 2]
+    sens.planName = "sim_plan"
+    sens.state = [0, 1]
+    sens.joy = [0.1, -0.2, 0.3, -0.4]
+
+    sens.rpy = [0.05, -0.02, 0.01]
+    sens.gyr = [0.01, 0.02, -0.01]
+    sens.acc = [9.8, 0.1, -0.2]
+
+    # 关节数据
+    sens.actJ = np.arange(jnt_num) * 0.1 + 0.01
+    sens.actW = np.arange(jnt_num) * 0.02
+    sens.actT = np.arange(jnt_num) * 0.5
+    sens.tgtJ = np.arange(jnt_num) * 0.1
+    sens.tgtW = np.arange(jnt_num) * 0.02
+    sens.tgtT = np.arange(jnt_num) * 0.5
+
+    sens.drvTemp = np.arange(jnt_num) + 30
+    sens.drvState = 0
+    sens.drvErr = 0
+
+    sens.actFingerLeft = 0.3
+    sens.actFingerRight = 0.2
+    sens.tgtFingerLeft = 0.3
+    sens.tgtFingerRight = 0.2
+
+    sens.actTipPRpy2B = [[0.4, 0.3, 0.1, 0, 0, 0], [0.2, -0.3, 0.1, 0, 0, 0]]
+    sens.actTipVW2B = 0
+    sens.actTipFM2B = 0
+    sens.tgtTipPRpy2B = [[0.4, 0.3, 0.1, 0, 0, 0], [0.2, -0.3, 0.1, 0, 0, 0]]
+    sens.tgtTipVW2B = 0
+    sens.tgtTipFM2B = 0
 
 class RobotSimulator:
     def __init__(self, ip="127.0.0.1", port=8080):
@@ -15,83 +58,23 @@ class RobotSimulator:
         self.jnt_num = 12  # 假设总关节数12
         self.finger_dof_left = 3
         self.finger_dof_right = 3
+        self.sens = maniSdkSensDataClass(self.jnt_num, self.finger_dof_left, self.finger_dof_right)
+        fill_sim_sens_template(self.sens, self.jnt_num)
 
-    def generate_sim_sens_data(self):
-        """生成模拟的传感器数据，按SDK格式打包（修复numpy类型问题）"""
-        data = {
-            # 将numpy标量转换为原生Python类型（用.item()）
-            "dataSize": np.int32(1024).item(),  # 关键修复：np类型→原生类型
-            "timestamp": np.float64(time.time()).item(),
-            "key": np.array([1, 2], np.int16),  # 数组无需转换， unpack时会处理
-            "planName": b"sim_plan\x00" * 2,  # 保持16字节
-            "state": np.array([0, 1], np.int16),
-            "joy": np.array([0.1, -0.2, 0.3, -0.4], np.float32),
-
-            "rpy": np.array([0.05, -0.02, 0.01], np.float32),
-            "gyr": np.array([0.01, 0.02, -0.01], np.float32),
-            "acc": np.array([9.8, 0.1, -0.2], np.float32),
-
-            # 关节数据（数组保持numpy类型，打包时会自动处理）
-            "actJ": np.array([i * 0.1 + 0.01 for i in range(self.jnt_num)], np.float32),
-            "actW": np.array([0.02 * i for i in range(self.jnt_num)], np.float32),
-            "actT": np.array([0.5 * i for i in range(self.jnt_num)], np.float32),
-            "tgtJ": np.array([i * 0.1 for i in range(self.jnt_num)], np.float32),
-            "tgtW": np.array([0.02 * i for i in range(self.jnt_num)], np.float32),
-            "tgtT": np.array([0.5 * i for i in range(self.jnt_num)], np.float32),
-
-            "drvTemp": np.array([30 + i for i in range(self.jnt_num)], np.int16),
-            "drvState": np.array([0] * self.jnt_num, np.int16),
-            "drvErr": np.array([0] * self.jnt_num, np.int16),
-
-            "actFingerLeft": np.array([0.3, 0.3, 0.3], np.float32),
-            "actFingerRight": np.array([0.2, 0.2, 0.2], np.float32),
-            "tgtFingerLeft": np.array([0.3, 0.3, 0.3], np.float32),
-            "tgtFingerRight": np.array([0.2, 0.2, 0.2], np.float32),
+        # 复用的控制帧与关节模型：收到整帧指令后关节/手指/末端按模型收敛
+        self.ctrl = maniSdkCtrlDataClass(7, self.finger_dof_left, self.finger_dof_right, 2, 1)
+        self.model = ManiRobotModel(1, self.jnt_num, finger_dof_left=self.finger_dof_left,
+                                    finger_dof_right=self.finger_dof_right)
+        self.model.reset(0, self.sens.getFrame()[0])
 
-            "actTipPRpy2B": np.array([[0.4, 0.3, 0.1, 0, 0, 0], [0.2, -0.3, 0.1, 0, 0, 0]], np.float32),
-            "actTipVW2B": np.zeros((2, 6), np.float32),
-            "actTipFM2B": np.zeros((2, 6), np.float32),
-            "tgtTipPRpy2B": np.array([[0.4, 0.3, 0.1, 0, 0, 0], [0.2, -0.3, 0.1, 0, 0, 0]], np.float32),
-            "tgtTipVW2B": np.zeros((2, 6), np.float32),
-            "tgtTipFM2B": np.zeros((2, 6), np.float32),
-        }
-
-        # 打包逻辑保持不变，但确保标量已转换为原生类型
-        fmt_list = [
-            'i', 'd', '2h', '16s', '2h', '4f',
-            '3f', '3f', '3f',
-            f'{self.jnt_num}f', f'{self.jnt_num}f', f'{self.jnt_num}f',
-            f'{self.jnt_num}h', f'{self.jnt_num}h', f'{self.jnt_num}h',
-            f'{self.jnt_num}f', f'{self.jnt_num}f', f'{self.jnt_num}f',
-            f'{self.finger_dof_left}f', f'{self.finger_dof_right}f',
-            f'{self.finger_dof_left}f', f'{self.finger_dof_right}f',
-            '12f', '12f', '12f', '12f', '12f', '12f'
-        ]
-
-        buf = b""
-        for fmt in fmt_list:
-            key = {
-                'i': 'dataSize', 'd': 'timestamp', '2h': 'key', '16s': 'planName',
-                '2h': 'state', '4f': 'joy', '3f': 'rpy', '3f': 'gyr', '3f': 'acc',
-                f'{self.jnt_num}f': 'actJ', f'{self.jnt_num}f': 'actW', f'{self.jnt_num}f': 'actT',
-                f'{self.jnt_num}h': 'drvTemp', f'{self.jnt_num}h': 'drvState', f'{self.jnt_num}h': 'drvErr',
-                f'{self.jnt_num}f': 'tgtJ', f'{self.jnt_num}f': 'tgtW', f'{self.jnt_num}f': 'tgtT',
-                f'{self.finger_dof_left}f': 'actFingerLeft', f'{self.finger_dof_right}f': 'actFingerRight',
-                f'{self.finger_dof_left}f': 'tgtFingerLeft', f'{self.finger_dof_right}f': 'tgtFingerRight',
-                '12f': 'actTipPRpy2B', '12f': 'actTipVW2B', '12f': 'actTipFM2B',
-                '12f': 'tgtTipPRpy2B', '12f': 'tgtTipVW2B', '12f': 'tgtTipFM2B'
-            }[fmt]
-
-            value = data[key]
-            if isinstance(value, np.ndarray) and value.ndim > 1:
-                value = value.flatten()
-            # 新增：如果不是 iterable，则包装成 list
-            if not isinstance(value, (list, tuple, np.ndarray)):
-                value = [value]
-            # 打包时确保所有元素都是原生类型（numpy数组会自动转换）
-            buf += struct.pack(fmt, *value)
-
-        return buf
+    def generate_sim_sens_data(self):
+        """生成模拟的传感器数据：静态字段已在模板中，模型推进到当前时刻后写回动态字段与时间戳"""
+        sens = self.sens
+        now = time.time()
+        self.model.advance(now)
+        self.model.write(sens.getFrame(), slice(0, 1))
+        sens.timestamp[0] = now
+        return sens.packSensData()
 
     def run(self):
         """启动服务端，循环接收并响应"""
@@ -100,8 +83,12 @@ class RobotSimulator:
             ctrl_buf, client_addr = self.sk.recvfrom(2048)
             print(f"\n收到客户端 {client_addr} 的指令，长度：{len(ctrl_buf)}字节")
 
-            # 解析指令（可选，用于调试）
-            if len(ctrl_buf) >= 12:  # 前6个short（12字节）是基础控制参数
+            # 解析指令：整帧时解码到复用的控制帧并送入关节模型
+            if len(ctrl_buf) == self.ctrl.getCodec().size:
+                self.ctrl.unpackData(ctrl_buf)
+                self.model.command(self.ctrl.getFrame(), slice(0, 1))
+                print(f"解析到控制参数：inCharge={self.ctrl.inCharge}, armMode={self.ctrl.armMode}, fingerMode={self.ctrl.fingerMode}")
+            elif len(ctrl_buf) >= 12:  # 前6个short（12字节）是基础控制参数
                 base_ctrl = struct.unpack('6h', ctrl_buf[:12])
                 print(f"解析到基础控制参数：inCharge={base_ctrl[0]}, armMode={base_ctrl[2]}")
 
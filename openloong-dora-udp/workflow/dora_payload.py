@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+dora 事件负载统一解码
+各节点收到的 event["value"] 可能是 Arrow 结构(命令/状态边，见 dora_schemas)、UInt8Array(JSON 文本)、
+bytes/bytearray/memoryview、numpy uint8 数组、str 或整型列表。按值类型查一次解码函数并缓存，
+字节类负载经 memoryview 直接解码为 str，不经 to_numpy().tobytes() 中间拷贝。
+    value = decode_event(event["value"])   # Arrow 结构 -> dict(数组为零拷贝视图)；文本 -> json.loads 结果
+    text = payload_text(event["value"])    # 仅取文本，如 b"start"
+"""
+
+import json
+import numpy as np
+import pyarrow as pa
+
+from dora_schemas import decode as decode_struct
+
+
+def _view_arrow(value):
+    """Arrow 字节数组的数据缓冲区视图（考虑切片偏移）"""
+    if value.type.bit_width != 8:
+        raise TypeError(f"不支持的 Arrow 负载类型: {value.type}")
+    return memoryview(value.buffers()[1])[value.offset:value.offset + len(value)]
+
+def _view_chunked(value):
+    return _view_arrow(value.combine_chunks())
+
+def _view_bytes(value):
+    return memoryview(value)
+
+def _view_ndarray(value):
+    return memoryview(np.ascontiguousarray(value)).cast("B")
+
+def _view_int_list(value):
+    return memoryview(bytes(value))
+
+def _resolve_view(cls):
+    if issubclass(cls, pa.ChunkedArray):
+        return _view_chunked
+    if issubclass(cls, pa.Array):
+        return _view_arrow
+    if issubclass(cls, (bytes, bytearray, memoryview)):
+        return _view_bytes
+    if issubclass(cls, np.ndarray):
+        return _view_ndarray
+    if issubclass(cls, (list, tuple)):
+        return _view_int_list
+    raise TypeError(f"未知负载类型: {cls}")
+
+_view_cache = {}
+
+def payload_view(value):
+    """字节类负载的只读 memoryview（Arrow/bytes/numpy 均零拷贝）"""
+    fn = _view_cache.get(type(value))
+    if fn is None:
+        fn = _view_cache.setdefault(type(value), _resolve_view(type(value)))
+    return fn(value)
+
+def payload_text(value):
+    """负载按 utf-8 解码为 str"""
+    if type(value) is str:
+        return value
+    return str(payload_view(value), "utf-8")
+
+def _decode_text(value):
+    return json.loads(value)
+
+def _decode_bytes(value):
+    return json.loads(str(payload_view(value), "utf-8"))
+
+def _resolve_event(cls):
+    if issubclass(cls, pa.StructArray):
+        return decode_struct
+    if issubclass(cls, pa.ChunkedArray):
+        return lambda value: decode_event(value.combine_chunks())
+    if issubclass(cls, str):
+        return _decode_text
+    _resolve_view(cls)
+    return _decode_bytes
+
+_event_cache = {}
+
+def decode_event(value):
+    """解码一条事件负载：Arrow 结构返回字段 dict，文本负载按 JSON 解析"""
+    fn = _event_cache.get(type(value))
+    if fn is None:
+        fn = _event_cache.setdefault(type(value), _resolve_event(type(value)))
+    return fn(value)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+dora 边上的 Arrow 类型定义
+命令与状态统一以单行 StructArray 收发：数值数组为 float32/int16 列表列，字符串与标量为普通列。
+发送端由 numpy 数组直接构造（连续数组不经 Python 列表、不拷贝），接收端列表列经 to_numpy 得到零拷贝视图。
+    node.send_output("joint_command", encode(JOINT_COMMAND, command))
+    command = decode(event["value"])   # {字段: 标量 / numpy 视图 / 子结构dict}，空值字段不出现
+其他工程（openloong-dora-sim、openloong-dora-workflow）的节点按路径引用本模块，保证边两端类型一致。
+"""
+
+import functools
+import struct
+import numpy as np
+import pyarrow as pa
+
+F32_LIST = pa.list_(pa.float32())
+I16_LIST = pa.list_(pa.int16())
+
+# ==================== 命令 ====================
+JOINT_COMMAND = pa.struct([
+    ("action", pa.string()),
+    ("state", pa.int32()),
+    ("tor_limit_rate", pa.float32()),
+    ("filt_rate", pa.float32()),
+    ("joint_angles", F32_LIST),
+    ("finger_left", F32_LIST),
+    ("finger_right", F32_LIST),
+])
+
+MANI_TARGET = pa.struct([
+    ("left_arm", F32_LIST),
+    ("right_arm", F32_LIST),
+    ("left_fingers", F32_LIST),
+    ("right_fingers", F32_LIST),
+    ("arm_mode", pa.int16()),
+    ("finger_mode", pa.int16()),
+])
+
+MANI_COMMAND = pa.struct([
+    ("action", pa.string()),
+    ("mode", pa.string()),
+    ("in_charge", pa.int16()),
+    ("filt_level", pa.int16()),
+    ("arm_mode", pa.int16()),
+    ("finger_mode", pa.int16()),
+    ("neck_mode", pa.int16()),
+    ("lumbar_mode", pa.int16()),
+    ("arm_cmd", F32_LIST),          # 行优先展平的 (2, armDof)
+    ("arm_fm", F32_LIST),           # 行优先展平的 (2, 6)
+    ("finger_left", F32_LIST),
+    ("finger_right", F32_LIST),
+    ("neck_cmd", F32_LIST),
+    ("lumbar_cmd", F32_LIST),
+    ("target", MANI_TARGET),        # MANI_CONTROL 自定义目标
+])
+
+CHASSIS_COMMAND = pa.struct([
+    ("action", pa.string()),
+    ("target", pa.struct([
+        ("x", pa.float32()),
+        ("y", pa.float32()),
+        ("z", pa.float32()),
+        ("wz", pa.float32()),
+    ])),
+    ("tap", pa.int32()),
+    ("zOff", pa.float32()),
+])
+
+ARM_COMMAND = pa.struct([
+    ("action", pa.string()),
+    ("target", pa.struct([("left", F32_LIST), ("right", F32_LIST)])),
+    ("effector", pa.struct([("left", F32_LIST), ("right", F32_LIST)])),
+])
+
+# ==================== 状态 ====================
+ACTION_STATUS = pa.struct([
+    ("action", pa.string()),
+    ("status", pa.string()),
+    ("error", pa.string()),
+])
+CHASSIS_STATUS = ACTION_STATUS
+ARM_STATUS = ACTION_STATUS
+
+JOINT_STATUS = pa.struct([
+    ("action", pa.string()),
+    ("status", pa.string()),
+    ("error", pa.string()),
+    ("timestamp", pa.float64()),
+    ("joint_angles", F32_LIST),
+    ("target_angles", F32_LIST),
+    ("joint_velocities", F32_LIST),
+    ("joint_torques", F32_LIST),
+    ("finger_left", F32_LIST),
+    ("finger_right", F32_LIST),
+    ("drv_temp", I16_LIST),
+    ("drv_state", I16_LIST),
+    ("drv_error", I16_LIST),
+])
+
+MANI_STATUS = pa.struct(list(JOINT_STATUS) + [
+    ("tip_left_pos", F32_LIST),
+    ("tip_right_pos", F32_LIST),
+    ("tip_left_vel", F32_LIST),
+    ("tip_right_vel", F32_LIST),
+    ("tip_left_force", F32_LIST),
+    ("tip_right_force", F32_LIST),
+    ("imu_rpy", F32_LIST),
+    ("imu_gyr", F32_LIST),
+    ("imu_acc", F32_LIST),
+])
+
+WORKFLOW_STATUS = pa.struct([
+    ("status", pa.string()),
+    ("message", pa.string()),
+])
+
+
+_STRUCT_FMT = {
+    pa.int16(): "<h",
+    pa.int32(): "<i",
+    pa.int64(): "<q",
+    pa.float32(): "<f",
+    pa.float64(): "<d",
+}
+
+@functools.lru_cache(maxsize=256)
+def _offsets(length):
+    """单行变长列的偏移缓冲 [0, length]"""
+    return pa.py_buffer(struct.pack("<ii", 0, length))
+
+def _build_plan(struct_type):
+    """编译结构类型：逐字段记下类型、编码方式，以及在 Array.buffers() 深度优先顺序中的起始下标
+    返回 (字段计划, 占用缓冲区数)；字段计划为 (字段名, 方式, 类型, 缓冲区下标, 参数, 空值列)"""
+    plan = []
+    index = 1  # 0 为结构自身的有效位图
+    for field in struct_type:
+        arrow_type = field.type
+        null_column = pa.nulls(1, arrow_type)
+        if pa.types.is_struct(arrow_type):
+            sub = _build_plan(arrow_type)
+            plan.append((field.name, "struct", arrow_type, index, sub, null_column))
+            index += sub[1]
+        elif pa.types.is_list(arrow_type) and arrow_type.value_type in _STRUCT_FMT:
+            value_type = arrow_type.value_type
+            plan.append((field.name, "list", arrow_type, index,
+                         (value_type, np.dtype(value_type.to_pandas_dtype())), null_column))
+            index += 4  # 有效位图、偏移、值有效位图、值
+        elif pa.types.is_string(arrow_type):
+            plan.append((field.name, "str", arrow_type, index, None, null_column))
+            index += 3  # 有效位图、偏移、数据
+        elif arrow_type in _STRUCT_FMT:
+            plan.append((field.name, "scalar", arrow_type, index, _STRUCT_FMT[arrow_type], null_column))
+            index += 2  # 有效位图、值
+        else:
+            raise TypeError(f"dora_schemas 不支持的字段类型: {field.name}: {arrow_type}")
+    return tuple(plan), index
+
+_plans = []
+
+def _plan_for(struct_type):
+    """按类型取编译计划。Arrow 类型的 hash 需遍历整个结构(十余us)，而 == 走 C++ 指纹比较，
+    类型种类很少，故线性比较而不用 dict/lru_cache"""
+    for known, plan in _plans:
+        if known is struct_type or known == struct_type:
+            return plan
+    plan = _build_plan(struct_type)
+    _plans.append((struct_type, plan))
+    return plan
+
+def _encode_plan(struct_type, plan, record):
+    children = []
+    for name, kind, arrow_type, _, arg, null_column in plan:
+        value = record.get(name)
+        if value is None:
+            children.append(null_column)
+        elif kind == "list":
+            flat = np.ascontiguousarray(value, arg[1]).reshape(-1)
+            values = pa.Array.from_buffers(arg[0], flat.size, [None, pa.py_buffer(flat)])
+            children.append(pa.Array.from_buffers(arrow_type, 1, [None, _offsets(flat.size)], children=[values]))
+        elif kind == "scalar":
+            children.append(pa.Array.from_buffers(arrow_type, 1, [None, pa.py_buffer(struct.pack(arg, value))]))
+        elif kind == "str":
+            data = value.encode("utf-8")
+            children.append(pa.Array.from_buffers(arrow_type, 1, [None, _offsets(len(data)), pa.py_buffer(data)]))
+        else:
+            children.append(_encode_plan(arrow_type, arg[0], value))
+    return pa.Array.from_buffers(struct_type, 1, [None], children=children)
+
+def encode(struct_type, record):
+    """按类型把一条记录(dict)编码为单行 StructArray，缺省字段为空值；数值数组直接引用 numpy 缓冲区"""
+    return _encode_plan(struct_type, _plan_for(struct_type)[0], record)
+
+def _decode_buffers(plan, buffers, base):
+    out = {}
+    for name, kind, _, index, arg, _ in plan:
+        index += base
+        validity = buffers[index]
+        if validity is not None and not validity.to_pybytes()[0] & 1:
+            continue
+        if kind == "list":
+            start, end = struct.unpack_from("<ii", buffers[index + 1])
+            data = buffers[index + 3]
+            out[name] = np.frombuffer(data, arg[1])[start:end] if data is not None else np.empty(0, arg[1])
+        elif kind == "scalar":
+            out[name] = struct.unpack_from(arg, buffers[index + 1])[0]
+        elif kind == "str":
+            start, end = struct.unpack_from("<ii", buffers[index + 1])
+            data = buffers[index + 2]
+            out[name] = str(memoryview(data)[start:end], "utf-8") if data is not None else ""
+        else:
+            out[name] = _decode_buffers(arg[0], buffers, index)
+    return out
+
+def _decode_row(array, index):
+    """通用逐字段解码(切片或多行数组)"""
+    out = {}
+    for field, column in zip(array.type, array.flatten()):
+        scalar = column[index]
+        if not scalar.is_valid:
+            continue
+        if pa.types.is_struct(field.type):
+            out[field.name] = _decode_row(column, index)
+        elif pa.types.is_list(field.type):
+            out[field.name] = scalar.values.to_numpy(zero_copy_only=False)
+        else:
+            out[field.name] = scalar.as_py()
+    return out
+
+def decode(value):
+    """单行 StructArray 解码为 dict：列表列为 numpy 零拷贝视图，子结构为 dict，空值字段省略
+    单行未切片数组(encode 的产物)直接按缓冲区布局读取，其余情况逐字段解码"""
+    if isinstance(value, pa.ChunkedArray):
+        value = value.combine_chunks()
+    if value.offset == 0 and len(value) == 1:
+        return _decode_buffers(_plan_for(value.type)[0], value.buffers(), 0)
+    return _decode_row(value, 0)
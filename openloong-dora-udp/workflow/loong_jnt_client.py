@@ -3,174 +3,166 @@
 """
 龙机器人关节控制客户端
 基于dora workflow框架，作为关节控制客户端节点
+
+两种运行方式（环境变量 JNT_STREAM_HZ 选择）：
+    单次模式（默认）：每个 joint_command 事件发送一帧控制指令并等待一帧传感数据后回复状态
+    流式模式（JNT_STREAM_HZ>0）：后台按固定频率持续发送最新命令，joint_command 只更新目标；
+        传感帧由接收线程异步解码，joint_status 按 JNT_STATUS_HZ 抽取发布
 """
 
-import json
 import time
 import sys
 import os
 import socket
-import struct
+import threading
 import numpy as np
 from dora import Node
 
+# 添加SDK路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sdk.loong_jnt_sdk.loong_jnt_sdk_datas import jntSdkCtrlDataClass
+from sdk.loong_sdk_common.loong_sdk_schema import getFrameCodec
+from sdk.loong_sdk_common.loong_sdk_telemetry import sdkTelemetryLogClass
+from sdk.loong_sdk_common.loong_sdk_loop import sdkLoopClass
+from dora_schemas import encode, JOINT_STATUS
+from dora_payload import decode_event
+
 class LoongJntClient:
-    def __init__(self, server_ip="127.0.0.1", server_port=8081):
+    def __init__(self, server_ip="127.0.0.1", server_port=8081, stream_hz=0.0, status_hz=10.0,
+                 telemetry_dir=None):
         self.server_ip = server_ip
         self.server_port = server_port
+        self.stream_hz = stream_hz      # >0 时为流式模式的发送频率
+        self.status_hz = status_hz      # 流式模式下 joint_status 的发布频率
         
         # 初始化关节参数
         self.jnt_num = 31  # 总关节数：左臂7+右臂7+颈2+腰3+左腿6+右腿6
         self.finger_dof_left = 3
         self.finger_dof_right = 3
+
+        # 控制帧对象复用，传感帧按统一布局解码
+        self.ctrl = jntSdkCtrlDataClass(self.jnt_num, self.finger_dof_left, self.finger_dof_right)
+        self.sens_codec = getFrameCodec('jntSens', jntNum=self.jnt_num,
+                                        fingerDofLeft=self.finger_dof_left, fingerDofRight=self.finger_dof_right)
+        # 可选遥测日志：每个收到的传感帧(流式模式下为全部接收帧)按字段追加到列存
+        self.telemetry = sdkTelemetryLogClass(telemetry_dir, self.sens_codec) if telemetry_dir else None
         
         # 初始化UDP socket
         self.sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sk.settimeout(1.0)  # 设置超时时间
+
+        # 流式模式状态：控制帧由命令更新与后台发送共用，传感帧由接收线程写入、发布时取快照
+        self._ctrl_lock = threading.Lock()
+        self._sens_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._command = None
+        self._ack_pending = False   # 新命令后的首帧状态沿用命令 action 作为完成应答，其余为 JOINT_STREAM
+        self._ack_after_seq = None  # 新命令首次发出时的传感帧序号，之后收到的帧才可作完成应答
+        self._rx_buf = bytearray(2048)
+        self._sens_buf = bytearray(self.sens_codec.size)
+        self._sens_seq = 0
+        self._published_seq = 0
+        self.sent_frames = 0
+        self.bad_frames = 0
         
         # 初始化dora节点
         self.node = Node()
         print("关节控制客户端节点启动")
 
     def parse_joint_command(self, command_data):
-        """解析关节控制命令，兼容 UInt8Array/bytes/内存视图/整型列表"""
+        """解析关节控制命令（Arrow 单行结构或 JSON 文本，经 dora_payload 统一解码）"""
         try:
-            payload = command_data
-            if type(payload).__name__ == "UInt8Array":
-                payload = payload.to_numpy().tobytes().decode("utf-8")
-            elif hasattr(payload, "tobytes"):
-                payload = payload.tobytes().decode("utf-8")
-            elif isinstance(payload, (bytes, bytearray, memoryview)):
-                payload = bytes(payload).decode("utf-8")
-            elif isinstance(payload, str):
-                pass
-            elif isinstance(payload, (list, tuple)) and all(isinstance(x, int) for x in payload):
-                payload = bytes(payload).decode("utf-8")
-            else:
-                raise TypeError(f"未知输入类型: {type(payload)}")
-            return json.loads(payload)
+            return decode_event(command_data)
         except Exception as e:
             print(f"解析关节命令失败: {e}")
             return None
 
+    @staticmethod
+    def _fill(view, values):
+        """按给定值写入控制帧字段视图，不足部分补零"""
+        view.fill(0)
+        if values is not None:
+            view[:len(values)] = values
+
     def pack_control_data(self, command):
-        """打包控制数据"""
-        # 创建控制数据结构
-        checker = 3480  # 约定值
-        size = 16 + self.jnt_num * 4 * 5 + (self.finger_dof_left + self.finger_dof_right) * 4
-        state = 1 if command.get('state', 1) else 0
-        tor_limit_rate = command.get('tor_limit_rate', 0.2)
-        filt_rate = command.get('filt_rate', 0.05)
-        
-        # 获取关节角度
-        joint_angles = command.get('joint_angles', [0.0] * self.jnt_num)
-        if len(joint_angles) < self.jnt_num:
-            joint_angles.extend([0.0] * (self.jnt_num - len(joint_angles)))
-        
-        # 获取手指角度
-        finger_left = command.get('finger_left', [0.0] * self.finger_dof_left)
-        finger_right = command.get('finger_right', [0.0] * self.finger_dof_right)
-        
-        # 打包数据
-        buf = struct.pack('2hi', checker, size, state)  # checker, size, state
-        buf += struct.pack('ff', tor_limit_rate, filt_rate)  # torLimitRate, filtRate
-        buf += struct.pack(f'{self.jnt_num}f', *joint_angles)  # j
-        buf += struct.pack(f'{self.jnt_num}f', *([0.0] * self.jnt_num))  # w
-        buf += struct.pack(f'{self.jnt_num}f', *([0.0] * self.jnt_num))  # t
-        buf += struct.pack(f'{self.jnt_num}f', *([0.0] * self.jnt_num))  # kp
-        buf += struct.pack(f'{self.jnt_num}f', *([0.0] * self.jnt_num))  # kd
-        buf += struct.pack(f'{self.finger_dof_left}f', *finger_left)  # fingerLeft
-        buf += struct.pack(f'{self.finger_dof_right}f', *finger_right)  # fingerRight
-        
-        return buf
+        """打包控制数据（复用SDK控制帧对象原地打包）"""
+        ctrl = self.ctrl
+        ctrl.state = 1 if command.get('state', 1) else 0
+        ctrl.torLimitRate = command.get('tor_limit_rate', 0.2)
+        ctrl.filtRate = command.get('filt_rate', 0.05)
+
+        # 关节角度、手指角度，w/t/kp/kd 保持为零
+        self._fill(ctrl.j, command.get('joint_angles'))
+        self._fill(ctrl.fingerLeft, command.get('finger_left'))
+        self._fill(ctrl.fingerRight, command.get('finger_right'))
+
+        return ctrl.packData()
 
     def unpack_sensor_data(self, data_buf):
-        """解包传感器数据"""
+        """解包传感器数据（统一帧布局，单次零拷贝解码，字段为data_buf上的视图）"""
         try:
-            # 解析基础数据
-            offset = 0
-            size = struct.unpack('i', data_buf[offset:offset+4])[0]
-            offset += 4
-            timestamp = struct.unpack('d', data_buf[offset:offset+8])[0]
-            offset += 8
-            key = struct.unpack('2h', data_buf[offset:offset+4])
-            offset += 4
-            plan_name = data_buf[offset:offset+16].decode('utf-8').rstrip('\x00')
-            offset += 16
-            state = struct.unpack('2h', data_buf[offset:offset+4])
-            offset += 4
-            joy = struct.unpack('4f', data_buf[offset:offset+16])
-            offset += 16
-            
-            # 解析IMU数据
-            rpy = struct.unpack('3f', data_buf[offset:offset+12])
-            offset += 12
-            gyr = struct.unpack('3f', data_buf[offset:offset+12])
-            offset += 12
-            acc = struct.unpack('3f', data_buf[offset:offset+12])
-            offset += 12
-            
-            # 解析关节数据
-            act_j = struct.unpack(f'{self.jnt_num}f', data_buf[offset:offset+self.jnt_num*4])
-            offset += self.jnt_num * 4
-            act_w = struct.unpack(f'{self.jnt_num}f', data_buf[offset:offset+self.jnt_num*4])
-            offset += self.jnt_num * 4
-            act_t = struct.unpack(f'{self.jnt_num}f', data_buf[offset:offset+self.jnt_num*4])
-            offset += self.jnt_num * 4
-            
-            # 解析驱动器数据
-            drv_temp = struct.unpack(f'{self.jnt_num}h', data_buf[offset:offset+self.jnt_num*2])
-            offset += self.jnt_num * 2
-            drv_state = struct.unpack(f'{self.jnt_num}h', data_buf[offset:offset+self.jnt_num*2])
-            offset += self.jnt_num * 2
-            drv_err = struct.unpack(f'{self.jnt_num}h', data_buf[offset:offset+self.jnt_num*2])
-            offset += self.jnt_num * 2
-            
-            # 解析目标关节数据
-            tgt_j = struct.unpack(f'{self.jnt_num}f', data_buf[offset:offset+self.jnt_num*4])
-            offset += self.jnt_num * 4
-            tgt_w = struct.unpack(f'{self.jnt_num}f', data_buf[offset:offset+self.jnt_num*4])
-            offset += self.jnt_num * 4
-            tgt_t = struct.unpack(f'{self.jnt_num}f', data_buf[offset:offset+self.jnt_num*4])
-            offset += self.jnt_num * 4
-            
-            # 解析手指数据
-            act_finger_left = struct.unpack(f'{self.finger_dof_left}f', data_buf[offset:offset+self.finger_dof_left*4])
-            offset += self.finger_dof_left * 4
-            act_finger_right = struct.unpack(f'{self.finger_dof_right}f', data_buf[offset:offset+self.finger_dof_right*4])
-            offset += self.finger_dof_right * 4
-            tgt_finger_left = struct.unpack(f'{self.finger_dof_left}f', data_buf[offset:offset+self.finger_dof_left*4])
-            offset += self.finger_dof_left * 4
-            tgt_finger_right = struct.unpack(f'{self.finger_dof_right}f', data_buf[offset:offset+self.finger_dof_right*4])
-            
+            frame = self.sens_codec.decode(data_buf)[0]
             return {
-                'size': size,
-                'timestamp': timestamp,
-                'key': key,
-                'plan_name': plan_name,
-                'state': state,
-                'joy': joy,
-                'rpy': rpy,
-                'gyr': gyr,
-                'acc': acc,
-                'act_j': act_j,
-                'act_w': act_w,
-                'act_t': act_t,
-                'drv_temp': drv_temp,
-                'drv_state': drv_state,
-                'drv_err': drv_err,
-                'tgt_j': tgt_j,
-                'tgt_w': tgt_w,
-                'tgt_t': tgt_t,
-                'act_finger_left': act_finger_left,
-                'act_finger_right': act_finger_right,
-                'tgt_finger_left': tgt_finger_left,
-                'tgt_finger_right': tgt_finger_right
+                'size': frame['size'][0],
+                'timestamp': frame['timestamp'][0],
+                'key': frame['key'],
+                'plan_name': bytes(frame['planName']).rstrip(b'\x00').decode('utf-8', 'ignore'),
+                'state': frame['state'],
+                'joy': frame['joy'],
+                'rpy': frame['rpy'],
+                'gyr': frame['gyr'],
+                'acc': frame['acc'],
+                'act_j': frame['actJ'],
+                'act_w': frame['actW'],
+                'act_t': frame['actT'],
+                'drv_temp': frame['drvTemp'],
+                'drv_state': frame['drvState'],
+                'drv_err': frame['drvErr'],
+                'tgt_j': frame['tgtJ'],
+                'tgt_w': frame['tgtW'],
+                'tgt_t': frame['tgtT'],
+                'act_finger_left': frame['actFingerLeft'],
+                'act_finger_right': frame['actFingerRight'],
+                'tgt_finger_left': frame['tgtFingerLeft'],
+                'tgt_finger_right': frame['tgtFingerRight']
             }
         except Exception as e:
             print(f"解包传感器数据失败: {e}")
             return None
 
+    def build_status(self, action, sensor_data):
+        """由传感数据构建 joint_status，无数据时各数组为零"""
+        if sensor_data:
+            return {
+                "action": action,
+                "timestamp": float(sensor_data['timestamp']),
+                "joint_angles": sensor_data['act_j'],
+                "target_angles": sensor_data['tgt_j'],
+                "joint_velocities": sensor_data['act_w'],
+                "joint_torques": sensor_data['act_t'],
+                "finger_left": sensor_data['act_finger_left'],
+                "finger_right": sensor_data['act_finger_right'],
+                "drv_temp": sensor_data['drv_temp'],
+                "drv_state": sensor_data['drv_state'],
+                "drv_error": sensor_data['drv_err'],
+                "status": "SUCCESS"
+            }
+        return {
+            "action": action,
+            "timestamp": time.time(),
+            "joint_angles": np.zeros(self.jnt_num, np.float32),
+            "target_angles": np.zeros(self.jnt_num, np.float32),
+            "joint_velocities": np.zeros(self.jnt_num, np.float32),
+            "joint_torques": np.zeros(self.jnt_num, np.float32),
+            "finger_left": np.zeros(self.finger_dof_left, np.float32),
+            "finger_right": np.zeros(self.finger_dof_right, np.float32),
+            "drv_temp": np.zeros(self.jnt_num, np.int16),
+            "drv_state": np.zeros(self.jnt_num, np.int16),
+            "drv_error": np.zeros(self.jnt_num, np.int16),
+            "status": "SUCCESS"
+        }
+
     def execute_joint_command(self, command):
         """执行关节控制命令"""
         try:
@@ -184,43 +176,14 @@ class LoongJntClient:
             try:
                 data_buf, _ = self.sk.recvfrom(2048)
                 sensor_data = self.unpack_sensor_data(data_buf)
+                if sensor_data and self.telemetry is not None:
+                    self.telemetry.append(data_buf)
             except socket.timeout:
                 print("接收传感器数据超时")
                 sensor_data = None
             
             # 构建状态信息
-            if sensor_data:
-                status = {
-                    "action": command.get("action", "JOINT_CONTROL"),
-                    "timestamp": sensor_data['timestamp'],
-                    "joint_angles": list(sensor_data['act_j']),
-                    "target_angles": list(sensor_data['tgt_j']),
-                    "joint_velocities": list(sensor_data['act_w']),
-                    "joint_torques": list(sensor_data['act_t']),
-                    "finger_left": list(sensor_data['act_finger_left']),
-                    "finger_right": list(sensor_data['act_finger_right']),
-                    "drv_temp": list(sensor_data['drv_temp']),
-                    "drv_state": list(sensor_data['drv_state']),
-                    "drv_error": list(sensor_data['drv_err']),
-                    "status": "SUCCESS"
-                }
-            else:
-                status = {
-                    "action": command.get("action", "JOINT_CONTROL"),
-                    "timestamp": time.time(),
-                    "joint_angles": [0.0] * self.jnt_num,
-                    "target_angles": [0.0] * self.jnt_num,
-                    "joint_velocities": [0.0] * self.jnt_num,
-                    "joint_torques": [0.0] * self.jnt_num,
-                    "finger_left": [0.0] * self.finger_dof_left,
-                    "finger_right": [0.0] * self.finger_dof_right,
-                    "drv_temp": [0] * self.jnt_num,
-                    "drv_state": [0] * self.jnt_num,
-                    "drv_error": [0] * self.jnt_num,
-                    "status": "SUCCESS"
-                }
-            
-            return status
+            return self.build_status(command.get("action", "JOINT_CONTROL"), sensor_data)
             
         except Exception as e:
             print(f"执行关节命令失败: {e}")
@@ -230,10 +193,133 @@ class LoongJntClient:
                 "error": str(e)
             }
 
+    # ==================== 流式模式 ====================
+    def update_command(self, command):
+        """更新后台发送的目标命令（原地打包进复用的控制帧）"""
+        with self._ctrl_lock:
+            self.pack_control_data(command)
+            self._command = command
+            self._ack_pending = True
+            self._ack_after_seq = None
+
+    def _send_loop(self):
+        """按固定频率发送最新命令，收到首个命令前不发送"""
+        loop = sdkLoopClass(self.stream_hz, name="jnt_stream")
+        loop.start()
+        addr = (self.server_ip, self.server_port)
+        while not self._stop_event.is_set():
+            if self._command is not None:
+                try:
+                    with self._ctrl_lock:
+                        self.sk.sendto(self.ctrl.packData(), addr)
+                        if self._ack_pending and self._ack_after_seq is None:
+                            self._ack_after_seq = self._sens_seq
+                    self.sent_frames += 1
+                except OSError as e:
+                    print(f"发送控制指令失败: {e}")
+            loop.wait()
+        print(loop.report())
+
+    def _recv_loop(self):
+        """接收传感帧并保留最新一帧，丢包或对端未启动时不影响发送"""
+        self.sk.settimeout(0.1)
+        size = self.sens_codec.size
+        while not self._stop_event.is_set():
+            try:
+                n = self.sk.recv_into(self._rx_buf)
+            except socket.timeout:
+                continue
+            except OSError:
+                # 对端端口不可达等，稍后重试
+                time.sleep(0.01)
+                continue
+            if n < size:
+                self.bad_frames += 1
+                continue
+            with self._sens_lock:
+                self._sens_buf[:] = memoryview(self._rx_buf)[:size]
+                self._sens_seq += 1
+            if self.telemetry is not None:
+                self.telemetry.append(self._rx_buf)
+
+    def start_streaming(self):
+        self._stop_event.clear()
+        self._threads = [threading.Thread(target=self._send_loop, daemon=True),
+                         threading.Thread(target=self._recv_loop, daemon=True)]
+        for t in self._threads:
+            t.start()
+
+    def stop_streaming(self):
+        self._stop_event.set()
+        for t in self._threads:
+            t.join(timeout=1.0)
+        self._threads = []
+
+    def publish_latest_status(self):
+        """有新传感帧时发布一次 joint_status（抽取发布，中间帧只保留最新）
+        编排节点以 JOINT_CONTROL/SUCCESS 判定完成，故仅新命令首次发出后收到的首帧沿用命令 action，周期状态为 JOINT_STREAM；
+        首次发出前收到的帧反映的是旧目标，不作应答"""
+        if self._sens_seq == self._published_seq or self._command is None:
+            return False
+        with self._sens_lock:
+            sens_buf = bytes(self._sens_buf)
+            self._published_seq = self._sens_seq
+        with self._ctrl_lock:
+            ack = (self._ack_pending and self._ack_after_seq is not None
+                   and self._published_seq > self._ack_after_seq)
+            if ack:
+                self._ack_pending = False
+        if ack:
+            action = self._command.get("action", "JOINT_CONTROL")
+        else:
+            action = "JOINT_STREAM"
+        status = self.build_status(action, self.unpack_sensor_data(sens_buf))
+        self.node.send_output("joint_status", encode(JOINT_STATUS, status))
+        return True
+
+    def run_streaming(self):
+        """流式模式：dora 事件只更新目标，状态按 status_hz 发布"""
+        print(f"关节控制客户端流式模式运行中: 发送 {self.stream_hz}Hz, 状态发布 {self.status_hz}Hz")
+        self.start_streaming()
+        period = 1.0 / self.status_hz
+        next_publish = time.monotonic()
+        try:
+            while True:
+                event = self.node.next(timeout=max(0.0, next_publish - time.monotonic()))
+                if event is not None:
+                    if event["type"] == "STOP":
+                        break
+                    if event["type"] == "INPUT" and event["id"] == "joint_command":
+                        command = self.parse_joint_command(event["value"])
+                        if command:
+                            self.update_command(command)
+                        else:
+                            error_status = {
+                                "action": "JOINT_CONTROL",
+                                "status": "ERROR",
+                                "error": "Invalid command format"
+                            }
+                            self.node.send_output("joint_status", encode(JOINT_STATUS, error_status))
+                now = time.monotonic()
+                if now >= next_publish:
+                    self.publish_latest_status()
+                    next_publish = max(next_publish + period, now)
+        finally:
+            self.stop_streaming()
+            print(f"流式模式结束: 发送 {self.sent_frames} 帧, 接收 {self._sens_seq} 帧, 异常帧 {self.bad_frames}")
+
     def run(self):
         """运行客户端节点"""
-        print("关节控制客户端运行中...")
-        
+        try:
+            if self.stream_hz > 0:
+                return self.run_streaming()
+            print("关节控制客户端运行中...")
+            self._run_events()
+        finally:
+            if self.telemetry is not None:
+                self.telemetry.close()
+
+    def _run_events(self):
         for event in self.node:
             if event["type"] == "INPUT":
                 if event["id"] == "joint_command":
@@ -247,8 +333,7 @@ class LoongJntClient:
                         status = self.execute_joint_command(command)
                         
                         # 发送状态
-                        status_json = json.dumps(status).encode()
-                        self.node.send_output("joint_status", status_json)
+                        self.node.send_output("joint_status", encode(JOINT_STATUS, status))
                         print(f"关节控制状态: {status['status']}")
                     else:
                         # 发送错误状态
@@ -257,9 +342,11 @@ class LoongJntClient:
                             "status": "ERROR",
                             "error": "Invalid command format"
                         }
-                        self.node.send_output("joint_status", json.dumps(error_status).encode())
+                        self.node.send_output("joint_status", encode(JOINT_STATUS, error_status))
 
 if __name__ == "__main__":
-    client = LoongJntClient()
+    client = LoongJntClient(stream_hz=float(os.environ.get("JNT_STREAM_HZ", 0)),
+                            status_hz=float(os.environ.get("JNT_STATUS_HZ", 10)),
+                            telemetry_dir=os.environ.get("JNT_TELEMETRY_DIR") or None)
     client.run()
 
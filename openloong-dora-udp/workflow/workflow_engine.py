@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+数据驱动的工作流状态机
+状态、迁移、守卫、超时与各状态进入时发出的命令写在与 dataflow.yml 同目录的 YAML 中，robot_workflow 节点进程内执行，
+各控制节点的状态边直接接入，不再经编排节点转成 next_action。
+    engine = WorkflowEngine.load("workflow.yml", node.send_output, encode_command, guards={"condition_met": fn})
+    engine.start()
+    engine.handle(event["id"], value)      # 状态边事件；value 为 decode_event 结果，trigger/tick 可为 None
+
+YAML 结构：
+    initial: IDLE
+    tick: tick                  # 定时器输入名，收到即检查状态超时（dataflow 中接 dora/timer/millis/100）
+    commands:                   # 命令模板：加载时按 schema 编码一次，进入状态时直接发出
+      move: {output: chassis_command, schema: CHASSIS_COMMAND, value: {action: MOVE, ...}}
+    states:
+      MOVE_TO_TARGET:
+        enter: [move, joint]    # 进入时依次发出(彼此不等待)
+        timeout: 30             # 秒，到时产生 timeout 事件
+        transitions:
+          chassis_status/MOVE_COMPLETE:          # 事件键：输入名[/action[/status]]
+            - {guard: condition_met, to: GRAB_OBJECT, do: [condition_met]}
+            - {to: COMPLETE, do: [condition_not_met]}   # 守卫不满足时按顺序尝试下一条
+          mani_status/*/ERROR: {to: FAILED}      # action 位置可写 * 匹配任意动作
+          timeout: {to: FAILED}
+迁移按 (状态, 事件键) 预编译为 dict，事件先查 输入/action/status，再查 输入/*/status、输入/action、输入，
+每个事件至多四次 dict 查找；守卫名前加 ! 取反。
+
+并行分支(fork/join)：状态的 parallel 下每个分支进入时同时发出各自命令，收到其 done 事件即完成，
+全部完成时产生 join 事件(守卫收到 {分支名: 完成事件负载})；deadline 为自进入状态起的秒数，
+必需分支逾期产生 branch_timeout 事件(负载 {"branch": 分支名})，optional 分支逾期视为放弃、不阻塞 join。
+被放弃的分支(optional 逾期，或离开状态时仍未完成)此后迟到的同输入、同 action 事件(如其 ERROR)丢弃一次，
+不会误触发后续状态里 输入/*/status 之类的迁移；再次进入该状态时放弃记录清除。
+      APPROACH:
+        parallel:
+          chassis: {enter: [move], done: chassis_status/MOVE_COMPLETE, deadline: 60}
+          preshape: {enter: [preshape], done: mani_status/MANI_CONTROL/SUCCESS, deadline: 5, optional: true}
+        transitions:
+          join: {to: GRAB_OBJECT}
+          branch_timeout: {to: FAILED}
+"""
+
+import time
+from collections import namedtuple
+
+import yaml
+
+Transition = namedtuple("Transition", "guards target actions")
+Branch = namedtuple("Branch", "name actions deadline optional sources")
+
+_TIMEOUT = "timeout"
+_JOIN = "join"
+_BRANCH_TIMEOUT = "branch_timeout"
+
+
+class WorkflowSpecError(ValueError):
+    """工作流 YAML 定义有误（未知状态、命令或守卫等），加载时抛出"""
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+class WorkflowEngine:
+    def __init__(self, spec, send, encode_command, guards=None, clock=time.monotonic, log=print):
+        """spec: YAML 解析后的 dict；send(output, payload) 发出一条边数据；
+        encode_command(schema, value) 把命令模板编码为负载；guards: {守卫名: fn(value) -> bool}"""
+        self.send = send
+        self.clock = clock
+        self.log = log
+        self.tick_input = spec.get("tick")
+        self.commands = {}
+        for name, cmd in (spec.get("commands") or {}).items():
+            self.commands[name] = (cmd["output"], encode_command(cmd["schema"], cmd.get("value") or {}))
+        guards = guards or {}
+        states = spec.get("states") or {}
+        if spec.get("initial") not in states:
+            raise WorkflowSpecError(f"初始状态 {spec.get('initial')!r} 未定义")
+        self.initial = spec["initial"]
+        self.enter_actions = {}
+        self.timeouts = {}
+        self.table = {}  # 状态 -> {事件键: (Transition, ...)}
+        self.branches = {}  # 状态 -> (Branch, ...)
+        self.branch_table = {}  # 状态 -> {事件键: (分支名, ...)}
+        for state, body in states.items():
+            body = body or {}
+            self.enter_actions[state] = self._compile_actions(state, body.get("enter"))
+            self._compile_branches(state, body.get("parallel"))
+            if body.get("timeout") is not None:
+                self.timeouts[state] = float(body["timeout"])
+            table = {}
+            for key, alternatives in (body.get("transitions") or {}).items():
+                table[key] = tuple(self._compile_transition(state, key, alt, states, guards)
+                                   for alt in _as_list(alternatives))
+            on_timeout = table.get(_TIMEOUT)
+            if state in self.timeouts and not (on_timeout and all(tr.target for tr in on_timeout)):
+                raise WorkflowSpecError(f"状态 {state} 设置了 timeout，须有迁移到其他状态的 timeout 迁移")
+            branches = self.branches.get(state, ())
+            if branches and _JOIN not in table:
+                raise WorkflowSpecError(f"状态 {state} 有并行分支，须有 join 迁移")
+            on_branch_timeout = table.get(_BRANCH_TIMEOUT)
+            if (any(b.deadline is not None and not b.optional for b in branches)
+                    and not (on_branch_timeout and all(tr.target for tr in on_branch_timeout))):
+                raise WorkflowSpecError(f"状态 {state} 有设 deadline 的必需分支，须有迁移到其他状态的 branch_timeout 迁移")
+            self.table[state] = table
+        # 迁移键、分支完成键中带 action/status 的输入，其负载需要解码；其余输入(trigger 等)只看输入名
+        self.keyed_inputs = frozenset(key.split("/", 1)[0]
+                                      for tables in (self.table, self.branch_table) for table in tables.values()
+                                      for key in table if "/" in key)
+        self.state = None
+        self.entered_at = 0.0
+        self.pending = {}  # 当前状态未完成的分支：分支名 -> Branch
+        self.branch_results = {}  # 已完成分支：分支名 -> 完成事件负载(optional 逾期为 None)
+        self.abandoned = {}  # 被放弃分支的 (输入名, action) -> 分支名，迟到事件据此丢弃
+        self.fired = 0  # 已执行的迁移数
+
+    @classmethod
+    def load(cls, path, send, encode_command, guards=None, **kwargs):
+        with open(path, encoding="utf-8") as f:
+            return cls(yaml.safe_load(f), send, encode_command, guards, **kwargs)
+
+    def _compile_actions(self, state, names):
+        actions = []
+        for name in _as_list(names):
+            if name not in self.commands:
+                raise WorkflowSpecError(f"状态 {state} 引用了未定义的命令 {name!r}")
+            actions.append(self.commands[name])
+        return tuple(actions)
+
+    def _compile_branches(self, state, parallel):
+        if not parallel:
+            return
+        branches = []
+        keys = {}
+        for name, body in parallel.items():
+            deadline = body.get("deadline")
+            done = _as_list(body.get("done"))
+            if not done:
+                raise WorkflowSpecError(f"状态 {state} 的分支 {name} 没有 done 事件")
+            # 分支事件来源：done 键的 输入名/action(action 为 * 或缺省时无法归属，不参与丢弃)
+            sources = tuple({tuple(key.split("/")[:2]) for key in done
+                             if key.count("/") >= 1 and key.split("/")[1] != "*"})
+            branches.append(Branch(name, self._compile_actions(state, body.get("enter")),
+                                   None if deadline is None else float(deadline), bool(body.get("optional", False)),
+                                   sources))
+            for key in done:
+                keys[key] = keys.get(key, ()) + (name,)
+        self.branches[state] = tuple(branches)
+        self.branch_table[state] = keys
+
+    def _compile_transition(self, state, key, alt, states, guards):
+        target = alt.get("to")
+        if target is not None and target not in states:
+            raise WorkflowSpecError(f"状态 {state} 的 {key} 迁移到未定义状态 {target!r}")
+        compiled = []
+        for name in _as_list(alt.get("guard")):
+            negate = name.startswith("!")
+            fn = guards.get(name.lstrip("!"))
+            if fn is None:
+                raise WorkflowSpecError(f"状态 {state} 的 {key} 迁移引用了未注册的守卫 {name!r}")
+            compiled.append((fn, negate))
+        return Transition(tuple(compiled), target, self._compile_actions(state, alt.get("do")))
+
+    def start(self):
+        self._enter(self.initial)
+
+    def _enter(self, state):
+        # 离开时仍未完成的分支视为放弃
+        for branch in self.pending.values():
+            self._abandon(branch)
+        self.state = state
+        self.entered_at = self.clock()
+        self.pending = {}
+        self.branch_results = {}
+        # 重新下发分支命令，此前放弃的同源事件不再视为迟到
+        for branch in self.branches.get(state, ()):
+            for source in branch.sources:
+                self.abandoned.pop(source, None)
+        for output, payload in self.enter_actions[state]:
+            self.send(output, payload)
+        # fork：各分支命令同时发出，彼此不等待
+        for branch in self.branches.get(state, ()):
+            self.pending[branch.name] = branch
+            for output, payload in branch.actions:
+                self.send(output, payload)
+
+    @staticmethod
+    def _lookup(table, input_id, value):
+        if isinstance(value, dict):
+            action = value.get("action")
+            status = value.get("status")
+            if status is not None:
+                hit = table.get(f"{input_id}/{action}/{status}") or table.get(f"{input_id}/*/{status}")
+                if hit:
+                    return hit
+            if action is not None:
+                hit = table.get(f"{input_id}/{action}")
+                if hit:
+                    return hit
+        return table.get(input_id)
+
+    def _abandon(self, branch):
+        for source in branch.sources:
+            self.abandoned[source] = branch.name
+
+    def handle(self, input_id, value=None):
+        """处理一条输入事件，发生迁移返回 True；定时器输入只检查超时"""
+        if input_id == self.tick_input:
+            return self.poll()
+        if self.abandoned and isinstance(value, dict):
+            name = self.abandoned.pop((input_id, value.get("action")), None)
+            if name is not None:
+                self.log(f"丢弃已放弃分支 {name} 的迟到事件: {input_id} {value.get('action')}/{value.get('status')}")
+                return False
+        if self.pending:
+            names = self._lookup(self.branch_table[self.state], input_id, value)
+            if names and self._complete(names, value):
+                return True
+        return self._fire(self._lookup(self.table[self.state], input_id, value), input_id, value)
+
+    def _complete(self, names, value, note="分支完成"):
+        """标记分支完成，全部完成时按 join 迁移"""
+        for name in names:
+            if self.pending.pop(name, None) is not None:
+                self.branch_results[name] = value
+                self.log(f"{note}: {self.state}.{name}")
+        if self.pending:
+            return False
+        return self._fire(self.table[self.state][_JOIN], _JOIN, self.branch_results)
+
+    def poll(self, now=None):
+        """检查分支 deadline 与当前状态超时"""
+        now = self.clock() if now is None else now
+        elapsed = now - self.entered_at
+        if self.pending:
+            for branch in list(self.pending.values()):
+                if branch.deadline is None or elapsed < branch.deadline:
+                    continue
+                if not branch.optional:
+                    return self._fire(self.table[self.state][_BRANCH_TIMEOUT], _BRANCH_TIMEOUT, {"branch": branch.name})
+                self._abandon(branch)
+                if self._complete((branch.name,), None, "可选分支逾期放弃"):
+                    return True
+        limit = self.timeouts.get(self.state)
+        if limit is None or elapsed < limit:
+            return False
+        return self._fire(self.table[self.state][_TIMEOUT], _TIMEOUT, None)
+
+    def _fire(self, alternatives, key, value):
+        if not alternatives:
+            return False
+        for tr in alternatives:
+            if all(fn(value) != negate for fn, negate in tr.guards):
+                break
+        else:
+            return False
+        for output, payload in tr.actions:
+            self.send(output, payload)
+        self.fired += 1
+        if tr.target is not None:
+            self.log(f"状态迁移: {self.state} -> {tr.target} ({key})")
+            self._enter(tr.target)
+        return True
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+工作流触发源：把任务排入有界队列，按 workflow_status 逐个下发 trigger（三个工程的 start_workflow 共用）
+同一时刻只有一个任务在执行：发出 trigger 后等到 workflow_status 为 COMPLETE/FAILED 才下发下一个，
+队列满时文件/FIFO/套接字读取阻塞(背压传到生产者)，定时/速率源丢弃本次并计数。
+    trigger = WorkflowTrigger(node.send_output, sources_from_env(), queue_max=1000)
+    trigger.start()
+    event = node.next(timeout=trigger.poll_interval)
+    trigger.handle(event["id"], value)     # workflow_status 事件；其余输入忽略
+    trigger.dispatch()                     # 空闲且队列非空时下发下一个任务
+
+触发源(环境变量 TRIGGER_MODE，可逗号组合多个)：
+    once    启动时触发一次（缺省，与原行为一致）
+    timer   每 TRIGGER_INTERVAL_S 秒排入一个任务
+    rate    按 TRIGGER_SCHEDULE 分段速率排入任务，如 "60:10,300:30,0:5"：前 60s 每分钟 10 个，
+            再 300s 每分钟 30 个，之后每分钟 5 个（最后一段持续，时长写 0）
+    queue   从 TRIGGER_QUEUE 指定的文件或 FIFO 逐行读取任务；普通文件读完后继续跟随追加，FIFO 写端关闭后重新打开
+    socket  在 TRIGGER_SOCKET 上接收任务行：路径为 Unix 套接字，host:port 为本机 TCP；每行应答 "queued <序号>"
+任务行原样(UTF-8)作为 trigger 负载，可为 JSON 任务描述；空负载时为 b"start"，空行与 # 开头的行忽略。
+"""
+
+import os
+import queue
+import socket
+import stat
+import threading
+import time
+
+END_STATUS = ("COMPLETE", "FAILED")
+DEFAULT_PAYLOAD = b"start"
+
+
+def parse_schedule(text):
+    """"秒数:每分钟任务数,..." -> [(时长秒, 间隔秒或 None)]，速率 0 的段不排任务"""
+    segments = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        duration, per_min = item.split(":")
+        per_min = float(per_min)
+        segments.append((float(duration), 60.0 / per_min if per_min > 0 else None))
+    if not segments:
+        raise ValueError(f"TRIGGER_SCHEDULE 为空: {text!r}")
+    return segments
+
+
+class WorkflowTrigger:
+    def __init__(self, send, sources, queue_max=1000, poll_interval=0.05, log=print, log_every=100):
+        """send(output, payload) 发出 trigger；sources 为 fn(trigger) 的列表，各在后台线程中调用 trigger.submit 排入任务"""
+        self.send = send
+        self.sources = sources
+        self.tasks = queue.Queue(queue_max)
+        self.poll_interval = poll_interval
+        self.log = log
+        self.log_every = log_every
+        self.busy = False
+        self.count_lock = threading.Lock()  # submit 在各触发源线程中并发调用
+        self.submitted = 0
+        self.dropped = 0
+        self.finished = {status: 0 for status in END_STATUS}
+        self.started_at = None
+
+    def start(self):
+        for source in self.sources:
+            threading.Thread(target=source, args=(self,), daemon=True).start()
+
+    def submit(self, payload=None, block=True):
+        """排入一个任务，返回序号；block=False 且队列满时丢弃并返回 None"""
+        try:
+            self.tasks.put(payload or DEFAULT_PAYLOAD, block)
+        except queue.Full:
+            with self.count_lock:
+                self.dropped += 1
+            return None
+        with self.count_lock:
+            self.submitted += 1
+            return self.submitted
+
+    def handle(self, input_id, value):
+        """处理 workflow_status：任务结束即空闲，可下发下一个"""
+        if input_id != "workflow_status" or not isinstance(value, dict):
+            return
+        status = value.get("status")
+        if status not in END_STATUS or not self.busy:
+            return
+        self.busy = False
+        self.finished[status] += 1
+        done = sum(self.finished.values())
+        if self.log_every and done % self.log_every == 0:
+            rate = done / max(time.monotonic() - self.started_at, 1e-9) * 60
+            self.log(f"已完成 {done} 个任务（失败 {self.finished['FAILED']}，排队 {self.tasks.qsize()}，"
+                     f"丢弃 {self.dropped}），{rate:.1f} 个/分钟")
+
+    def dispatch(self):
+        """空闲且有排队任务时下发 trigger，返回是否下发"""
+        if self.busy:
+            return False
+        try:
+            payload = self.tasks.get_nowait()
+        except queue.Empty:
+            return False
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        self.busy = True
+        self.send("trigger", payload)
+        return True
+
+
+# ==================== 触发源 ====================
+def once_source(trigger):
+    trigger.submit()
+
+
+def timer_source(interval):
+    def run(trigger):
+        deadline = time.monotonic()
+        while True:
+            trigger.submit(block=False)
+            # 按截止时刻推进，不随排队或丢弃漂移
+            deadline += interval
+            time.sleep(max(0.0, deadline - time.monotonic()))
+    return run
+
+
+def rate_source(segments):
+    def run(trigger):
+        for index, (duration, interval) in enumerate(segments):
+            last = index == len(segments) - 1
+            end = None if last else time.monotonic() + duration
+            if interval is None:
+                if last:
+                    return
+                time.sleep(duration)
+                continue
+            deadline = time.monotonic()
+            while end is None or deadline < end:
+                trigger.submit(block=False)
+                deadline += interval
+                time.sleep(max(0.0, deadline - time.monotonic()))
+    return run
+
+
+def _submit_lines(trigger, lines):
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith(b"#"):
+            trigger.submit(line)
+
+
+def queue_source(path):
+    def run(trigger):
+        while True:
+            # FIFO 打开时阻塞到有写端；队列满时 submit 阻塞，不再读取，写端随之阻塞
+            with open(path, "rb") as f:
+                if stat.S_ISREG(os.fstat(f.fileno()).st_mode):
+                    _follow_file(trigger, f)
+                else:
+                    # FIFO：写端全部关闭即 EOF，末尾不带换行的半行也算一个任务，然后重新打开等待下一个写端
+                    _submit_lines(trigger, f)
+    return run
+
+
+def _follow_file(trigger, f):
+    """普通文件：逐行读取，读到末尾(或半行)时回退到行首，等待追加"""
+    while True:
+        line = f.readline()
+        if line.endswith(b"\n"):
+            _submit_lines(trigger, (line,))
+        else:
+            f.seek(-len(line), os.SEEK_CUR)
+            time.sleep(0.2)
+
+
+def socket_source(address):
+    def serve(trigger, conn):
+        with conn, conn.makefile("rb") as reader:
+            for line in reader:
+                line = line.strip()
+                if not line or line.startswith(b"#"):
+                    continue
+                seq = trigger.submit(line)  # 队列满时阻塞，不再读取该连接
+                conn.sendall(f"queued {seq}\n".encode())
+
+    def run(trigger):
+        if ":" in address:
+            host, port = address.rsplit(":", 1)
+            sk = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sk.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sk.bind((host, int(port)))
+        else:
+            if os.path.exists(address):
+                os.unlink(address)
+            sk = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sk.bind(address)
+        sk.listen()
+        while True:
+            conn, _ = sk.accept()
+            threading.Thread(target=serve, args=(trigger, conn), daemon=True).start()
+    return run
+
+
+def sources_from_env(env=os.environ):
+    """按 TRIGGER_MODE 等环境变量构造触发源列表"""
+    sources = []
+    for mode in env.get("TRIGGER_MODE", "once").split(","):
+        mode = mode.strip()
+        if mode == "once":
+            sources.append(once_source)
+        elif mode == "timer":
+            sources.append(timer_source(float(env.get("TRIGGER_INTERVAL_S", "10"))))
+        elif mode == "rate":
+            sources.append(rate_source(parse_schedule(env.get("TRIGGER_SCHEDULE", "0:6"))))
+        elif mode == "queue":
+            sources.append(queue_source(env["TRIGGER_QUEUE"]))
+        elif mode == "socket":
+            sources.append(socket_source(env.get("TRIGGER_SOCKET", "/tmp/workflow_trigger.sock")))
+        elif mode:
+            raise ValueError(f"未知的 TRIGGER_MODE: {mode!r}")
+    return sources
@@ -1,14 +1,40 @@
 import grpc
 from concurrent import futures
+import math
 import time
 import sys
 import os
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import proto.upper_controller_pb2 as upper_controller_pb2
 import proto.upper_controller_pb2_grpc as upper_controller_pb2_grpc
 from google.protobuf import empty_pb2
 
+# 替身臂状态按一阶惯性逼近最近一次 sendArmAction 的目标，时间常数(秒)
+ARM_TAU = float(os.environ.get("UPPER_ARM_TAU", "0.3"))
+
+
 class UpperControllerServicer(upper_controller_pb2_grpc.UpperControllerServicer):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.arm = {"left": [5.0, 6.0], "right": [7.0, 8.0]}
+        self.effector = {"left": [0.5, 0.6], "right": [0.7, 0.8]}
+        self.target_arm = dict(self.arm)
+        self.target_effector = dict(self.effector)
+        self.updated = time.monotonic()
+
+    def _advance(self):
+        """按距上次更新的时间把当前状态向目标推进(调用方持锁)"""
+        now = time.monotonic()
+        k = 1.0 - math.exp(-(now - self.updated) / ARM_TAU)
+        self.updated = now
+        for state, target in ((self.arm, self.target_arm), (self.effector, self.target_effector)):
+            for side in ("left", "right"):
+                cur, tgt = state[side], target[side]
+                if len(cur) != len(tgt):
+                    cur = [0.0] * len(tgt)
+                state[side] = [c + k * (t - c) for c, t in zip(cur, tgt)]
+
     def sendEndAction(self, request, context):
         print("sendEndAction:", request)
         return upper_controller_pb2.Response(succeeded=True, msg="End action received")
@@ -22,13 +48,20 @@ class UpperControllerServicer(upper_controller_pb2_grpc.UpperControllerServicer)
 
     def sendArmAction(self, request, context):
         print("sendArmAction:", request)
+        with self.lock:
+            self._advance()
+            self.target_arm = {"left": list(request.arm.left), "right": list(request.arm.right)}
+            self.target_effector = {"left": list(request.effector.left), "right": list(request.effector.right)}
         return upper_controller_pb2.Response(succeeded=True, msg="Arm action received")
 
     def recvArmState(self, request, context):
-        print("recvArmState")
+        # 客户端按 50Hz 轮询等待收敛，不逐次打印
+        with self.lock:
+            self._advance()
+            arm, effector = dict(self.arm), dict(self.effector)
         return upper_controller_pb2.ArmPayload(
-            arm=upper_controller_pb2.ArmPosition(left=[5.0, 6.0], right=[7.0, 8.0]),
-            effector=upper_controller_pb2.EffectorPosition(left=[0.5, 0.6], right=[0.7, 0.8])
+            arm=upper_controller_pb2.ArmPosition(left=arm["left"], right=arm["right"]),
+            effector=upper_controller_pb2.EffectorPosition(left=effector["left"], right=effector["right"])
         )
 
     def setConfig(self, request, context):
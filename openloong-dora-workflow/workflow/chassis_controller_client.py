@@ -1,30 +1,56 @@
-import json
+import os
+import sys
+import grpc
 from dora import Node
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import proto.chassis_controller_pb2 as chassis_controller_pb2
+import proto.chassis_controller_pb2_grpc as chassis_controller_pb2_grpc
+
+# 边上的 Arrow 类型与 openloong-dora-udp/workflow 共用
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "openloong-dora-udp", "workflow"))
+from dora_schemas import encode, CHASSIS_STATUS
+from dora_payload import decode_event
+
+CHASSIS_ADDR = os.environ.get("CHASSIS_CONTROLLER_ADDR", "localhost:50051")
+
+
+def send_command(stub, cmd):
+    """下发底盘命令，返回 (status, error)。
+    ChassisControler 服务只有 sendCommand、无里程计/状态回读，无法按传感收敛判断，以服务端应答为准"""
+    target = cmd.get("target") or {}
+    reply = stub.sendCommand(chassis_controller_pb2.Command(
+        linear=chassis_controller_pb2.Descartes(x=float(target.get("x") or 0.0), y=float(target.get("y") or 0.0),
+                                                z=float(target.get("z") or 0.0)),
+        angular=chassis_controller_pb2.Descartes(z=float(target.get("wz") or 0.0)),
+        tap=int(cmd.get("tap") or 0),
+        zOff=float(cmd.get("zOff") or 0.0),
+    ), timeout=1.0)
+    return ("SUCCESS", None) if reply.succeeded else ("ERROR", reply.msg)
+
+
 def main():
     node = Node()
-    print("底盘控制节点启动")
+    stub = chassis_controller_pb2_grpc.ChassisControlerStub(grpc.insecure_channel(CHASSIS_ADDR))
+    print(f"底盘控制节点启动，服务端 {CHASSIS_ADDR}")
     for event in node:
         if event["type"] == "INPUT" and event["id"] == "chassis_command":
-            print("收到底盘命令: ", event)
-            cmd = event["value"]
-            # 兼容 pyarrow.lib.UInt8Array、bytes、str
-            if type(cmd).__name__ == "UInt8Array":
-                # 用 to_numpy().tobytes() 转为 bytes
-                cmd = cmd.to_numpy().tobytes().decode("utf-8")
-            elif hasattr(cmd, "tobytes"):
-                cmd = cmd.tobytes().decode("utf-8")
-            elif isinstance(cmd, bytes):
-                cmd = cmd.decode("utf-8")
-            elif isinstance(cmd, str):
-                pass
+            cmd = {}
+            try:
+                cmd = decode_event(event["value"])
+                print(f"收到底盘命令: {cmd}")
+                status, error = send_command(stub, cmd)
+            except grpc.RpcError as e:
+                status, error = "ERROR", f"gRPC 调用失败: {e.code()}"
+            except Exception as e:
+                # 负载异常等只让本条命令失败，节点继续处理后续命令
+                status, error = "ERROR", f"命令处理失败: {e!r}"
+            if status == "SUCCESS":
+                result = {"action": "MOVE_COMPLETE"}
             else:
-                raise TypeError(f"未知类型: {type(cmd)}")
-            cmd = json.loads(cmd)
-            print(f"收到底盘命令: {cmd}")
-            # 这里应调用底盘server接口，模拟直接返回完成
-            status = {"action": "MOVE_COMPLETE"}
-            node.send_output("chassis_status", json.dumps(status).encode())
+                print(f"底盘命令失败: {error}")
+                result = {"action": cmd.get("action"), "status": status, "error": error}
+            node.send_output("chassis_status", encode(CHASSIS_STATUS, result))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
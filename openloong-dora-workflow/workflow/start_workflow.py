@@ -1,11 +1,27 @@
+import os
+import sys
 from dora import Node
 
+# 事件解码及触发队列与 openloong-dora-udp/workflow 共用
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "openloong-dora-udp", "workflow"))
+from dora_payload import decode_event
+from workflow_trigger import WorkflowTrigger, sources_from_env
+
 def main():
     node = Node()
-    print("机器人工作流触发节点启动")
-    node.send_output("trigger", b"start")
-    for _ in node:
-        pass  # 保持节点运行
+    print(f"机器人工作流触发节点启动，触发源: {os.environ.get('TRIGGER_MODE', 'once')}")
+    trigger = WorkflowTrigger(node.send_output, sources_from_env(),
+                              queue_max=int(os.environ.get("TRIGGER_QUEUE_MAX", 1000)))
+    trigger.start()
+    while True:
+        trigger.dispatch()
+        event = node.next(timeout=trigger.poll_interval)
+        if event is None:
+            continue
+        if event["type"] == "STOP":
+            break
+        if event["type"] == "INPUT" and event["id"] == "workflow_status":
+            trigger.handle(event["id"], decode_event(event["value"]))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,34 +1,99 @@
-import json
+import os
+import sys
+import time
+import grpc
+import numpy as np
 from dora import Node
+from google.protobuf import empty_pb2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import proto.upper_controller_pb2 as upper_controller_pb2
+import proto.upper_controller_pb2_grpc as upper_controller_pb2_grpc
+
+# 边上的 Arrow 类型与 openloong-dora-udp/workflow 共用
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "openloong-dora-udp", "workflow"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "openloong-dora-udp"))
+from dora_schemas import encode, ARM_STATUS
+from dora_payload import decode_event
+from sdk.loong_sdk_common.loong_sdk_converge import sdkConvergeClass
+
+UPPER_ADDR = os.environ.get("UPPER_CONTROLLER_ADDR", "localhost:50052")
+ARM_TOL = float(os.environ.get("ARM_TOL", "0.02"))  # 关节位置容差
+EFFECTOR_TOL = float(os.environ.get("EFFECTOR_TOL", "0.02"))  # 末端执行器容差
+ARM_DWELL_S = float(os.environ.get("ARM_DWELL_S", "0.2"))  # 连续到位多久算完成
+ARM_TIMEOUT_S = float(os.environ.get("ARM_TIMEOUT_S", "20"))
+ARM_POLL_HZ = float(os.environ.get("ARM_POLL_HZ", "50"))  # recvArmState 轮询频率
+
+COMPLETE = {"GRAB": "GRAB_COMPLETE", "RETURN": "RETURN_COMPLETE"}
+
+
+def floats(values):
+    """列表列(decode_event 给出 numpy 视图)或 None -> protobuf 重复字段用的 float 列表"""
+    return [] if values is None else np.asarray(values, np.float64).tolist()
+
+
+def arm_state(payload):
+    """ArmPayload -> 收敛监视按键取字段的 dict"""
+    return {"armLeft": payload.arm.left, "armRight": payload.arm.right,
+            "effectorLeft": payload.effector.left, "effectorRight": payload.effector.right}
+
+
+def execute(stub, cmd):
+    """下发机械臂动作并轮询状态直到收敛，返回 (status, error)"""
+    target = cmd.get("target") or {}
+    effector = cmd.get("effector") or {}
+    reply = stub.sendArmAction(upper_controller_pb2.ArmPayload(
+        arm=upper_controller_pb2.ArmPosition(left=floats(target.get("left")), right=floats(target.get("right"))),
+        effector=upper_controller_pb2.EffectorPosition(left=floats(effector.get("left")),
+                                                       right=floats(effector.get("right"))),
+    ), timeout=1.0)
+    if not reply.succeeded:
+        return "ERROR", reply.msg
+
+    monitor = sdkConvergeClass(dwell=ARM_DWELL_S, timeout=ARM_TIMEOUT_S)
+    for name, values, tol in (("armLeft", target.get("left"), ARM_TOL), ("armRight", target.get("right"), ARM_TOL),
+                              ("effectorLeft", effector.get("left"), EFFECTOR_TOL),
+                              ("effectorRight", effector.get("right"), EFFECTOR_TOL)):
+        if values is not None and len(values):
+            monitor.expect(name, values, tol=tol)
+    if not monitor.channels:
+        return "SUCCESS", None
+
+    # 控制节点一次只执行一个动作，轮询期间不取新事件
+    period = 1.0 / ARM_POLL_HZ
+    while True:
+        t0 = time.monotonic()
+        if monitor.update(arm_state(stub.recvArmState(empty_pb2.Empty(), timeout=1.0))):
+            print(f"{cmd.get('action')} 到位，用时 {monitor.elapsed():.2f}s")
+            return "SUCCESS", None
+        if monitor.expired:
+            return "ERROR", f"未收敛: {monitor.error()}"
+        time.sleep(max(0.0, period - (time.monotonic() - t0)))
+
 
 def main():
     node = Node()
-    print("上位机控制节点启动")
+    stub = upper_controller_pb2_grpc.UpperControllerStub(grpc.insecure_channel(UPPER_ADDR))
+    print(f"上位机控制节点启动，服务端 {UPPER_ADDR}")
     for event in node:
         if event["type"] == "INPUT" and event["id"] == "arm_command":
-            print("收到机械臂命令: ", event)
-            cmd = event["value"]
-            # 兼容 pyarrow.lib.UInt8Array、bytes、str
-            if type(cmd).__name__ == "UInt8Array":
-                cmd = cmd.to_numpy().tobytes().decode("utf-8")
-            elif hasattr(cmd, "tobytes"):
-                cmd = cmd.tobytes().decode("utf-8")
-            elif isinstance(cmd, bytes):
-                cmd = cmd.decode("utf-8")
-            elif isinstance(cmd, str):
-                pass
-            else:
-                raise TypeError(f"未知类型: {type(cmd)}")
-            cmd = json.loads(cmd)
-            print(f"收到机械臂命令: {cmd}")
-            # 这里应调用机械臂server接口，模拟直接返回完成
-            if cmd.get("action") == "GRAB":
-                status = {"action": "GRAB_COMPLETE"}
-            elif cmd.get("action") == "RETURN":
-                status = {"action": "RETURN_COMPLETE"}
+            action = None
+            try:
+                cmd = decode_event(event["value"])
+                print(f"收到机械臂命令: {cmd}")
+                action = cmd.get("action")
+                status, error = execute(stub, cmd)
+            except grpc.RpcError as e:
+                status, error = "ERROR", f"gRPC 调用失败: {e.code()}"
+            except Exception as e:
+                # 负载异常等只让本条命令失败，节点继续处理后续命令
+                status, error = "ERROR", f"命令处理失败: {e!r}"
+            if status == "SUCCESS":
+                result = {"action": COMPLETE.get(action, "UNKNOWN")}
             else:
-                status = {"action": "UNKNOWN"}
-            node.send_output("arm_status", json.dumps(status).encode())
+                print(f"{action} 失败: {error}")
+                result = {"action": action, "status": status, "error": error}
+            node.send_output("arm_status", encode(ARM_STATUS, result))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()